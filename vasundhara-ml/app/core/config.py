@@ -3,7 +3,7 @@ Configuration settings for the ML service
 """
 
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -18,11 +18,17 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WORKERS: int = 2  # gunicorn worker processes (gunicorn.conf.py)
+    PRELOAD_MODELS: bool = True  # load models once in the gunicorn master; workers share them copy-on-write
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_SIZE: int = 10000  # verified tokens kept per process, 0 disables the cache
+    AUTH_CACHE_MAX_AGE: int = 300  # seconds a verification is reused, capped by the token's exp
+    AUTH_REVOCATION_POLL_SECONDS: float = 5.0  # how often the revocation list version is checked
+    AUTH_REVOCATION_TTL: int = 7 * 24 * 3600  # revocation lifetime for tokens without an exp claim
     
     # CORS
     ALLOWED_ORIGINS: List[str] = [
@@ -35,16 +41,43 @@ class Settings(BaseSettings):
     # Database
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DATABASE: str = "vasundhara"
+    MONGODB_CONNECT_TIMEOUT_MS: int = 5000  # server selection timeout, also bounds startup
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     REDIS_DB: int = 0
+    REDIS_HEALTH_CACHE_SECONDS: float = 5.0  # /health and /readyz reuse the last INFO result this long
     
     # ML Models
     MODEL_PATH: str = "./models"
     EXPIRY_MODEL_NAME: str = "expiry_prediction_model.pkl"
     IMAGE_MODEL_NAME: str = "image_classification_model.pkl"
     RECIPE_MODEL_NAME: str = "recipe_recommendation_model.pkl"
+    MODEL_WARMUP_ITERATIONS: int = 3  # representative inferences per model before /readyz passes
+    RECIPE_CORPUS_PATH: str = "./data/recipes.json"  # [{"Title", "Ingredients", "Instructions"}, ...]
+    RECIPE_URGENCY_HALF_LIFE_DAYS: float = 2.0  # urgency halves for every this many days to expiry
+    RECIPE_DEFAULT_URGENCY: float = 0.5  # items sent without an expiry date or spoilage probability
+    RECIPE_PANTRY_WEIGHT: float = 0.5  # bonus for the share of a recipe's ingredients on hand
+    RECIPE_MISSING_PENALTY: float = 0.1  # per ingredient not on hand
+    RECIPE_SEMANTIC_ENABLED: bool = True  # embedding-based secondary candidates
+    RECIPE_EMBEDDING_MODEL: str = "hashing"  # hashing | a local Hugging Face model, e.g. sentence-transformers/all-MiniLM-L6-v2
+    RECIPE_EMBEDDING_DIM: int = 128  # hashing encoder only
+    RECIPE_EMBEDDINGS_PATH: str = "./models/recipe_embeddings"  # built offline or on first start
+    RECIPE_ANN_PROBES: int = 16  # IVF lists (of about sqrt(recipes)) scanned per query
+    RECIPE_ANN_MIN_SIMILARITY: float = 0.3  # recipes from the ANN index below this are dropped
+    RECIPE_SEMANTIC_CANDIDATES: int = 50  # recipes taken from the ANN index per query
+    RECIPE_SEMANTIC_WEIGHT: float = 0.5  # score bonus per unit of cosine similarity
+    RECIPE_SEMANTIC_MIN_SIMILARITY: float = 0.5  # for an unmatched item to stand in for an ingredient
+    MAX_IMAGE_UPLOAD_BYTES: int = 10 * 1024 * 1024  # 10 MB per uploaded image
+
+    # Image model inference (CNN freshness classifier)
+    IMAGE_MODEL_BACKEND: str = "none"  # none | torch | onnx
+    IMAGE_CNN_WEIGHTS_NAME: str = "freshness_mobilenet_v3.pt"  # torch state_dict
+    IMAGE_CNN_ONNX_NAME: str = "freshness_mobilenet_v3.onnx"
+    IMAGE_MODEL_QUANTIZE: bool = True  # dynamic int8 Linear layers (torch backend)
+    IMAGE_MODEL_THREADS: int = 0  # intra-op threads, 0 keeps the runtime default
+    IMAGE_BATCH_MAX_SIZE: int = 16  # images per batched forward pass
+    IMAGE_BATCH_MAX_WAIT_MS: float = 5.0  # how long a batch waits to fill up
     
     # Model Training
     TRAINING_DATA_PATH: str = "./data/training"
@@ -52,11 +85,64 @@ class Settings(BaseSettings):
     BATCH_SIZE: int = 32
     EPOCHS: int = 100
     LEARNING_RATE: float = 0.001
+
+    # Micro-batching of expiry model calls (1 disables)
+    EXPIRY_BATCH_MAX_SIZE: int = 64  # feature rows per vectorized booster call
+    EXPIRY_BATCH_MAX_WAIT_MS: float = 2.0  # how long a batch waits to fill up
+
+    # Household inventory scoring
+    HOUSEHOLD_MAX_ITEMS: int = 5000  # items accepted per /households/score-expiry request
+    HOUSEHOLD_STREAM_BATCH_SIZE: int = 2000  # food items scored per vectorized pass when streaming
+
+    # Expiry risk materialization (expiry_risk collection)
+    EXPIRY_RISK_ENABLED: bool = True
+    EXPIRY_RISK_INCREMENTAL_INTERVAL: int = 900  # seconds between incremental runs
+    EXPIRY_RISK_FULL_RUN_HOUR: int = 2  # UTC hour after which the nightly full run is due
+    EXPIRY_RISK_CHUNK_SIZE: int = 1000  # food items scored and bulk-written per chunk
+    EXPIRY_RISK_LEASE_SECONDS: int = 600  # how long one replica holds the job
     
     # Cache
     CACHE_TTL: int = 3600  # 1 hour
     CACHE_PREFIX: str = "vasundhara:ml:"
-    
+    RECIPE_CACHE_TTL: int = 900  # per-user recipe suggestions; also busted by inventory changes
+    IMAGE_CACHE_TTL: int = 1800  # exact (SHA-256) image classification results
+    IMAGE_PHASH_MAX_DISTANCE: int = 4  # Hamming distance for near-duplicate image hits
+    IMAGE_PHASH_CACHE_SIZE: int = 4096  # perceptual hash entries kept per process, 0 disables
+
+    # Monitoring
+    MONITORING_RING_SIZE: int = 1024  # latency samples kept per model
+    MONITORING_SAMPLE_RATE: float = 0.1  # share of successful inferences kept with metadata
+    MONITORING_FLUSH_INTERVAL: int = 15  # seconds between flushes of process counters to Redis
+    MONITORING_FLUSH_TTL: int = 60  # seconds a flushed instance snapshot stays in Redis
+
+    # Tracing
+    TRACING_SAMPLE_RATE: float = 0.05  # share of inferences with per-stage timings
+    OTEL_EXPORTER_OTLP_ENDPOINT: Optional[str] = None  # export spans via OTLP when set
+
+    # Admission control (per-route concurrency limits, JSON in the environment)
+    ADMISSION_ROUTE_LIMITS: Dict[str, int] = {
+        "/classify-image": 4,
+        "/classify-image/upload": 4,
+        "/predict-expiry": 32,
+        "/households/score-expiry": 16,
+        "/suggest-recipes": 16,
+        "/forecast-demand": 16,
+        "/detect-anomalies": 16,
+    }
+    ADMISSION_MAX_QUEUE: int = 64  # queued requests per route before 429
+    ADMISSION_MAX_QUEUE_WAIT_MS: int = 2000  # shed with 503 past this; keep below the API's ML_SERVICE_TIMEOUT
+
+    # Degradation tiers (queue pressure is a 0-1 fraction of a route's queue limits)
+    DEGRADATION_ENABLED: bool = True
+    DEGRADE_REDUCED_PRESSURE: float = 0.25  # serve rule-based models above this
+    DEGRADE_MINIMAL_PRESSURE: float = 0.6  # serve thumbnail stats / no spoilage curve above this
+    DEGRADE_REDUCED_CPU_PERCENT: float = 85.0  # event-loop thread CPU, percent of one core
+    DEGRADE_MINIMAL_CPU_PERCENT: float = 95.0
+
+    # Profiling
+    PROFILER_MAX_SECONDS: int = 60  # upper bound of an on-demand profiling window
+    PROFILER_TRACEMALLOC_FRAMES: int = 10  # stack depth kept per allocation in memory mode
+
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
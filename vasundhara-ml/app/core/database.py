@@ -21,7 +21,10 @@ class Database:
     async def connect(self):
         """Connect to MongoDB"""
         try:
-            self.client = AsyncIOMotorClient(settings.MONGODB_URL)
+            self.client = AsyncIOMotorClient(
+                settings.MONGODB_URL,
+                serverSelectionTimeoutMS=settings.MONGODB_CONNECT_TIMEOUT_MS,
+            )
             self.database = self.client[settings.MONGODB_DATABASE]
             
             # Test connection
@@ -30,6 +33,8 @@ class Database:
             
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
+            self.client = None
+            self.database = None
             raise
     
     async def disconnect(self):
@@ -40,7 +45,7 @@ class Database:
     
     def get_database(self) -> AsyncIOMotorDatabase:
         """Get database instance"""
-        if not self.database:
+        if self.database is None:
             raise RuntimeError("Database not connected")
         return self.database
 
@@ -3,7 +3,7 @@ Redis client configuration and utilities
 """
 
 import redis.asyncio as redis
-from typing import Optional, Any, Union
+from typing import Optional, Any, Dict, List, Set, Tuple, Union
 import json
 import logging
 
@@ -32,6 +32,7 @@ class RedisClient:
             
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
+            self.client = None
             raise
     
     async def disconnect(self):
@@ -96,6 +97,126 @@ class RedisClient:
             logger.error(f"Redis EXISTS error for key {key}: {e}")
             return False
     
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round trip (missing keys are None)"""
+        if not self.client or not keys:
+            return [None] * len(keys)
+
+        try:
+            values = await self.client.mget([f"{settings.CACHE_PREFIX}{key}" for key in keys])
+            return [json.loads(value) if value else None for value in values]
+        except Exception as e:
+            logger.error(f"Redis MGET error for keys {keys}: {e}")
+            return [None] * len(keys)
+
+    async def incr(self, key: str, ttl: Optional[int] = None) -> Optional[int]:
+        """Increment a counter, refreshing its TTL; returns the new value"""
+        if not self.client:
+            return None
+
+        try:
+            full_key = f"{settings.CACHE_PREFIX}{key}"
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.incr(full_key)
+                pipe.expire(full_key, ttl or settings.CACHE_TTL)
+                value, _ = await pipe.execute()
+            return value
+        except Exception as e:
+            logger.error(f"Redis INCR error for key {key}: {e}")
+            return None
+
+    async def set_hash(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Replace a Redis hash with the given mapping"""
+        if not self.client or not mapping:
+            return False
+
+        try:
+            full_key = f"{settings.CACHE_PREFIX}{key}"
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hset(full_key, mapping=mapping)
+                pipe.expire(full_key, ttl or settings.CACHE_TTL)
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Redis HSET error for key {key}: {e}")
+            return False
+
+    async def get_hashes(self, keys: List[str]) -> List[Dict[str, str]]:
+        """Read several Redis hashes in one round trip (missing keys are empty)"""
+        if not self.client or not keys:
+            return []
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.hgetall(f"{settings.CACHE_PREFIX}{key}")
+                return await pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis HGETALL error for keys {keys}: {e}")
+            return []
+
+    async def add_to_set(self, key: str, *members: str) -> bool:
+        """Add members to a Redis set"""
+        if not self.client or not members:
+            return False
+
+        try:
+            await self.client.sadd(f"{settings.CACHE_PREFIX}{key}", *members)
+            return True
+        except Exception as e:
+            logger.error(f"Redis SADD error for key {key}: {e}")
+            return False
+
+    async def remove_from_set(self, key: str, *members: str) -> bool:
+        """Remove members from a Redis set"""
+        if not self.client or not members:
+            return False
+
+        try:
+            await self.client.srem(f"{settings.CACHE_PREFIX}{key}", *members)
+            return True
+        except Exception as e:
+            logger.error(f"Redis SREM error for key {key}: {e}")
+            return False
+
+    async def get_set_members(self, key: str) -> Set[str]:
+        """Get all members of a Redis set"""
+        if not self.client:
+            return set()
+
+        try:
+            return await self.client.smembers(f"{settings.CACHE_PREFIX}{key}")
+        except Exception as e:
+            logger.error(f"Redis SMEMBERS error for key {key}: {e}")
+            return set()
+
+    async def get_sorted_set_range(
+        self, key: str, min_score: Union[float, str] = "-inf", max_score: Union[float, str] = "+inf"
+    ) -> List[Tuple[str, float]]:
+        """Members of a sorted set with scores in [min_score, max_score], with their scores"""
+        if not self.client:
+            return []
+
+        try:
+            return await self.client.zrangebyscore(
+                f"{settings.CACHE_PREFIX}{key}", min_score, max_score, withscores=True
+            )
+        except Exception as e:
+            logger.error(f"Redis ZRANGEBYSCORE error for key {key}: {e}")
+            return []
+
+    async def run_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """Run a Lua script atomically on the given (prefixed) keys; None on error"""
+        if not self.client:
+            return None
+
+        try:
+            full_keys = [f"{settings.CACHE_PREFIX}{key}" for key in keys]
+            return await self.client.eval(script, len(full_keys), *full_keys, *args)
+        except Exception as e:
+            logger.error(f"Redis EVAL error for keys {keys}: {e}")
+            return None
+
     async def health_check(self) -> dict:
         """Check Redis health"""
         if not self.client:
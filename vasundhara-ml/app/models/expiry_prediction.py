@@ -4,6 +4,7 @@ Pydantic models for expiry prediction
 
 from pydantic import BaseModel, Field, validator
 from typing import List, Optional, Dict, Any
+import datetime as dt
 from datetime import date, datetime
 from enum import Enum
 
@@ -78,7 +79,7 @@ class ExpiryPredictionRequest(BaseModel):
 class SpoilageDataPoint(BaseModel):
     """Single data point in spoilage curve"""
     
-    date: date = Field(..., description="Date for this prediction")
+    date: dt.date = Field(..., description="Date for this prediction")
     prob_spoiled: float = Field(
         ..., 
         ge=0.0, 
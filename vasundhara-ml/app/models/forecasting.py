@@ -4,6 +4,7 @@ Pydantic models for demand forecasting and anomaly detection
 
 from __future__ import annotations
 
+import datetime as dt
 from datetime import date, datetime
 from enum import Enum
 from typing import Dict, List, Optional
@@ -21,7 +22,7 @@ class ForecastGranularity(str, Enum):
 class DemandDataPoint(BaseModel):
     """Historical demand or consumption data"""
 
-    date: date = Field(..., description="Date of the observation")
+    date: dt.date = Field(..., description="Date of the observation")
     quantity: float = Field(..., ge=0, description="Units consumed or demanded")
     waste: Optional[float] = Field(0, ge=0, description="Units wasted on this date")
     notes: Optional[str] = Field(None, description="Optional context for this measurement")
@@ -61,7 +62,7 @@ class DemandForecastRequest(BaseModel):
 class ForecastedPoint(BaseModel):
     """Single forecasted data point"""
 
-    date: date = Field(..., description="Forecast date")
+    date: dt.date = Field(..., description="Forecast date")
     predicted_quantity: float = Field(..., ge=0, description="Forecast quantity")
     lower_bound: Optional[float] = Field(
         None, ge=0, description="Lower confidence bound"
@@ -94,7 +95,7 @@ class DemandForecastResponse(BaseModel):
 class AnomalyDataPoint(BaseModel):
     """Metric data point for anomaly detection"""
 
-    date: date = Field(..., description="Date of the observation")
+    date: dt.date = Field(..., description="Date of the observation")
     value: float = Field(..., description="Metric value for the date")
     context: Optional[Dict[str, str]] = Field(
         None, description="Optional metadata about the observation"
@@ -124,7 +125,7 @@ class AnomalyDetectionRequest(BaseModel):
 class AnomalyPoint(BaseModel):
     """Detected anomaly output"""
 
-    date: date = Field(..., description="Date flagged as anomalous")
+    date: dt.date = Field(..., description="Date flagged as anomalous")
     value: float = Field(..., description="Observed value")
     deviation_score: float = Field(
         ..., ge=0, description="Absolute z-score like deviation"
@@ -0,0 +1,74 @@
+"""
+Pydantic models for household-level expiry risk scoring
+"""
+
+import datetime as dt
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.expiry_prediction import PackagingType, StorageType
+
+
+class InventoryItem(BaseModel):
+    """One item of a household's inventory"""
+
+    item_id: str = Field(..., description="Food item identifier")
+    product_name: str = Field(..., description="Name of the food product")
+    category: str = Field(..., description="Food category (e.g., fruits, vegetables, dairy)")
+    purchase_date: date = Field(..., description="Date when the product was purchased")
+    storage: StorageType = Field(StorageType.FRIDGE, description="Storage method")
+    packaging: PackagingType = Field(PackagingType.NONE, description="Packaging type")
+    household_usage_rate_per_week: float = Field(
+        1.0,
+        ge=0.0,
+        le=7.0,
+        description="Expected usage rate per week (0-7 times)"
+    )
+
+
+class HouseholdScoringRequest(BaseModel):
+    """Request model for scoring a household's full inventory"""
+
+    household_id: Optional[str] = Field(None, description="Household identifier")
+    items: List[InventoryItem] = Field(..., description="Items currently in the household")
+    as_of: Optional[date] = Field(None, description="Day to score for (defaults to today)")
+    horizon_days: int = Field(
+        3,
+        ge=0,
+        le=30,
+        description="Look-ahead window used for the risk threshold"
+    )
+    min_risk: float = Field(
+        0.5,
+        ge=0.0,
+        le=1.0,
+        description="Minimum spoilage probability at the end of the horizon to report an item"
+    )
+
+
+class ScoredItem(BaseModel):
+    """Expiry risk of one inventory item"""
+
+    item_id: str = Field(..., description="Food item identifier")
+    product_name: str = Field(..., description="Name of the food product")
+    category: str = Field(..., description="Food category")
+    predicted_expiry_date: dt.date = Field(..., description="Predicted expiry date")
+    days_until_expiry: int = Field(..., description="Days from as_of until expiry (negative once expired)")
+    prob_spoiled_today: float = Field(..., ge=0.0, le=1.0, description="Spoilage probability on as_of")
+    prob_spoiled_horizon: float = Field(
+        ..., ge=0.0, le=1.0, description="Spoilage probability at the end of the horizon"
+    )
+
+
+class HouseholdScoringResponse(BaseModel):
+    """At-risk items of one household, most urgent first"""
+
+    household_id: Optional[str] = Field(None, description="Household identifier")
+    as_of: dt.date = Field(..., description="Day the items were scored for")
+    horizon_days: int = Field(..., description="Look-ahead window used for the risk threshold")
+    total_items: int = Field(..., description="Number of items scored")
+    at_risk: List[ScoredItem] = Field(..., description="Items above the risk threshold")
+    model_version: str = Field(..., description="Version of the model used")
+    timestamp: datetime = Field(..., description="When the household was scored")
@@ -28,17 +28,9 @@ class FoodCategory(str, Enum):
     SNACKS = "snacks"
     OTHER = "other"
 
-class ImageClassificationRequest(BaseModel):
-    """Request model for image classification"""
+class ImageClassificationOptions(BaseModel):
+    """Classification options shared by the JSON and binary upload endpoints"""
     
-    image_data: str = Field(
-        ..., 
-        description="Base64 encoded image data or image URL"
-    )
-    image_type: str = Field(
-        "base64", 
-        description="Type of image data (base64, url, file_path)"
-    )
     expected_category: Optional[FoodCategory] = Field(
         None, 
         description="Expected food category for validation"
@@ -51,6 +43,18 @@ class ImageClassificationRequest(BaseModel):
         True, 
         description="Whether to include detailed freshness analysis"
     )
+
+class ImageClassificationRequest(ImageClassificationOptions):
+    """Request model for image classification"""
+    
+    image_data: str = Field(
+        ..., 
+        description="Base64 encoded image data or image URL"
+    )
+    image_type: str = Field(
+        "base64", 
+        description="Type of image data (base64, url, file_path)"
+    )
     
     @validator('image_data')
     def validate_image_data(cls, v):
@@ -0,0 +1,50 @@
+"""
+Pydantic models for recipe suggestions
+"""
+
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, validator
+
+
+class ExpiringIngredient(BaseModel):
+    """An item that should be used soon"""
+
+    name: str = Field(..., description="Item name as shown in the inventory")
+    expiry_date: Optional[date] = Field(None, description="Expiry or predicted expiry date")
+    prob_spoiled: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="Current spoilage probability"
+    )
+
+
+class RecipeSuggestionRequest(BaseModel):
+    """Request model for recipe suggestions"""
+
+    expiring_items: List[ExpiringIngredient] = Field(
+        ...,
+        max_items=500,
+        description="Items to use up; plain names are accepted and get a default urgency"
+    )
+    pantry_items: List[str] = Field(
+        default_factory=list,
+        max_items=2000,
+        description="Other items on hand, which count toward ingredient coverage"
+    )
+    dietary_preferences: Optional[List[str]] = Field(default_factory=list, description="Dietary preferences")
+    as_of: Optional[date] = Field(None, description="Day expiry dates are measured from (defaults to today)")
+
+    @validator('expiring_items', pre=True)
+    def accept_item_names(cls, v):
+        """Allow ``["spinach", ...]`` as well as ``[{"name": "spinach", ...}, ...]``"""
+        if isinstance(v, list):
+            return [{"name": item} if isinstance(item, str) else item for item in v]
+        return v
+
+    @validator('dietary_preferences', pre=True, always=True)
+    def null_preferences_as_empty(cls, v):
+        """Treat ``null`` as no preferences"""
+        return [] if v is None else v
@@ -0,0 +1,133 @@
+"""
+Async micro-batching of model inference calls
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-item requests into one vectorized model call.
+
+    Callers ``await submit(item)``. A background task takes the first queued
+    item, keeps collecting until ``max_batch`` items are queued or
+    ``max_wait_ms`` has passed, then runs ``predict_batch(items)`` on a
+    dedicated inference thread and resolves each caller with its own result.
+    While a batch is running new requests queue up, so batch sizes grow with
+    load and stay at 1 (with no added wait beyond ``max_wait_ms``) when idle.
+
+    ``predict_batch`` must return one result per input, in order. Batch sizes
+    and per-item queue waits are reported to ``monitoring.record_batch``.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int,
+        max_wait_ms: float,
+        name: str = "model",
+        monitoring=None,
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.name = name
+        self.monitoring = monitoring
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _ensure_started(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._executor = self._executor or ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"{self.name}-inference"
+            )
+            self._worker = asyncio.create_task(self._run(), name=f"{self.name}-batcher")
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one input and wait for its slice of the batched prediction"""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Drop callers that gave up (e.g. client disconnects) before running
+            batch = [entry for entry in batch if not entry[1].done()]
+            if not batch:
+                continue
+
+            if self.monitoring is not None:
+                started = time.perf_counter()
+                self.monitoring.record_batch(
+                    self.name,
+                    len(batch),
+                    [(started - enqueued) * 1000 for _, _, enqueued in batch],
+                )
+
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.predict_batch, [item for item, _, _ in batch]
+                )
+            except asyncio.CancelledError:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError(f"{self.name} batcher stopped"))
+                raise
+            except Exception as e:
+                logger.error(f"Batched {self.name} inference failed for {len(batch)} items: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def stop(self) -> None:
+        """Cancel the worker, failing anything still queued, and release the thread"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future, _ = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError(f"{self.name} batcher stopped"))
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -2,20 +2,32 @@
 Cache service for ML predictions and data
 """
 
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, Tuple
+import asyncio
 import json
 import logging
+import time
 from datetime import datetime, timedelta
 
+from app.core.config import settings
 from app.core.redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 
+# Lifetime of a user's cache version counter; must outlive any user-scoped entry
+USER_VERSION_TTL = 7 * 24 * 3600
+
+
 class CacheService:
     """Service for caching ML predictions and data"""
     
     def __init__(self):
         self.redis = None
+        # Last health result and when it was taken; probes share one INFO call
+        self._health: Optional[Dict[str, Any]] = None
+        self._health_checked_at = 0.0
+        # Created on first use: on Python 3.9 a Lock binds to the loop current at construction
+        self._health_lock: Optional[asyncio.Lock] = None
     
     async def initialize(self):
         """Initialize cache service"""
@@ -66,14 +78,20 @@ class CacheService:
             return False
     
     async def health_check(self) -> Dict[str, Any]:
-        """Check cache health"""
+        """Check cache health, reusing the last result for REDIS_HEALTH_CACHE_SECONDS"""
         if not self.redis:
             return {"status": "disconnected", "error": "Redis not initialized"}
         
-        try:
-            return await self.redis.health_check()
-        except Exception as e:
-            return {"status": "error", "error": str(e)}
+        if self._health_lock is None:
+            self._health_lock = asyncio.Lock()
+        async with self._health_lock:
+            if self._health is None or time.monotonic() - self._health_checked_at >= settings.REDIS_HEALTH_CACHE_SECONDS:
+                try:
+                    self._health = await self.redis.health_check()
+                except Exception as e:
+                    self._health = {"status": "error", "error": str(e)}
+                self._health_checked_at = time.monotonic()
+            return self._health
     
     def generate_cache_key(self, prefix: str, **kwargs) -> str:
         """Generate cache key from parameters"""
@@ -102,16 +120,38 @@ class CacheService:
         key = f"model:{model_name}:{input_hash}"
         return await self.get(key)
     
+    def _user_version_key(self, user_id: str) -> str:
+        return f"user_cache_version:{user_id}"
+
+    async def get_user_cached(self, user_id: str, key: str) -> Tuple[Optional[Any], int]:
+        """Get a user-scoped value and the user's current cache version.
+
+        Entries are stored with the version they were computed under, and
+        ``invalidate_user_cache`` bumps the version, so stale entries read as
+        misses. Pass the returned version to ``set_user_cached``.
+        """
+        if not self.redis:
+            return None, 0
+
+        version, entry = await self.redis.get_many([self._user_version_key(user_id), f"user:{user_id}:{key}"])
+        version = int(version or 0)
+        if isinstance(entry, dict) and entry.get("version") == version:
+            return entry.get("value"), version
+        return None, version
+
+    async def set_user_cached(self, user_id: str, key: str, value: Any, version: int, ttl: Optional[int] = None) -> bool:
+        """Cache a user-scoped value computed under cache ``version``"""
+        return await self.set(f"user:{user_id}:{key}", {"version": version, "value": value}, ttl)
+
     async def invalidate_user_cache(self, user_id: str) -> bool:
-        """Invalidate all cache entries for a user"""
+        """Invalidate all cache entries for a user by bumping their version counter"""
         if not self.redis:
             return False
         
         try:
-            # This would need to be implemented based on your cache key structure
-            # For now, we'll just return True
-            logger.info(f"Invalidating cache for user {user_id}")
-            return True
+            version = await self.redis.incr(self._user_version_key(user_id), ttl=USER_VERSION_TTL)
+            logger.info(f"Invalidated cache for user {user_id} (version {version})")
+            return version is not None
         except Exception as e:
             logger.error(f"Error invalidating user cache: {e}")
             return False
@@ -0,0 +1,105 @@
+"""
+Load-aware selection of cheaper inference tiers under overload
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+TIER_FULL = 0  # trained model, full-resolution inputs, full outputs
+TIER_REDUCED = 1  # rule-based models
+TIER_MINIMAL = 2  # rule-based on thumbnails, no per-day spoilage curve
+TIER_NAMES = ("full", "reduced", "minimal")
+
+# Routes whose admission queues signal load for each task
+TASK_ROUTES: Dict[str, Tuple[str, ...]] = {
+    "expiry": ("/predict-expiry",),
+    "image": ("/classify-image", "/classify-image/upload"),
+}
+
+# Event-loop CPU usage is re-sampled at most this often
+_CPU_SAMPLE_SECONDS = 0.5
+
+
+def tier_version(model_version: str, tier: int) -> str:
+    """Model version string that records the tier a response was served from"""
+    return model_version if tier == TIER_FULL else f"{model_version}+{TIER_NAMES[tier]}"
+
+
+class DegradationPolicy:
+    """Chooses the serving tier per task from queue pressure and CPU usage.
+
+    Queue pressure is the larger of a route's queue fill ratio and its
+    expected queue wait relative to the admission deadline. CPU usage is the
+    event-loop thread's CPU time over wall time, as a percentage of the one
+    core that thread can use; inference threads (``to_thread``, the batcher,
+    torch intra-op pools) are not counted. Crossing either "reduced" threshold
+    serves the rule-based tier; crossing either "minimal" threshold serves the
+    cheapest.
+    """
+
+    def __init__(self, admission_controller=None):
+        self.admission = admission_controller
+        self._cpu_thread: Optional[int] = None
+        self._cpu_time = 0.0
+        self._cpu_sampled_at = 0.0
+        self._cpu_percent = 0.0
+        self._served: Dict[str, list] = {}
+
+    def cpu_percent(self) -> float:
+        """CPU usage of the calling (event-loop) thread, in percent of one core"""
+        now = time.monotonic()
+        thread = threading.get_ident()
+        if thread != self._cpu_thread:
+            # thread_time() is per thread: restart the window on a new thread
+            self._cpu_thread = thread
+            self._cpu_time, self._cpu_sampled_at = time.thread_time(), now
+            return self._cpu_percent
+        elapsed = now - self._cpu_sampled_at
+        if elapsed >= _CPU_SAMPLE_SECONDS:
+            cpu_time = time.thread_time()
+            self._cpu_percent = (cpu_time - self._cpu_time) / elapsed * 100
+            self._cpu_time, self._cpu_sampled_at = cpu_time, now
+        return self._cpu_percent
+
+    def queue_pressure(self, task: str) -> float:
+        if self.admission is None:
+            return 0.0
+        pressure = 0.0
+        for path in TASK_ROUTES.get(task, ()):
+            limiter = self.admission.get(path)
+            if limiter is not None:
+                pressure = max(pressure, limiter.pressure())
+        return pressure
+
+    def tier(self, task: str) -> int:
+        """Tier to serve the next request of ``task`` from"""
+        if not settings.DEGRADATION_ENABLED:
+            selected = TIER_FULL
+        else:
+            pressure = self.queue_pressure(task)
+            cpu = self.cpu_percent()
+            if pressure >= settings.DEGRADE_MINIMAL_PRESSURE or cpu >= settings.DEGRADE_MINIMAL_CPU_PERCENT:
+                selected = TIER_MINIMAL
+            elif pressure >= settings.DEGRADE_REDUCED_PRESSURE or cpu >= settings.DEGRADE_REDUCED_CPU_PERCENT:
+                selected = TIER_REDUCED
+            else:
+                selected = TIER_FULL
+
+        served = self._served.get(task)
+        if served is None:
+            served = self._served[task] = [0] * len(TIER_NAMES)
+        served[selected] += 1
+        return selected
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.DEGRADATION_ENABLED,
+            "cpu_percent": round(self._cpu_percent, 1),
+            "queue_pressure": {task: round(self.queue_pressure(task), 3) for task in TASK_ROUTES},
+            "served": {
+                task: dict(zip(TIER_NAMES, counts)) for task, counts in self._served.items()
+            },
+        }
@@ -0,0 +1,273 @@
+"""
+Precomputed lookup tables for the rule-based expiry engine
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+
+from app.models.expiry_prediction import PackagingType, SpoilageDataPoint, StorageType
+
+# Base shelf life by category (in days); unknown categories behave like "other"
+CATEGORY_SHELF_LIFE = {
+    'fruits': 7,
+    'vegetables': 10,
+    'dairy': 14,
+    'meat': 5,
+    'seafood': 3,
+    'bakery': 3,
+    'grains': 365,
+    'beverages': 365,
+    'snacks': 30,
+    'other': 7
+}
+
+STORAGE_MULTIPLIERS = {
+    'fridge': 1.0,
+    'freezer': 3.0,
+    'pantry': 0.8,
+    'counter': 0.6,
+    'outside': 0.4
+}
+
+PACKAGING_MULTIPLIERS = {
+    'vacuum': 1.5,
+    'glass': 1.2,
+    'metal': 1.1,
+    'plastic': 1.0,
+    'paper': 0.8,
+    'clamshell': 0.9,
+    'none': 0.7
+}
+
+KNOWN_CATEGORIES = ('fruits', 'vegetables', 'dairy', 'meat', 'seafood', 'bakery')
+
+CATEGORIES = tuple(CATEGORY_SHELF_LIFE)
+CATEGORY_INDEX = {category: i for i, category in enumerate(CATEGORIES)}
+OTHER_INDEX = CATEGORY_INDEX['other']
+STORAGE_INDEX = {storage: i for i, storage in enumerate(StorageType)}
+PACKAGING_INDEX = {packaging: i for i, packaging in enumerate(PackagingType)}
+
+# Usage rates 0.00-7.00 per week on a 0.01 grid
+USAGE_STEPS_PER_UNIT = 100
+USAGE_GRID = np.arange(7 * USAGE_STEPS_PER_UNIT + 1) / USAGE_STEPS_PER_UNIT
+
+# Recommendation IDs are bit positions in a mask, in the order they are listed
+REC_REFRIGERATE = 1 << 0
+REC_SLOW_RIPENING = 1 << 1
+REC_FREEZE_EXCESS = 1 << 2
+REC_USE_SOON = 1 << 3
+REC_AIRTIGHT = 1 << 4
+RECOMMENDATION_TEXTS = (
+    "Store in refrigerator to extend shelf life",
+    "Consider refrigerating to slow ripening",
+    "Consider freezing excess portions to prevent waste",
+    "Use within the next few days or freeze for later use",
+    "Store in airtight container to maintain freshness",
+)
+DEFAULT_RECOMMENDATION = "Store properly and monitor for signs of spoilage"
+RECOMMENDATION_SETS: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(text for bit, text in enumerate(RECOMMENDATION_TEXTS) if mask & (1 << bit)) or (DEFAULT_RECOMMENDATION,)
+    for mask in range(1 << len(RECOMMENDATION_TEXTS))
+)
+
+# Spoilage probability from three days past expiry onwards
+MAX_SPOILAGE_PROBABILITY = 0.95
+
+
+def _usage_factor(usage_rate):
+    """Higher usage = shorter shelf life; works on floats and arrays"""
+    return np.maximum(0.5, 1.0 - (usage_rate * 0.1))
+
+
+class ExpiryTable:
+    """Rule-engine outputs for every (category, storage, packaging, usage) cell.
+
+    ``predicted_days`` has shape (category, storage, packaging, usage step) and
+    is computed with the same float operations as the scalar rules, so table
+    hits match them exactly. Usage rates off the 0.01 grid fall back to the
+    formula. Batch callers can fancy-index the arrays directly.
+    """
+
+    def __init__(self):
+        base = np.array([CATEGORY_SHELF_LIFE[c] for c in CATEGORIES], dtype=np.float64)
+        storage = np.array([STORAGE_MULTIPLIERS[s.value] for s in StorageType], dtype=np.float64)
+        packaging = np.array([PACKAGING_MULTIPLIERS[p.value] for p in PackagingType], dtype=np.float64)
+
+        self.base_shelf_life = base.astype(np.int16)
+        self.predicted_days = (
+            base[:, None, None, None]
+            * storage[None, :, None, None]
+            * packaging[None, None, :, None]
+            * _usage_factor(USAGE_GRID)[None, None, None, :]
+        ).astype(np.int16)
+
+        known = np.array([c in KNOWN_CATEGORIES for c in CATEGORIES])
+        self.confidence_base = np.where(known, 0.7, 0.5)
+        storage_values = [s.value for s in StorageType]
+        self.freezer_penalty = np.zeros((len(CATEGORIES), len(storage_values)), dtype=bool)
+        self.freezer_penalty[
+            [CATEGORY_INDEX['fruits'], CATEGORY_INDEX['vegetables']], storage_values.index('freezer')
+        ] = True
+
+        # Recommendation bits that depend only on category/storage/packaging
+        static = np.zeros((len(CATEGORIES), len(storage_values), len(PackagingType)), dtype=np.uint8)
+        counter = storage_values.index('counter')
+        pantry = storage_values.index('pantry')
+        static[[CATEGORY_INDEX['dairy'], CATEGORY_INDEX['meat']], counter, :] |= REC_REFRIGERATE
+        static[[CATEGORY_INDEX['fruits'], CATEGORY_INDEX['vegetables']], pantry, :] |= REC_SLOW_RIPENING
+        static[:, :, PACKAGING_INDEX[PackagingType.NONE]] |= REC_AIRTIGHT
+        self.static_recommendations = static
+
+    @staticmethod
+    def category_index(category: str) -> int:
+        return CATEGORY_INDEX.get(category.lower(), OTHER_INDEX)
+
+    @staticmethod
+    def usage_index(usage_rate: float) -> int:
+        """Grid index of a usage rate, or -1 if it is not exactly on the grid"""
+        index = int(round(usage_rate * USAGE_STEPS_PER_UNIT))
+        if 0 <= index < USAGE_GRID.size and USAGE_GRID[index] == usage_rate:
+            return index
+        return -1
+
+    def shelf_life(
+        self,
+        category: str,
+        storage: StorageType,
+        packaging: PackagingType,
+        usage_rate: float,
+    ) -> Tuple[int, int]:
+        """Base category shelf life and rule-adjusted predicted shelf life in days"""
+        c = self.category_index(category)
+        s = STORAGE_INDEX[storage]
+        p = PACKAGING_INDEX[packaging]
+        u = self.usage_index(usage_rate)
+        if u >= 0:
+            return int(self.base_shelf_life[c]), int(self.predicted_days[c, s, p, u])
+
+        base = CATEGORY_SHELF_LIFE[CATEGORIES[c]]
+        factor = float(_usage_factor(usage_rate))
+        days = int(base * STORAGE_MULTIPLIERS[storage.value] * PACKAGING_MULTIPLIERS[packaging.value] * factor)
+        return base, days
+
+    def confidence(
+        self,
+        category: str,
+        storage: StorageType,
+        temperature_known: bool,
+        humidity_known: bool,
+        has_brand: bool,
+    ) -> float:
+        """Confidence score, accumulated in the same order as the original rules"""
+        c = self.category_index(category)
+        confidence = float(self.confidence_base[c])
+        if temperature_known:
+            confidence += 0.1
+        if humidity_known:
+            confidence += 0.1
+        if has_brand:
+            confidence += 0.05
+        if self.freezer_penalty[c, STORAGE_INDEX[storage]]:
+            confidence -= 0.1
+        return min(0.95, max(0.1, confidence))
+
+    def recommendation_mask(
+        self,
+        category: str,
+        storage: StorageType,
+        packaging: PackagingType,
+        usage_rate: float,
+        shelf_life_days: int,
+    ) -> int:
+        mask = int(self.static_recommendations[
+            self.category_index(category), STORAGE_INDEX[storage], PACKAGING_INDEX[packaging]
+        ])
+        if usage_rate < 0.5:
+            mask |= REC_FREEZE_EXCESS
+        if shelf_life_days < 7:
+            mask |= REC_USE_SOON
+        return mask
+
+    def recommendations(self, *args) -> List[str]:
+        """Recommendation texts for ``recommendation_mask(*args)``"""
+        return list(RECOMMENDATION_SETS[self.recommendation_mask(*args)])
+
+    def predicted_days_batch(
+        self,
+        category_idx: np.ndarray,
+        storage_idx: np.ndarray,
+        packaging_idx: np.ndarray,
+        usage_rates: np.ndarray,
+    ) -> np.ndarray:
+        """Vectorized ``shelf_life`` over index arrays (off-grid rates use the formula)"""
+        usage_idx = np.rint(usage_rates * USAGE_STEPS_PER_UNIT).astype(np.intp)
+        np.clip(usage_idx, 0, USAGE_GRID.size - 1, out=usage_idx)
+        days = self.predicted_days[category_idx, storage_idx, packaging_idx, usage_idx].astype(np.int64)
+
+        off_grid = USAGE_GRID[usage_idx] != usage_rates
+        if off_grid.any():
+            base = self.base_shelf_life.astype(np.float64)[category_idx[off_grid]]
+            storage = np.array([STORAGE_MULTIPLIERS[s.value] for s in StorageType])[storage_idx[off_grid]]
+            packaging = np.array([PACKAGING_MULTIPLIERS[p.value] for p in PackagingType])[packaging_idx[off_grid]]
+            days[off_grid] = (base * storage * packaging * _usage_factor(usage_rates[off_grid])).astype(np.int64)
+        return days
+
+
+@lru_cache(maxsize=2048)
+def spoilage_probabilities(shelf_life_days: int) -> Tuple[float, ...]:
+    """Daily spoilage probabilities from purchase until two days past expiry"""
+    probabilities = []
+    for days_from_purchase in range(shelf_life_days + 3):
+        if days_from_purchase <= shelf_life_days * 0.7:
+            # Low probability in first 70% of shelf life
+            prob_spoiled = 0.01 * (days_from_purchase / (shelf_life_days * 0.7)) if shelf_life_days else 0.0
+        elif days_from_purchase <= shelf_life_days:
+            # Rapid increase in last 30% of shelf life
+            remaining_days = shelf_life_days - days_from_purchase
+            total_remaining = shelf_life_days * 0.3
+            prob_spoiled = 0.1 + (0.4 * (1 - remaining_days / total_remaining))
+        else:
+            # High probability after expiry
+            days_past_expiry = days_from_purchase - shelf_life_days
+            prob_spoiled = min(MAX_SPOILAGE_PROBABILITY, 0.5 + (0.45 * min(days_past_expiry / 3, 1.0)))
+        probabilities.append(round(prob_spoiled, 3))
+    return tuple(probabilities)
+
+
+@lru_cache(maxsize=2048)
+def _probability_array(shelf_life_days: int) -> np.ndarray:
+    probabilities = np.array(spoilage_probabilities(shelf_life_days))
+    probabilities.flags.writeable = False
+    return probabilities
+
+
+def spoilage_probability_batch(days_from_purchase: np.ndarray, shelf_life_days: np.ndarray) -> np.ndarray:
+    """Spoilage probability for each (days since purchase, shelf life) pair.
+
+    Values are read from the same cached curves as ``spoilage_curve``; days
+    before purchase count as day 0 and days past the end of a curve get the
+    rules' saturated post-expiry probability.
+    """
+    days_from_purchase = np.asarray(days_from_purchase)
+    shelf_life_days = np.maximum(np.asarray(shelf_life_days), 0)
+    probabilities = np.empty(shelf_life_days.shape, dtype=np.float64)
+    for shelf_life in np.unique(shelf_life_days):
+        rows = shelf_life_days == shelf_life
+        curve = _probability_array(int(shelf_life))
+        days = days_from_purchase[rows]
+        probabilities[rows] = np.where(
+            days < curve.size, curve[np.clip(days, 0, curve.size - 1)], MAX_SPOILAGE_PROBABILITY
+        )
+    return probabilities
+
+
+@lru_cache(maxsize=4096)
+def spoilage_curve(purchase_date: date, shelf_life_days: int) -> Tuple[SpoilageDataPoint, ...]:
+    """Spoilage curve points, shared by reference between responses with the same inputs"""
+    return tuple(
+        SpoilageDataPoint(date=purchase_date + timedelta(days=offset), prob_spoiled=prob_spoiled)
+        for offset, prob_spoiled in enumerate(spoilage_probabilities(shelf_life_days))
+    )
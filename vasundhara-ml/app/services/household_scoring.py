@@ -0,0 +1,291 @@
+"""
+Vectorized expiry risk scoring of whole household inventories
+"""
+
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.expiry_prediction import PackagingType, StorageType
+from app.models.household import HouseholdScoringResponse, InventoryItem, ScoredItem
+from app.services.expiry_table import (
+    PACKAGING_INDEX,
+    STORAGE_INDEX,
+    ExpiryTable,
+    spoilage_probability_batch,
+)
+from app.services.monitoring_service import MonitoringService
+
+logger = logging.getLogger(__name__)
+
+RULES_MODEL_VERSION = "1.0.0-rule-based"
+
+# Collection the API's FoodItem model is stored in
+FOOD_ITEMS_COLLECTION = "fooditems"
+# Food items in these statuses have left the household's inventory
+INACTIVE_STATUSES = ["consumed", "wasted"]
+FOOD_ITEM_PROJECTION = {
+    "name": 1,
+    "category": 1,
+    "household": 1,
+    "purchaseDate": 1,
+    "storage": 1,
+    "packaging": 1,
+    "usageRate": 1,
+}
+
+# Schema defaults of the API's FoodItem model
+DEFAULT_STORAGE_INDEX = STORAGE_INDEX[StorageType.FRIDGE]
+DEFAULT_PACKAGING_INDEX = PACKAGING_INDEX[PackagingType.NONE]
+DEFAULT_USAGE_RATE = 1.0
+
+
+class InventoryBatch:
+    """Column lists of inventory items, converted to arrays for one scoring pass"""
+
+    def __init__(self, table: ExpiryTable):
+        self.table = table
+        self.households: List[Optional[str]] = []
+        self.item_ids: List[str] = []
+        self.names: List[str] = []
+        self.categories: List[str] = []
+        self.category_idx: List[int] = []
+        self.storage_idx: List[int] = []
+        self.packaging_idx: List[int] = []
+        self.usage_rates: List[float] = []
+        self.purchase_ordinals: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def _append(
+        self,
+        household: Optional[str],
+        item_id: str,
+        name: str,
+        category: str,
+        storage: int,
+        packaging: int,
+        usage_rate: float,
+        purchase_date: date,
+    ) -> None:
+        self.households.append(household)
+        self.item_ids.append(item_id)
+        self.names.append(name)
+        self.categories.append(category)
+        self.category_idx.append(self.table.category_index(category))
+        self.storage_idx.append(storage)
+        self.packaging_idx.append(packaging)
+        self.usage_rates.append(usage_rate)
+        self.purchase_ordinals.append(purchase_date.toordinal())
+
+    def add_item(self, item: InventoryItem, household: Optional[str] = None) -> None:
+        self._append(
+            household,
+            item.item_id,
+            item.product_name,
+            item.category,
+            STORAGE_INDEX[item.storage],
+            PACKAGING_INDEX[item.packaging],
+            item.household_usage_rate_per_week,
+            item.purchase_date,
+        )
+
+    def add_document(self, doc: Dict[str, Any]) -> bool:
+        """Add a ``fooditems`` document; returns False if it cannot be scored"""
+        purchase_date = doc.get("purchaseDate")
+        if isinstance(purchase_date, datetime):
+            purchase_date = purchase_date.date()
+        if not isinstance(purchase_date, date):
+            return False
+
+        usage_rate = doc.get("usageRate")
+        if not isinstance(usage_rate, (int, float)):
+            usage_rate = DEFAULT_USAGE_RATE
+        self._append(
+            str(doc.get("household")),
+            str(doc.get("_id")),
+            doc.get("name") or "",
+            doc.get("category") or "other",
+            STORAGE_INDEX.get(doc.get("storage"), DEFAULT_STORAGE_INDEX),
+            PACKAGING_INDEX.get(doc.get("packaging"), DEFAULT_PACKAGING_INDEX),
+            min(7.0, max(0.0, float(usage_rate))),
+            purchase_date,
+        )
+        return True
+
+
+class HouseholdRiskScorer:
+    """Scores many inventory items in one pass over the precomputed expiry table.
+
+    Shelf life comes from ``ExpiryTable.predicted_days_batch`` and spoilage
+    probabilities from the cached rule-engine curves, so results agree with
+    the rule-based ``/predict-expiry`` path item for item.
+    """
+
+    def __init__(self, expiry_table: ExpiryTable, monitoring_service: Optional[MonitoringService] = None):
+        self.table = expiry_table
+        self.monitoring = monitoring_service
+
+    def score_batch(self, batch: InventoryBatch, as_of: date, horizon_days: int) -> Dict[str, np.ndarray]:
+        """Shelf life, expiry, days left and spoilage probabilities for every row"""
+        shelf_life = self.table.predicted_days_batch(
+            np.array(batch.category_idx, dtype=np.intp),
+            np.array(batch.storage_idx, dtype=np.intp),
+            np.array(batch.packaging_idx, dtype=np.intp),
+            np.array(batch.usage_rates, dtype=np.float64),
+        )
+        purchased = np.array(batch.purchase_ordinals, dtype=np.int64)
+        age = as_of.toordinal() - purchased
+        return {
+            "shelf_life": shelf_life,
+            "expiry_ordinal": purchased + shelf_life,
+            "days_left": shelf_life - age,
+            "today": spoilage_probability_batch(age, shelf_life),
+            "horizon": spoilage_probability_batch(age + horizon_days, shelf_life),
+        }
+
+    def _at_risk(
+        self,
+        batch: InventoryBatch,
+        scores: Dict[str, np.ndarray],
+        start: int,
+        stop: int,
+        min_risk: float,
+    ) -> List[ScoredItem]:
+        """Items in rows [start, stop) above ``min_risk``, soonest expiry first"""
+        rows = start + np.flatnonzero(scores["horizon"][start:stop] >= min_risk)
+        rows = rows[np.lexsort((-scores["today"][rows], scores["days_left"][rows]))]
+        return [
+            ScoredItem(
+                item_id=batch.item_ids[row],
+                product_name=batch.names[row],
+                category=batch.categories[row],
+                predicted_expiry_date=date.fromordinal(int(scores["expiry_ordinal"][row])),
+                days_until_expiry=int(scores["days_left"][row]),
+                prob_spoiled_today=float(scores["today"][row]),
+                prob_spoiled_horizon=float(scores["horizon"][row]),
+            )
+            for row in rows
+        ]
+
+    def _responses(
+        self,
+        batch: InventoryBatch,
+        as_of: date,
+        horizon_days: int,
+        min_risk: float,
+        include_empty: bool,
+    ) -> Iterator[HouseholdScoringResponse]:
+        """Score a batch in one pass and split it at household boundaries"""
+        scores = self.score_batch(batch, as_of, horizon_days)
+        timestamp = datetime.utcnow()
+        households = batch.households
+        start = 0
+        for stop in range(1, len(batch) + 1):
+            if stop < len(batch) and households[stop] == households[start]:
+                continue
+            at_risk = self._at_risk(batch, scores, start, stop, min_risk)
+            if at_risk or include_empty:
+                yield HouseholdScoringResponse(
+                    household_id=households[start],
+                    as_of=as_of,
+                    horizon_days=horizon_days,
+                    total_items=stop - start,
+                    at_risk=at_risk,
+                    model_version=RULES_MODEL_VERSION,
+                    timestamp=timestamp,
+                )
+            start = stop
+
+    def score_household(
+        self,
+        household_id: Optional[str],
+        items: Sequence[InventoryItem],
+        as_of: Optional[date] = None,
+        horizon_days: int = 3,
+        min_risk: float = 0.5,
+    ) -> HouseholdScoringResponse:
+        """Score one household's full inventory"""
+        start_time = time.perf_counter()
+        as_of = as_of or date.today()
+        batch = InventoryBatch(self.table)
+        for item in items:
+            batch.add_item(item, household_id)
+
+        if batch:
+            response = next(self._responses(batch, as_of, horizon_days, min_risk, include_empty=True))
+        else:
+            response = HouseholdScoringResponse(
+                household_id=household_id,
+                as_of=as_of,
+                horizon_days=horizon_days,
+                total_items=0,
+                at_risk=[],
+                model_version=RULES_MODEL_VERSION,
+                timestamp=datetime.utcnow(),
+            )
+        self._record("score_household", start_time, len(batch))
+        return response
+
+    async def stream_households(
+        self,
+        collection,
+        as_of: Optional[date] = None,
+        horizon_days: int = 3,
+        min_risk: float = 0.5,
+        include_empty: bool = False,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[HouseholdScoringResponse]:
+        """Walk every active ``fooditems`` document grouped by household.
+
+        Documents are read in household order (served by the API's
+        ``{household, status}`` index) and scored ``batch_size`` items at a
+        time; a batch is only cut at a household boundary so every household
+        is scored whole.
+        """
+        as_of = as_of or date.today()
+        batch_size = batch_size or settings.HOUSEHOLD_STREAM_BATCH_SIZE
+        cursor = collection.find(
+            {"status": {"$nin": INACTIVE_STATUSES}},
+            FOOD_ITEM_PROJECTION,
+        ).sort("household", 1).batch_size(batch_size)
+
+        batch = InventoryBatch(self.table)
+        skipped = 0
+        async for doc in cursor:
+            if len(batch) >= batch_size and str(doc.get("household")) != batch.households[-1]:
+                for response in self._score_stream_batch(batch, as_of, horizon_days, min_risk, include_empty):
+                    yield response
+                batch = InventoryBatch(self.table)
+            if not batch.add_document(doc):
+                skipped += 1
+
+        if batch:
+            for response in self._score_stream_batch(batch, as_of, horizon_days, min_risk, include_empty):
+                yield response
+        if skipped:
+            logger.warning(f"Skipped {skipped} food items without a valid purchase date")
+
+    def _score_stream_batch(
+        self,
+        batch: InventoryBatch,
+        as_of: date,
+        horizon_days: int,
+        min_risk: float,
+        include_empty: bool,
+    ) -> List[HouseholdScoringResponse]:
+        start_time = time.perf_counter()
+        responses = list(self._responses(batch, as_of, horizon_days, min_risk, include_empty))
+        self._record("score_households", start_time, len(batch))
+        return responses
+
+    def _record(self, operation: str, start_time: float, items: int) -> None:
+        if not self.monitoring:
+            return
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        self.monitoring.record_inference_nowait("expiry", operation, latency_ms, "success", {"items": items})
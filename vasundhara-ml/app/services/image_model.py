@@ -0,0 +1,120 @@
+"""
+CPU inference backends for the CNN food category and freshness classifier
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.image_classification import FoodCategory, FreshnessLevel
+
+logger = logging.getLogger(__name__)
+
+# Output layout of the network: one logit per category, then one per freshness level
+CATEGORIES: List[FoodCategory] = list(FoodCategory)
+FRESHNESS_LEVELS: List[FreshnessLevel] = list(FreshnessLevel)
+NUM_OUTPUTS = len(CATEGORIES) + len(FRESHNESS_LEVELS)
+
+# ImageNet statistics the MobileNet backbone was pretrained with
+_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+# (category probabilities, freshness probabilities) for one image
+ImageScores = Tuple[np.ndarray, np.ndarray]
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class FreshnessClassifier:
+    """MobileNetV3-Small with a joint category + freshness head.
+
+    ``predict_batch`` takes float32 HWC images scaled to [0, 1] (the output of
+    ``MLService._normalize_pixels``) and returns per-image probabilities. It is
+    blocking and meant to run on ``MicroBatcher``'s inference thread.
+    """
+
+    backend = "none"
+
+    def __init__(self, version: str):
+        self.version = version
+
+    def predict_batch(self, images: List[np.ndarray]) -> List[ImageScores]:
+        batch = (np.stack(images) - _MEAN) / _STD  # NHWC
+        logits = self._forward(batch.astype(np.float32, copy=False))
+        category_probs = _softmax(logits[:, :len(CATEGORIES)])
+        freshness_probs = _softmax(logits[:, len(CATEGORIES):])
+        return list(zip(category_probs, freshness_probs))
+
+    def _forward(self, batch_nhwc: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+
+class TorchFreshnessClassifier(FreshnessClassifier):
+    """PyTorch eager backend: channels-last, inference mode, optional dynamic int8"""
+
+    backend = "torch"
+
+    def __init__(self, weights_path: str, version: str):
+        super().__init__(version)
+        import torch
+        from torchvision.models import mobilenet_v3_small
+
+        self._torch = torch
+        if settings.IMAGE_MODEL_THREADS > 0:
+            torch.set_num_threads(settings.IMAGE_MODEL_THREADS)
+
+        model = mobilenet_v3_small(weights=None, num_classes=NUM_OUTPUTS)
+        model.load_state_dict(torch.load(weights_path, map_location="cpu"))
+        model.eval()
+        if settings.IMAGE_MODEL_QUANTIZE:
+            # Only the Linear classifier layers are quantized; convolutions stay fp32
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model.to(memory_format=torch.channels_last)
+
+    def _forward(self, batch_nhwc: np.ndarray) -> np.ndarray:
+        # Permuting a contiguous NHWC array gives an NCHW tensor that is already channels-last
+        tensor = self._torch.from_numpy(batch_nhwc).permute(0, 3, 1, 2)
+        with self._torch.inference_mode():
+            return self.model(tensor).numpy()
+
+
+class OnnxFreshnessClassifier(FreshnessClassifier):
+    """ONNX Runtime backend for a graph exported from the torch model (NCHW input)"""
+
+    backend = "onnx"
+
+    def __init__(self, model_path: str, version: str):
+        super().__init__(version)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if settings.IMAGE_MODEL_THREADS > 0:
+            options.intra_op_num_threads = settings.IMAGE_MODEL_THREADS
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _forward(self, batch_nhwc: np.ndarray) -> np.ndarray:
+        batch_nchw = np.ascontiguousarray(batch_nhwc.transpose(0, 3, 1, 2))
+        return self.session.run(None, {self.input_name: batch_nchw})[0]
+
+
+def load_freshness_classifier(backend: str, path: str, version: str) -> Optional[FreshnessClassifier]:
+    """Build the configured backend, or None if its runtime is not installed"""
+    try:
+        if backend == "torch":
+            return TorchFreshnessClassifier(path, version)
+        if backend == "onnx":
+            return OnnxFreshnessClassifier(path, version)
+    except ImportError as e:
+        logger.warning(f"Image model backend '{backend}' is unavailable: {e}")
+        return None
+
+    raise ValueError(f"Unsupported image model backend: {backend}")
@@ -0,0 +1,105 @@
+"""
+Cross-replica aggregation of inference metrics through Redis.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+from app.services.monitoring_service import MonitoringService, merge_counters, summarize_counters
+
+logger = logging.getLogger(__name__)
+
+INSTANCE_REGISTRY_KEY = "metrics:instances"
+
+
+class MetricsAggregator:
+    """Flush per-process counters to Redis on a timer and merge the fleet view.
+
+    Each process owns one hash (``metrics:instance:<host>:<pid>``) holding its
+    cumulative counters and histogram buckets, refreshed every
+    ``MONITORING_FLUSH_INTERVAL`` seconds with a TTL so dead replicas drop out.
+    Inference paths never touch Redis.
+    """
+
+    def __init__(
+        self,
+        monitoring: MonitoringService,
+        redis_client: RedisClient,
+        interval_seconds: Optional[float] = None,
+    ):
+        self.monitoring = monitoring
+        self.redis = redis_client
+        self.interval_seconds = interval_seconds or settings.MONITORING_FLUSH_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+        self.last_flush: Optional[datetime] = None
+
+    async def start(self) -> None:
+        """Start the periodic flush loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Metrics flush started (every {self.interval_seconds}s)")
+
+    async def stop(self) -> None:
+        """Stop the flush loop and publish a final snapshot"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Metrics flush failed: {e}")
+
+    async def flush(self) -> bool:
+        """Publish this process' counters and register it in the fleet"""
+        if not self.redis.client:
+            return False
+
+        flushed = await self.monitoring.flush_to_redis(self.redis)
+        if flushed:
+            await self.redis.add_to_set(INSTANCE_REGISTRY_KEY, self.monitoring.instance_id)
+            self.last_flush = datetime.utcnow()
+        return flushed
+
+    async def get_fleet_metrics(self) -> Dict[str, object]:
+        """Merge the latest snapshots of every live replica"""
+        if not self.redis.client:
+            return {"status": "disconnected", "instances": [], "models": {}}
+
+        await self.flush()
+        instance_ids = sorted(await self.redis.get_set_members(INSTANCE_REGISTRY_KEY))
+        snapshots = await self.redis.get_hashes(
+            [f"metrics:instance:{instance_id}" for instance_id in instance_ids]
+        )
+
+        live_instances = []
+        live_snapshots = []
+        expired = []
+        for instance_id, snapshot in zip(instance_ids, snapshots):
+            if snapshot:
+                live_instances.append(instance_id)
+                live_snapshots.append(snapshot)
+            else:
+                expired.append(instance_id)
+        if expired:
+            await self.redis.remove_from_set(INSTANCE_REGISTRY_KEY, *expired)
+
+        return {
+            "status": "connected",
+            "instances": live_instances,
+            "models": summarize_counters(merge_counters(live_snapshots)),
+        }
@@ -2,22 +2,18 @@
 ML Service for food waste prediction and classification
 """
 
+import asyncio
+import hashlib
+import json
 import os
 import pickle
 import numpy as np
-import pandas as pd
 from datetime import date, datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, Any, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
 import logging
 from pathlib import Path
 import time
 
-import lightgbm as lgb
-import xgboost as xgb
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, r2_score
-import cv2
 from PIL import Image
 import base64
 import io
@@ -26,9 +22,12 @@ from app.core.config import settings
 from app.models.expiry_prediction import (
     ExpiryPredictionRequest, 
     ExpiryPredictionResponse, 
-    SpoilageDataPoint
+    PackagingType,
+    SpoilageDataPoint,
+    StorageType,
 )
 from app.models.image_classification import (
+    ImageClassificationOptions,
     ImageClassificationRequest,
     ImageClassificationResponse,
     FreshnessAnalysis,
@@ -36,6 +35,7 @@ from app.models.image_classification import (
     FreshnessLevel,
     FoodCategory
 )
+from app.models.recipes import RecipeSuggestionRequest
 from app.models.forecasting import (
     DemandForecastRequest,
     DemandForecastResponse,
@@ -45,21 +45,77 @@ from app.models.forecasting import (
     AnomalyDetectionResponse,
     AnomalyPoint,
 )
+from app.services.batching import MicroBatcher
+from app.services.cache_service import CacheService
+from app.services.degradation import (
+    TIER_FULL,
+    TIER_MINIMAL,
+    TIER_NAMES,
+    DegradationPolicy,
+    tier_version,
+)
+from app.services.expiry_table import ExpiryTable, spoilage_curve
+from app.services.image_model import CATEGORIES, FRESHNESS_LEVELS, load_freshness_classifier
 from app.services.monitoring_service import MonitoringService
+from app.services.recipe_embeddings import load_recipe_embeddings
+from app.services.recipe_index import RecipeIndex, dietary_mask, ingredient_urgency, load_recipe_index
+from app.utils.image_hashing import PerceptualHashIndex, content_digest, dhash
+from app.utils.tracing import Tracer
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Input resolution of the image model; colour statistics use the same grid
+IMAGE_INPUT_SIZE = (224, 224)
+# Colour statistics grid for the minimal degradation tier
+IMAGE_THUMBNAIL_SIZE = (64, 64)
+
+# Representative inputs run through each model before it is reported ready
+WARMUP_EXPIRY_ITEMS = [
+    ("Milk", "dairy", StorageType.FRIDGE),
+    ("Bananas", "fruits", StorageType.COUNTER),
+    ("Spinach", "vegetables", StorageType.FRIDGE),
+    ("Chicken breast", "meat", StorageType.FREEZER),
+    ("Bread", "bakery", StorageType.PANTRY),
+]
+WARMUP_IMAGE_SIZE = (480, 640)  # height, width of a typical phone upload after resizing
+WARMUP_RECIPE_BASKETS = [
+    (["tomato", "spinach"], ["onion", "garlic", "rice"], []),
+    (["paneer", "capsicum"], ["onion"], ["vegetarian"]),
+    (["tamatar", "brinjal", "yoghurt"], [], ["vegan", "gluten-free"]),
+    (["leftover roast chicken"], ["potato"], []),
+]
+
 class MLService:
     """Main ML service for food waste prediction"""
     
-    def __init__(self, monitoring_service: Optional[MonitoringService] = None):
+    def __init__(
+        self,
+        monitoring_service: Optional[MonitoringService] = None,
+        cache_service: Optional[CacheService] = None,
+        degradation_policy: Optional[DegradationPolicy] = None,
+    ):
         self.expiry_model = None
         self.image_model = None
-        self.recipe_model = None
+        self.recipe_index: Optional[RecipeIndex] = None
         self.label_encoders = {}
         self.scalers = {}
         self.model_metadata = {}
+        # model name -> {"status": loading|ready|failed, "load_seconds": ...}
+        self.model_readiness: Dict[str, Dict[str, Any]] = {}
         self.monitoring = monitoring_service or MonitoringService()
+        self.tracer = Tracer(self.monitoring)
+        self.cache = cache_service
+        self.degradation = degradation_policy
+        self.expiry_table = ExpiryTable()
+        self.expiry_batcher: Optional[MicroBatcher] = None
+        self.image_batcher: Optional[MicroBatcher] = None
+        self.image_index = PerceptualHashIndex(
+            settings.IMAGE_PHASH_MAX_DISTANCE,
+            settings.IMAGE_PHASH_CACHE_SIZE,
+        )
         
     async def initialize(self):
         """Initialize ML models and load from disk"""
@@ -69,10 +125,12 @@ class MLService:
             # Create models directory if it doesn't exist
             os.makedirs(settings.MODEL_PATH, exist_ok=True)
             
-            # Load or train models
-            await self._load_or_train_expiry_model()
-            await self._load_or_train_image_model()
-            await self._load_or_train_recipe_model()
+            # Models are independent; blocking loads run in threads so they overlap
+            await asyncio.gather(
+                self._load_model("expiry", self._load_or_train_expiry_model, self._warm_up_expiry),
+                self._load_model("image", self._load_or_train_image_model, self._warm_up_image),
+                self._load_model("recipe", self._load_or_train_recipe_model, self._warm_up_recipe),
+            )
             
             logger.info("ML models initialized successfully")
             
@@ -80,6 +138,112 @@ class MLService:
             logger.error(f"Failed to initialize ML models: {e}")
             raise
     
+    async def _load_model(
+        self,
+        name: str,
+        loader: Callable[[], Awaitable[None]],
+        warm_up: Callable[[], None],
+    ):
+        """Load one model, then warm it up, recording its readiness and timings
+        
+        Warm-up runs a few representative inferences off the event loop so
+        first-call costs (lazy imports, allocator growth, JIT, cold caches)
+        are paid before the model is reported ready and receives traffic.
+        A failed warm-up is logged but does not hold readiness back.
+        """
+        state = {"status": "loading", "load_seconds": None, "warmup_seconds": None}
+        self.model_readiness[name] = state
+        start = time.perf_counter()
+        try:
+            await loader()
+        except Exception:
+            state.update(status="failed", load_seconds=round(time.perf_counter() - start, 3))
+            raise
+        state.update(status="warming", load_seconds=round(time.perf_counter() - start, 3))
+        
+        start = time.perf_counter()
+        try:
+            for _ in range(settings.MODEL_WARMUP_ITERATIONS):
+                await asyncio.to_thread(warm_up)
+        except Exception as e:
+            logger.warning(f"Warm-up of the {name} model failed: {e}")
+        state.update(status="ready", warmup_seconds=round(time.perf_counter() - start, 3))
+        logger.info(
+            f"{name} model ready (load {state['load_seconds']:.2f}s, warm-up {state['warmup_seconds']:.2f}s)"
+        )
+    
+    def is_ready(self) -> bool:
+        """Whether every model has loaded and warmed up"""
+        return bool(self.model_readiness) and all(
+            state["status"] == "ready" for state in self.model_readiness.values()
+        )
+    
+    def _warm_up_expiry(self):
+        """Rule and model predictions for a spread of categories and storage types"""
+        requests = [
+            ExpiryPredictionRequest(
+                product_name=product,
+                category=category,
+                purchase_date=date.today() - timedelta(days=1),
+                storage=storage,
+                packaging=PackagingType.PLASTIC,
+                household_usage_rate_per_week=2.0,
+            )
+            for product, category, storage in WARMUP_EXPIRY_ITEMS
+        ]
+        for request in requests:
+            self._predict_with_rules(request)
+        if self.expiry_model is not None:
+            rows = [self._prepare_expiry_features(request)[0] for request in requests]
+            self._predict_shelf_life_batch(rows[:1])
+            self._predict_shelf_life_batch(rows * (settings.EXPIRY_BATCH_MAX_SIZE // len(rows) + 1))
+    
+    def _warm_up_image(self):
+        """Decode, hash and classify a synthetic photo, at batch size 1 and full batches"""
+        height, width = WARMUP_IMAGE_SIZE
+        y, x = np.mgrid[0:height, 0:width]
+        noise = np.random.default_rng(0).normal(0, 12, (height, width, 3))
+        photo = np.stack([x * 255 // width, y * 255 // height, (x + y) % 256], axis=-1) + noise
+        buffer = io.BytesIO()
+        Image.fromarray(np.clip(photo, 0, 255).astype(np.uint8), "RGB").save(buffer, format="JPEG", quality=90)
+        
+        options = ImageClassificationOptions()
+        for size in (IMAGE_INPUT_SIZE, IMAGE_THUMBNAIL_SIZE):
+            buffer.seek(0)
+            image = self._open_image(buffer)
+            pixels = self._load_pixels(image, size)
+            dhash(pixels)
+            self._classify_with_rules(pixels, image.size, options)
+        if self.image_batcher is not None:
+            buffer.seek(0)
+            processed = self._normalize_pixels(self._load_pixels(self._open_image(buffer)))
+            self.image_model.predict_batch([processed])
+            self.image_model.predict_batch([processed] * settings.IMAGE_BATCH_MAX_SIZE)
+    
+    def _warm_up_recipe(self):
+        """Rank a few typical baskets, including misspelt names and dietary filters"""
+        if self.recipe_index is None or not len(self.recipe_index):
+            return
+        for expiring, pantry, preferences in WARMUP_RECIPE_BASKETS:
+            ranked = self.recipe_index.rank(
+                [(item, 1.0) for item in expiring],
+                pantry,
+                k=5,
+                pantry_weight=settings.RECIPE_PANTRY_WEIGHT,
+                missing_penalty=settings.RECIPE_MISSING_PENALTY,
+                dietary=dietary_mask(preferences),
+                semantic_weight=settings.RECIPE_SEMANTIC_WEIGHT,
+                semantic_candidates=settings.RECIPE_SEMANTIC_CANDIDATES,
+            )
+            for recipe, _score, _used, _missing in ranked:
+                self.recipe_index.recipe(recipe)
+    
+    @staticmethod
+    def _read_model_file(path: str) -> Dict[str, Any]:
+        """Unpickle a model file; its backend (lightgbm, sklearn, ...) is imported here, on first use"""
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    
     async def _load_or_train_expiry_model(self):
         """Load or train the expiry prediction model"""
         model_path = os.path.join(settings.MODEL_PATH, settings.EXPIRY_MODEL_NAME)
@@ -87,12 +251,11 @@ class MLService:
         try:
             if os.path.exists(model_path):
                 logger.info("Loading existing expiry prediction model...")
-                with open(model_path, 'rb') as f:
-                    model_data = pickle.load(f)
-                    self.expiry_model = model_data['model']
-                    self.label_encoders = model_data['encoders']
-                    self.scalers = model_data['scalers']
-                    self.model_metadata['expiry'] = model_data['metadata']
+                model_data = await asyncio.to_thread(self._read_model_file, model_path)
+                self.expiry_model = model_data['model']
+                self.label_encoders = model_data['encoders']
+                self.scalers = model_data['scalers']
+                self.model_metadata['expiry'] = model_data['metadata']
             else:
                 logger.info("Training new expiry prediction model...")
                 await self._train_expiry_model()
@@ -101,18 +264,29 @@ class MLService:
             logger.error(f"Error loading/training expiry model: {e}")
             # Fallback to a simple rule-based model
             await self._create_fallback_expiry_model()
+        
+        if self.expiry_model is not None and settings.EXPIRY_BATCH_MAX_SIZE > 1:
+            self.expiry_batcher = MicroBatcher(
+                self._predict_shelf_life_batch,
+                max_batch=settings.EXPIRY_BATCH_MAX_SIZE,
+                max_wait_ms=settings.EXPIRY_BATCH_MAX_WAIT_MS,
+                name="expiry",
+                monitoring=self.monitoring,
+            )
     
     async def _load_or_train_image_model(self):
         """Load or train the image classification model"""
         model_path = os.path.join(settings.MODEL_PATH, settings.IMAGE_MODEL_NAME)
         
         try:
+            if settings.IMAGE_MODEL_BACKEND != "none" and await self._load_image_cnn():
+                return
+            
             if os.path.exists(model_path):
                 logger.info("Loading existing image classification model...")
-                with open(model_path, 'rb') as f:
-                    model_data = pickle.load(f)
-                    self.image_model = model_data['model']
-                    self.model_metadata['image'] = model_data['metadata']
+                model_data = await asyncio.to_thread(self._read_model_file, model_path)
+                self.image_model = model_data['model']
+                self.model_metadata['image'] = model_data['metadata']
             else:
                 logger.info("Training new image classification model...")
                 await self._train_image_model()
@@ -122,49 +296,115 @@ class MLService:
             # Fallback to a simple rule-based model
             await self._create_fallback_image_model()
     
+    async def _load_image_cnn(self) -> bool:
+        """Load the CNN freshness classifier for the configured backend, if present"""
+        backend = settings.IMAGE_MODEL_BACKEND
+        file_name = settings.IMAGE_CNN_ONNX_NAME if backend == "onnx" else settings.IMAGE_CNN_WEIGHTS_NAME
+        cnn_path = os.path.join(settings.MODEL_PATH, file_name)
+        if not os.path.exists(cnn_path):
+            logger.warning(f"Image model backend '{backend}' configured but {cnn_path} does not exist")
+            return False
+        
+        logger.info(f"Loading CNN image classifier ({backend}) from {cnn_path}...")
+        version = f"2.0.0-mobilenet-{backend}"
+        classifier = await asyncio.to_thread(load_freshness_classifier, backend, cnn_path, version)
+        if classifier is None:
+            return False
+        
+        self.image_model = classifier
+        self.image_batcher = MicroBatcher(
+            classifier.predict_batch,
+            max_batch=settings.IMAGE_BATCH_MAX_SIZE,
+            max_wait_ms=settings.IMAGE_BATCH_MAX_WAIT_MS,
+            name="image",
+            monitoring=self.monitoring,
+        )
+        self.model_metadata['image'] = {
+            'version': version,
+            'type': 'cnn',
+            'backend': backend,
+            'quantized': backend == "torch" and settings.IMAGE_MODEL_QUANTIZE,
+            'last_trained': datetime.utcfromtimestamp(os.path.getmtime(cnn_path)).isoformat(),
+        }
+        return True
+    
     async def _load_or_train_recipe_model(self):
-        """Load or train the recipe recommendation model"""
-        model_path = os.path.join(settings.MODEL_PATH, settings.RECIPE_MODEL_NAME)
+        """Build the recipe inverted index from the recipe corpus"""
+        corpus_path = settings.RECIPE_CORPUS_PATH
         
         try:
-            if os.path.exists(model_path):
-                logger.info("Loading existing recipe recommendation model...")
-                with open(model_path, 'rb') as f:
-                    model_data = pickle.load(f)
-                    self.recipe_model = model_data['model']
-                    self.model_metadata['recipe'] = model_data['metadata']
-            else:
-                logger.info("Training new recipe recommendation model...")
-                await self._train_recipe_model()
+            logger.info("Building recipe index...")
+            loop = asyncio.get_running_loop()
+            self.recipe_index = await loop.run_in_executor(None, load_recipe_index, corpus_path)
+            if self.recipe_index is None:
+                await self._create_fallback_recipe_model()
+                return
+            if settings.RECIPE_SEMANTIC_ENABLED and len(self.recipe_index):
+                self.recipe_index.semantic = await loop.run_in_executor(
+                    None,
+                    load_recipe_embeddings,
+                    self.recipe_index,
+                    settings.RECIPE_EMBEDDINGS_PATH,
+                    settings.RECIPE_EMBEDDING_MODEL,
+                )
+            semantic = self.recipe_index.semantic
+            self.model_metadata['recipe'] = {
+                'version': '2.0.0-inverted-index',
+                'type': 'inverted-index',
+                'recipes': len(self.recipe_index),
+                'embeddings': semantic.encoder.name if semantic is not None else None,
+                'last_trained': datetime.utcfromtimestamp(os.path.getmtime(corpus_path)).isoformat(),
+            }
                 
         except Exception as e:
-            logger.error(f"Error loading/training recipe model: {e}")
-            # Fallback to a simple rule-based model
+            logger.error(f"Error building recipe index: {e}")
             await self._create_fallback_recipe_model()
     
     async def predict_expiry(self, request: ExpiryPredictionRequest) -> ExpiryPredictionResponse:
-        """Predict food expiry date and spoilage curve"""
+        """Predict food expiry date and spoilage curve
+        
+        Full-tier predictions are cached in Redis under a digest of the
+        request. Degraded and fallback results are never cached, so they
+        stop being served once load drops.
+        """
         start_time = time.perf_counter()
         status = "success"
         metadata = {
             "product": request.product_name,
             "category": request.category,
             "storage": request.storage.value,
+            "cache": "miss",
         }
 
         try:
-            features = self._prepare_expiry_features(request)
-            if self.expiry_model:
-                prediction = self._predict_with_model(features, request)
-            else:
-                prediction = self._predict_with_rules(request)
+            tier = self.degradation.tier("expiry") if self.degradation else TIER_FULL
+            metadata["tier"] = TIER_NAMES[tier]
+            payload = json.dumps(request.dict(), sort_keys=True, default=str)
+            cache_key = f"expiry_prediction:{hashlib.sha256(payload.encode()).hexdigest()}"
+            cached = await self.cache.get(cache_key) if self.cache else None
+            if cached:
+                metadata["cache"] = "hit"
+                return ExpiryPredictionResponse(**cached)
+            
+            with self.tracer.trace("expiry"):
+                with self.tracer.span("predict"):
+                    if self.expiry_model and tier == TIER_FULL:
+                        with self.tracer.span("features"):
+                            features = self._prepare_expiry_features(request)
+                        prediction = await self._predict_with_model(features, request)
+                    else:
+                        prediction = self._predict_with_rules(request, full_curve=tier != TIER_MINIMAL)
+            if tier != TIER_FULL:
+                prediction.model_version = tier_version(prediction.model_version, tier)
+            elif self.cache:
+                await self.cache.set(cache_key, prediction.dict(), ttl=settings.CACHE_TTL)
             return prediction
         except Exception as e:
             status = "failure"
             logger.error(f"Error predicting expiry: {e}")
             return self._create_fallback_prediction(request)
         finally:
-            await self._record_inference_event(
+            self._record_inference_event(
                 model_name="expiry",
                 operation="predict_expiry",
                 start_time=start_time,
@@ -203,70 +443,62 @@ class MLService:
         
         return np.array(features).reshape(1, -1)
     
-    def _predict_with_model(self, features: np.ndarray, request: ExpiryPredictionRequest) -> ExpiryPredictionResponse:
-        """Make prediction using trained model"""
-        # This is a simplified version - in reality, you'd use the actual model
-        # For now, we'll use rule-based logic as a fallback
-        return self._predict_with_rules(request)
+    async def _predict_with_model(self, features: np.ndarray, request: ExpiryPredictionRequest) -> ExpiryPredictionResponse:
+        """Make prediction using trained model (shelf life in days as the regression target)"""
+        if self.expiry_batcher:
+            shelf_life = await self.expiry_batcher.submit(features[0])
+        else:
+            shelf_life = self._predict_shelf_life_batch([features[0]])[0]
+        
+        base_shelf_life, _ = self._rule_shelf_life(request)
+        return self._build_expiry_response(
+            request,
+            max(0, int(round(float(shelf_life)))),
+            base_shelf_life,
+            self.model_metadata.get('expiry', {}).get('version', '1.0.0'),
+        )
     
-    def _predict_with_rules(self, request: ExpiryPredictionRequest) -> ExpiryPredictionResponse:
+    def _predict_shelf_life_batch(self, rows: List[np.ndarray]) -> np.ndarray:
+        """One vectorized model call for a batch of expiry feature rows"""
+        return self.expiry_model.predict(np.vstack(rows))
+    
+    def _predict_with_rules(self, request: ExpiryPredictionRequest, full_curve: bool = True) -> ExpiryPredictionResponse:
         """Rule-based expiry prediction as fallback"""
-        # Base shelf life by category (in days)
-        category_shelf_life = {
-            'fruits': 7,
-            'vegetables': 10,
-            'dairy': 14,
-            'meat': 5,
-            'seafood': 3,
-            'bakery': 3,
-            'grains': 365,
-            'beverages': 365,
-            'snacks': 30,
-            'other': 7
-        }
-        
-        # Storage multipliers
-        storage_multipliers = {
-            'fridge': 1.0,
-            'freezer': 3.0,
-            'pantry': 0.8,
-            'counter': 0.6,
-            'outside': 0.4
-        }
-        
-        # Packaging multipliers
-        packaging_multipliers = {
-            'vacuum': 1.5,
-            'glass': 1.2,
-            'metal': 1.1,
-            'plastic': 1.0,
-            'paper': 0.8,
-            'clamshell': 0.9,
-            'none': 0.7
-        }
-        
-        # Calculate base shelf life
-        base_shelf_life = category_shelf_life.get(request.category.lower(), 7)
-        
-        # Apply multipliers
-        storage_mult = storage_multipliers.get(request.storage.value, 1.0)
-        packaging_mult = packaging_multipliers.get(request.packaging.value, 1.0)
-        
-        # Adjust for usage rate (higher usage = shorter shelf life)
-        usage_factor = max(0.5, 1.0 - (request.household_usage_rate_per_week * 0.1))
-        
-        # Calculate predicted shelf life
-        predicted_days = int(base_shelf_life * storage_mult * packaging_mult * usage_factor)
-        
+        base_shelf_life, predicted_days = self._rule_shelf_life(request)
+        return self._build_expiry_response(
+            request, predicted_days, base_shelf_life, "1.0.0-rule-based", full_curve
+        )
+    
+    def _rule_shelf_life(self, request: ExpiryPredictionRequest) -> Tuple[int, int]:
+        """Base category shelf life and rule-adjusted predicted shelf life in days"""
+        return self.expiry_table.shelf_life(
+            request.category,
+            request.storage,
+            request.packaging,
+            request.household_usage_rate_per_week,
+        )
+    
+    def _build_expiry_response(
+        self,
+        request: ExpiryPredictionRequest,
+        predicted_days: int,
+        base_shelf_life: int,
+        model_version: str,
+        full_curve: bool = True,
+    ) -> ExpiryPredictionResponse:
+        """Expiry date, spoilage curve, confidence and advice for a predicted shelf life"""
         # Calculate predicted expiry date
         predicted_expiry = request.purchase_date + timedelta(days=predicted_days)
         
-        # Generate spoilage curve
-        spoilage_curve = self._generate_spoilage_curve(
-            request.purchase_date, 
-            predicted_expiry, 
-            predicted_days
-        )
+        # Generate spoilage curve (only the expiry-date point when degraded)
+        if full_curve:
+            spoilage_curve = self._generate_spoilage_curve(
+                request.purchase_date, 
+                predicted_expiry, 
+                predicted_days
+            )
+        else:
+            spoilage_curve = [SpoilageDataPoint(date=predicted_expiry, prob_spoiled=0.5)]
         
         # Calculate confidence based on data quality
         confidence = self._calculate_confidence(request)
@@ -290,112 +522,128 @@ class MLService:
             spoilage_curve=spoilage_curve,
             factors=factors,
             recommendations=recommendations,
-            model_version="1.0.0-rule-based",
+            model_version=model_version,
             prediction_timestamp=datetime.utcnow()
         )
     
     def _generate_spoilage_curve(self, purchase_date: date, expiry_date: date, shelf_life_days: int) -> List[SpoilageDataPoint]:
         """Generate spoilage probability curve"""
-        curve = []
-        current_date = purchase_date
-        
-        while current_date <= expiry_date + timedelta(days=2):
-            days_from_purchase = (current_date - purchase_date).days
-            
-            if days_from_purchase < 0:
-                prob_spoiled = 0.0
-            elif days_from_purchase <= shelf_life_days * 0.7:
-                # Low probability in first 70% of shelf life
-                prob_spoiled = 0.01 * (days_from_purchase / (shelf_life_days * 0.7))
-            elif days_from_purchase <= shelf_life_days:
-                # Rapid increase in last 30% of shelf life
-                remaining_days = shelf_life_days - days_from_purchase
-                total_remaining = shelf_life_days * 0.3
-                prob_spoiled = 0.1 + (0.4 * (1 - remaining_days / total_remaining))
-            else:
-                # High probability after expiry
-                days_past_expiry = days_from_purchase - shelf_life_days
-                prob_spoiled = min(0.95, 0.5 + (0.45 * min(days_past_expiry / 3, 1.0)))
-            
-            curve.append(SpoilageDataPoint(
-                date=current_date,
-                prob_spoiled=round(prob_spoiled, 3)
-            ))
-            
-            current_date += timedelta(days=1)
-        
-        return curve
+        # Points are cached per (purchase date, shelf life) and shared between responses
+        return list(spoilage_curve(purchase_date, shelf_life_days))
     
     def _calculate_confidence(self, request: ExpiryPredictionRequest) -> float:
         """Calculate confidence score for prediction"""
-        confidence = 0.5  # Base confidence
-        
-        # Increase confidence for known categories
-        known_categories = ['fruits', 'vegetables', 'dairy', 'meat', 'seafood', 'bakery']
-        if request.category.lower() in known_categories:
-            confidence += 0.2
-        
-        # Increase confidence for complete data
-        if request.temperature_c is not None:
-            confidence += 0.1
-        if request.humidity_percent is not None:
-            confidence += 0.1
-        if request.brand:
-            confidence += 0.05
-        
-        # Decrease confidence for unusual combinations
-        if request.storage.value == 'freezer' and request.category.lower() in ['fruits', 'vegetables']:
-            confidence -= 0.1
-        
-        return min(0.95, max(0.1, confidence))
+        return self.expiry_table.confidence(
+            request.category,
+            request.storage,
+            temperature_known=request.temperature_c is not None,
+            humidity_known=request.humidity_percent is not None,
+            has_brand=bool(request.brand),
+        )
     
     def _generate_recommendations(self, request: ExpiryPredictionRequest, shelf_life_days: int) -> List[str]:
         """Generate storage recommendations"""
-        recommendations = []
-        
-        # Storage recommendations
-        if request.storage.value == 'counter' and request.category.lower() in ['dairy', 'meat']:
-            recommendations.append("Store in refrigerator to extend shelf life")
-        
-        if request.storage.value == 'pantry' and request.category.lower() in ['fruits', 'vegetables']:
-            recommendations.append("Consider refrigerating to slow ripening")
-        
-        # Usage recommendations
-        if request.household_usage_rate_per_week < 0.5:
-            recommendations.append("Consider freezing excess portions to prevent waste")
-        
-        if shelf_life_days < 7:
-            recommendations.append("Use within the next few days or freeze for later use")
-        
-        # General recommendations
-        if request.packaging.value == 'none':
-            recommendations.append("Store in airtight container to maintain freshness")
-        
-        if not recommendations:
-            recommendations.append("Store properly and monitor for signs of spoilage")
-        
-        return recommendations
+        return self.expiry_table.recommendations(
+            request.category,
+            request.storage,
+            request.packaging,
+            request.household_usage_rate_per_week,
+            shelf_life_days,
+        )
     
     async def classify_image(self, request: ImageClassificationRequest) -> ImageClassificationResponse:
         """Classify food image for freshness detection"""
+        return await self._run_image_classification(
+            lambda: self._decode_image_stream(request.image_data, request.image_type),
+            request,
+            request.image_type,
+        )
+    
+    async def classify_image_stream(
+        self,
+        stream: BinaryIO,
+        options: ImageClassificationOptions,
+    ) -> ImageClassificationResponse:
+        """Classify an uploaded image read straight from a binary stream"""
+        return await self._run_image_classification(
+            lambda: stream,
+            options,
+            "binary",
+        )
+    
+    async def _run_image_classification(
+        self,
+        load_stream: Callable[[], BinaryIO],
+        options: ImageClassificationOptions,
+        image_type: str,
+    ) -> ImageClassificationResponse:
+        """Load, preprocess and classify an image with monitoring and tracing
+        
+        Results are cached twice: in Redis under the SHA-256 of the image bytes
+        (exact re-uploads, shared by all replicas), and in-process under a
+        perceptual hash so near-identical photos of the same item are served
+        without re-running the classifier. Only fresh classifications enter the
+        perceptual index.
+        """
         start_time = time.perf_counter()
         status = "success"
-        metadata = {"image_type": request.image_type}
+        metadata = {"image_type": image_type, "cache": "miss"}
 
         try:
-            image = self._decode_image(request.image_data, request.image_type)
-            processed_image = self._preprocess_image(image)
-            if self.image_model:
-                classification = self._classify_with_model(processed_image, request)
-            else:
-                classification = self._classify_with_rules(image, request)
+            tier = self.degradation.tier("image") if self.degradation else TIER_FULL
+            metadata["tier"] = TIER_NAMES[tier]
+            with self.tracer.trace("image"):
+                stream = load_stream()
+                variant = self._classification_variant(options)
+                with self.tracer.span("content_hash"):
+                    exact_key = f"image_classification:{content_digest(stream)}:{variant}"
+                
+                cached = await self.cache.get(exact_key) if self.cache else None
+                if cached:
+                    metadata["cache"] = "exact"
+                    return ImageClassificationResponse(**cached)
+                
+                image = self._open_image(stream)
+                original_size = image.size
+                pixels = self._load_pixels(
+                    image, IMAGE_THUMBNAIL_SIZE if tier == TIER_MINIMAL else IMAGE_INPUT_SIZE
+                )
+                
+                with self.tracer.span("perceptual_hash"):
+                    phash = dhash(pixels)
+                    classification = self.image_index.lookup(phash, variant)
+                
+                if classification is not None:
+                    metadata["cache"] = "perceptual"
+                    # Reuse the label only; quality and size describe this image. Not re-indexed
+                    # under this hash, so near-duplicates cannot chain past the distance limit
+                    classification = classification.copy(update={
+                        "image_quality": self._image_quality(pixels, original_size),
+                        "processing_time_ms": int((time.perf_counter() - start_time) * 1000),
+                    })
+                else:
+                    if self.image_batcher and tier == TIER_FULL:
+                        processed_image = self._normalize_pixels(pixels)
+                        classification = await self._classify_with_model(
+                            processed_image, pixels, original_size, options
+                        )
+                    else:
+                        classification = self._classify_with_rules(pixels, original_size, options)
+                        if tier != TIER_FULL:
+                            # Degraded results are not cached, so they stop once load drops
+                            classification.model_version = tier_version(classification.model_version, tier)
+                            return classification
+                    self.image_index.add(phash, classification, variant)
+                
+                if self.cache:
+                    await self.cache.set(exact_key, classification.dict(), ttl=settings.IMAGE_CACHE_TTL)
             return classification
         except Exception as e:
             status = "failure"
             logger.error(f"Error classifying image: {e}")
-            return self._create_fallback_classification(request)
+            return self._create_fallback_classification(options)
         finally:
-            await self._record_inference_event(
+            self._record_inference_event(
                 model_name="image",
                 operation="classify_image",
                 start_time=start_time,
@@ -403,50 +651,160 @@ class MLService:
                 metadata=metadata,
             )
     
-    def _decode_image(self, image_data: str, image_type: str) -> Image.Image:
-        """Decode image from various formats"""
+    @staticmethod
+    def _classification_variant(options: ImageClassificationOptions) -> str:
+        """Cache key component for the options that shape a classification response"""
+        expected = options.expected_category.value if options.expected_category else "any"
+        return f"{expected}:{int(options.include_confidence_scores)}:{int(options.include_freshness_analysis)}"
+    
+    def _decode_image_stream(self, image_data: str, image_type: str) -> BinaryIO:
+        """Decode image bytes from various formats into a binary stream"""
         if image_type == "base64":
             # Remove data URL prefix if present
             if ',' in image_data:
                 image_data = image_data.split(',')[1]
             
-            image_bytes = base64.b64decode(image_data)
-            return Image.open(io.BytesIO(image_bytes))
+            with self.tracer.span("base64_decode"):
+                image_bytes = base64.b64decode(image_data)
+            return io.BytesIO(image_bytes)
         
         elif image_type == "url":
             # In a real implementation, you'd fetch the image from URL
             raise NotImplementedError("URL image loading not implemented")
         
         elif image_type == "file_path":
-            return Image.open(image_data)
+            return io.BytesIO(Path(image_data).read_bytes())
         
         else:
             raise ValueError(f"Unsupported image type: {image_type}")
     
+    def _open_image(self, source: Union[str, BinaryIO]) -> Image.Image:
+        """Open an image lazily from a path or binary stream"""
+        with self.tracer.span("open"):
+            return Image.open(source)
+    
     def _preprocess_image(self, image: Image.Image) -> np.ndarray:
         """Preprocess image for ML model"""
-        # Resize to standard size
-        image = image.resize((224, 224))
+        return self._normalize_pixels(self._load_pixels(image))
+    
+    def _load_pixels(self, image: Image.Image, size: Tuple[int, int] = IMAGE_INPUT_SIZE) -> np.ndarray:
+        """Decode a lazily opened image straight to RGB uint8 pixels at ``size``"""
+        with self.tracer.span("decode"):
+            # For JPEGs, have libjpeg DCT-scale by 1/2, 1/4 or 1/8 while decoding,
+            # to the smallest size still covering the target; no-op for other formats
+            image.draft('RGB', size)
+            
+            # Convert before resizing so the resize runs on the final 3-band image
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            else:
+                image.load()
         
-        # Convert to RGB if needed
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
+        with self.tracer.span("resize"):
+            if image.size != size:
+                image = image.resize(size)
+            return np.asarray(image)
+    
+    def _normalize_pixels(self, pixels: np.ndarray) -> np.ndarray:
+        """Scale uint8 pixels to float32 in [0, 1]"""
+        with self.tracer.span("normalize"):
+            return pixels.astype(np.float32) / 255.0
+    
+    async def _classify_with_model(
+        self,
+        processed_image: np.ndarray,
+        pixels: np.ndarray,
+        original_size: Tuple[int, int],
+        request: ImageClassificationOptions,
+    ) -> ImageClassificationResponse:
+        """CNN classification, micro-batched with concurrent requests"""
+        start_time = time.perf_counter()
+        with self.tracer.span("model_inference"):
+            category_probs, freshness_probs = await self.image_batcher.submit(processed_image)
         
-        # Convert to numpy array
-        image_array = np.array(image)
+        with self.tracer.span("build_response"):
+            best = int(np.argmax(category_probs))
+            all_scores = None
+            if request.include_confidence_scores:
+                all_scores = [
+                    CategoryConfidence(category=CATEGORIES[i], confidence=float(category_probs[i]))
+                    for i in np.argsort(category_probs)[::-1]
+                ]
+            
+            freshness_analysis = None
+            if request.include_freshness_analysis:
+                freshness_analysis = self._build_freshness_analysis(freshness_probs)
+            
+            return ImageClassificationResponse(
+                predicted_category=CATEGORIES[best],
+                category_confidence=float(category_probs[best]),
+                all_category_scores=all_scores,
+                freshness_analysis=freshness_analysis,
+                detected_objects=[CATEGORIES[best].value],
+                image_quality=self._image_quality(pixels, original_size),
+                processing_time_ms=int((time.perf_counter() - start_time) * 1000),
+                model_version=self.image_model.version,
+                timestamp=datetime.utcnow()
+            )
+    
+    def _build_freshness_analysis(self, freshness_probs: np.ndarray) -> FreshnessAnalysis:
+        """Turn freshness level probabilities into a FreshnessAnalysis"""
+        # Expected value over the ordered levels: fresh = 1.0 ... spoiled = 0.0
+        weights = np.linspace(1.0, 0.0, len(FRESHNESS_LEVELS))
+        freshness_score = float(np.clip(np.dot(freshness_probs, weights), 0.0, 1.0))
+        level = FRESHNESS_LEVELS[int(np.argmax(freshness_probs))]
+        days_remaining = {
+            FreshnessLevel.FRESH: 7,
+            FreshnessLevel.GOOD: 5,
+            FreshnessLevel.FAIR: 3,
+            FreshnessLevel.POOR: 1,
+            FreshnessLevel.SPOILED: 0,
+        }[level]
         
-        # Normalize pixel values
-        image_array = image_array.astype(np.float32) / 255.0
+        if level in (FreshnessLevel.POOR, FreshnessLevel.SPOILED):
+            spoilage = [f"Visual features consistent with {level.value} produce"]
+            quality = []
+            storage = ["Inspect before use and discard if mould or off smells are present"]
+        else:
+            spoilage = []
+            quality = [f"Visual features consistent with {level.value} produce"]
+            storage = ["Store in appropriate temperature"]
         
-        return image_array
+        return FreshnessAnalysis(
+            overall_freshness=level,
+            freshness_score=freshness_score,
+            spoilage_indicators=spoilage,
+            quality_indicators=quality,
+            estimated_days_remaining=days_remaining,
+            storage_recommendations=storage
+        )
     
-    def _classify_with_rules(self, image: Image.Image, request: ImageClassificationRequest) -> ImageClassificationResponse:
+    @staticmethod
+    def _image_quality(pixels: np.ndarray, original_size: Tuple[int, int]) -> Dict[str, Any]:
+        """Brightness/contrast of the downscaled pixels plus the original resolution"""
+        return {
+            "brightness": float(np.mean(pixels)),
+            "contrast": float(np.std(pixels)),
+            "resolution": f"{original_size[0]}x{original_size[1]}"
+        }
+    
+    def _classify_with_rules(
+        self,
+        pixels: np.ndarray,
+        original_size: Tuple[int, int],
+        request: ImageClassificationOptions,
+    ) -> ImageClassificationResponse:
         """Rule-based image classification as fallback"""
-        # Simple color-based classification
-        image_array = np.array(image)
-        
-        # Calculate average color
-        avg_color = np.mean(image_array, axis=(0, 1))
+        # Simple color-based classification on the downscaled pixels
+        with self.tracer.span("color_stats"):
+            image_array = pixels
+            
+            # Calculate average color
+            avg_color = np.mean(image_array, axis=(0, 1))
+            
+            # Calculate freshness score based on color variance
+            color_variance = np.var(image_array)
+            image_quality = self._image_quality(image_array, original_size)
         
         # Simple rules based on color
         if avg_color[0] > avg_color[1] and avg_color[0] > avg_color[2]:  # Red dominant
@@ -462,93 +820,89 @@ class MLService:
             predicted_category = FoodCategory.OTHER
             freshness = FreshnessLevel.FAIR
         
-        # Calculate freshness score based on color variance
-        color_variance = np.var(image_array)
         freshness_score = min(1.0, color_variance / 1000.0)
         
-        # Generate freshness analysis
-        freshness_analysis = FreshnessAnalysis(
-            overall_freshness=freshness,
-            freshness_score=freshness_score,
-            spoilage_indicators=["Color analysis only"],
-            quality_indicators=["Good color distribution"],
-            estimated_days_remaining=7,
-            storage_recommendations=["Store in appropriate temperature"]
-        )
-        
-        return ImageClassificationResponse(
-            predicted_category=predicted_category,
-            category_confidence=0.6,  # Low confidence for rule-based
-            freshness_analysis=freshness_analysis,
-            detected_objects=["Food item"],
-            image_quality={
-                "brightness": float(np.mean(image_array)),
-                "contrast": float(np.std(image_array)),
-                "resolution": f"{image.width}x{image.height}"
-            },
-            processing_time_ms=50,
-            model_version="1.0.0-rule-based",
-            timestamp=datetime.utcnow()
-        )
+        with self.tracer.span("build_response"):
+            # Generate freshness analysis
+            freshness_analysis = FreshnessAnalysis(
+                overall_freshness=freshness,
+                freshness_score=freshness_score,
+                spoilage_indicators=["Color analysis only"],
+                quality_indicators=["Good color distribution"],
+                estimated_days_remaining=7,
+                storage_recommendations=["Store in appropriate temperature"]
+            )
+            
+            return ImageClassificationResponse(
+                predicted_category=predicted_category,
+                category_confidence=0.6,  # Low confidence for rule-based
+                freshness_analysis=freshness_analysis,
+                detected_objects=["Food item"],
+                image_quality=image_quality,
+                processing_time_ms=50,
+                model_version="1.0.0-rule-based",
+                timestamp=datetime.utcnow()
+            )
     
-    async def suggest_recipes(self, expiring_items: List[str], dietary_preferences: List[str], user_id: str) -> List[Dict[str, Any]]:
-        """Suggest recipes based on expiring items"""
+    async def suggest_recipes(
+        self,
+        request: RecipeSuggestionRequest,
+        user_id: str,
+        limit: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """Suggest recipes that use up the most urgent expiring items"""
         start_time = time.perf_counter()
         status = "success"
         metadata = {
-            "expiring_items": len(expiring_items),
-            "preferences": len(dietary_preferences),
+            "expiring_items": len(request.expiring_items),
+            "pantry_items": len(request.pantry_items),
+            "preferences": len(request.dietary_preferences),
             "user_id": user_id,
         }
 
         try:
-            suggestions = []
-            for item in expiring_items:
-                if 'apple' in item.lower():
-                    suggestions.append({
-                        "recipe_id": "apple-crumble-001",
-                        "name": "Apple Crumble",
-                        "description": "Classic apple crumble using fresh apples",
-                        "ingredients": [item, "flour", "butter", "sugar", "cinnamon"],
-                        "cooking_time_minutes": 45,
-                        "difficulty": "easy",
-                        "servings": 6,
-                        "priority_score": 0.9,
-                        "uses_expiring_items": [item]
-                    })
-                elif 'banana' in item.lower():
-                    suggestions.append({
-                        "recipe_id": "banana-bread-001",
-                        "name": "Banana Bread",
-                        "description": "Moist banana bread perfect for overripe bananas",
-                        "ingredients": [item, "flour", "eggs", "sugar", "butter"],
-                        "cooking_time_minutes": 60,
-                        "difficulty": "easy",
-                        "servings": 8,
-                        "priority_score": 0.95,
-                        "uses_expiring_items": [item]
-                    })
-                elif 'tomato' in item.lower():
-                    suggestions.append({
-                        "recipe_id": "tomato-soup-001",
-                        "name": "Fresh Tomato Soup",
-                        "description": "Creamy tomato soup using fresh tomatoes",
-                        "ingredients": [item, "onion", "garlic", "cream", "basil"],
-                        "cooking_time_minutes": 30,
-                        "difficulty": "easy",
-                        "servings": 4,
-                        "priority_score": 0.85,
-                        "uses_expiring_items": [item]
-                    })
+            if self.recipe_index is None:
+                return []
+            as_of = request.as_of or date.today()
+            expiring = [
+                (
+                    item.name,
+                    ingredient_urgency(
+                        item.expiry_date,
+                        item.prob_spoiled,
+                        as_of,
+                        settings.RECIPE_URGENCY_HALF_LIFE_DAYS,
+                        settings.RECIPE_DEFAULT_URGENCY,
+                    ),
+                )
+                for item in request.expiring_items
+            ]
+            ranked = self.recipe_index.rank(
+                expiring,
+                request.pantry_items,
+                k=limit,
+                pantry_weight=settings.RECIPE_PANTRY_WEIGHT,
+                missing_penalty=settings.RECIPE_MISSING_PENALTY,
+                dietary=dietary_mask(request.dietary_preferences),
+                semantic_weight=settings.RECIPE_SEMANTIC_WEIGHT,
+                semantic_candidates=settings.RECIPE_SEMANTIC_CANDIDATES,
+            )
 
-            suggestions.sort(key=lambda x: x['priority_score'], reverse=True)
-            return suggestions[:5]
+            suggestions = []
+            for recipe, score, used, missing in ranked:
+                suggestion = self.recipe_index.recipe(recipe)
+                suggestion["description"] = suggestion["instructions"].split(". ", 1)[0]
+                suggestion["priority_score"] = round(score, 3)
+                suggestion["uses_expiring_items"] = used
+                suggestion["missing_ingredients"] = missing
+                suggestions.append(suggestion)
+            return suggestions
         except Exception as exc:
             status = "failure"
             logger.error(f"Recipe suggestion failed: {exc}")
             raise
         finally:
-            await self._record_inference_event(
+            self._record_inference_event(
                 model_name="recipe",
                 operation="suggest_recipes",
                 start_time=start_time,
@@ -568,60 +922,64 @@ class MLService:
         }
 
         try:
-            series = self._build_demand_series(request)
-            if series.empty:
-                raise ValueError("No historic data available for forecasting")
-
-            window = request.smoothing_window or min(7, max(2, len(series) // 3 or 2))
-            smoothed = series.rolling(window=window, min_periods=1).mean()
-            trend = self._calculate_daily_trend(series)
-            std_estimate = float(series.rolling(window=window, min_periods=1).std().fillna(0.0).iloc[-1])
-            std_estimate = std_estimate or float(series.iloc[-window:].std() or 0.0)
-
-            last_date = series.index[-1]
-            base_value = float(smoothed.iloc[-1])
-            forecasts: List[ForecastedPoint] = []
-
-            for day_offset in range(1, request.horizon_days + 1):
-                target_date = last_date + timedelta(days=day_offset)
-                predicted = max(0.0, base_value + (trend * day_offset))
-                lower, upper = self._calculate_forecast_bounds(
-                    predicted,
-                    std_estimate,
-                    request.confidence_level,
-                    request.include_uncertainty,
-                )
-                forecasts.append(
-                    ForecastedPoint(
-                        date=target_date.date(),
-                        predicted_quantity=round(predicted, 2),
-                        lower_bound=lower,
-                        upper_bound=upper,
-                    )
-                )
+            with self.tracer.trace("forecasting"):
+                series = self._build_demand_series(request)
+                if series.empty:
+                    raise ValueError("No historic data available for forecasting")
 
-            summary = ForecastSummary(
-                recent_average=round(float(series.tail(window).mean()), 2),
-                recent_trend=round(trend, 3),
-                data_points=len(series),
-                model_version="1.1.0-trend-smoother",
-            )
+                with self.tracer.span("rolling"):
+                    window = request.smoothing_window or min(7, max(2, len(series) // 3 or 2))
+                    smoothed = series.rolling(window=window, min_periods=1).mean()
+                    std_estimate = float(series.rolling(window=window, min_periods=1).std().fillna(0.0).iloc[-1])
+                    std_estimate = std_estimate or float(series.iloc[-window:].std() or 0.0)
+                with self.tracer.span("trend"):
+                    trend = self._calculate_daily_trend(series)
 
-            return DemandForecastResponse(
-                item_name=request.item_name,
-                item_id=request.item_id,
-                location_id=request.location_id,
-                forecast=forecasts,
-                summary=summary,
-                generated_at=datetime.utcnow(),
-            )
+                with self.tracer.span("build_response"):
+                    last_date = series.index[-1]
+                    base_value = float(smoothed.iloc[-1])
+                    forecasts: List[ForecastedPoint] = []
+
+                    for day_offset in range(1, request.horizon_days + 1):
+                        target_date = last_date + timedelta(days=day_offset)
+                        predicted = max(0.0, base_value + (trend * day_offset))
+                        lower, upper = self._calculate_forecast_bounds(
+                            predicted,
+                            std_estimate,
+                            request.confidence_level,
+                            request.include_uncertainty,
+                        )
+                        forecasts.append(
+                            ForecastedPoint(
+                                date=target_date.date(),
+                                predicted_quantity=round(predicted, 2),
+                                lower_bound=lower,
+                                upper_bound=upper,
+                            )
+                        )
+
+                    summary = ForecastSummary(
+                        recent_average=round(float(series.tail(window).mean()), 2),
+                        recent_trend=round(trend, 3),
+                        data_points=len(series),
+                        model_version="1.1.0-trend-smoother",
+                    )
+
+                    return DemandForecastResponse(
+                        item_name=request.item_name,
+                        item_id=request.item_id,
+                        location_id=request.location_id,
+                        forecast=forecasts,
+                        summary=summary,
+                        generated_at=datetime.utcnow(),
+                    )
 
         except Exception as exc:
             status = "failure"
             logger.error(f"Demand forecasting failed: {exc}")
             raise
         finally:
-            await self._record_inference_event(
+            self._record_inference_event(
                 model_name="forecasting",
                 operation="forecast_demand",
                 start_time=start_time,
@@ -652,10 +1010,10 @@ class MLService:
             threshold = self._calculate_anomaly_threshold(request.sensitivity)
             anomalies: List[AnomalyPoint] = []
 
-            for idx, value in values.iteritems():
+            for idx, value in values.items():
                 baseline_mean = rolling_mean.loc[idx]
                 baseline_std = rolling_std.loc[idx] or 1e-6
-                if pd.isna(baseline_mean):
+                if np.isnan(baseline_mean):
                     continue
                 deviation = abs((value - baseline_mean) / baseline_std)
                 if deviation >= threshold:
@@ -687,7 +1045,7 @@ class MLService:
             logger.error(f"Anomaly detection failed: {exc}")
             raise
         finally:
-            await self._record_inference_event(
+            self._record_inference_event(
                 model_name="anomaly",
                 operation="detect_anomalies",
                 start_time=start_time,
@@ -701,17 +1059,21 @@ class MLService:
             "expiry_model": {
                 "loaded": self.expiry_model is not None,
                 "version": self.model_metadata.get('expiry', {}).get('version', 'unknown'),
-                "last_trained": self.model_metadata.get('expiry', {}).get('last_trained', 'unknown')
+                "last_trained": self.model_metadata.get('expiry', {}).get('last_trained', 'unknown'),
+                **self.model_readiness.get('expiry', {"status": "pending"})
             },
             "image_model": {
                 "loaded": self.image_model is not None,
                 "version": self.model_metadata.get('image', {}).get('version', 'unknown'),
-                "last_trained": self.model_metadata.get('image', {}).get('last_trained', 'unknown')
+                "last_trained": self.model_metadata.get('image', {}).get('last_trained', 'unknown'),
+                **self.model_readiness.get('image', {"status": "pending"})
             },
             "recipe_model": {
-                "loaded": self.recipe_model is not None,
+                "loaded": self.recipe_index is not None,
+                "recipes": len(self.recipe_index) if self.recipe_index is not None else 0,
                 "version": self.model_metadata.get('recipe', {}).get('version', 'unknown'),
-                "last_trained": self.model_metadata.get('recipe', {}).get('last_trained', 'unknown')
+                "last_trained": self.model_metadata.get('recipe', {}).get('last_trained', 'unknown'),
+                **self.model_readiness.get('recipe', {"status": "pending"})
             }
         }
         
@@ -745,10 +1107,11 @@ class MLService:
     async def cleanup(self):
         """Cleanup resources"""
         logger.info("Cleaning up ML service resources...")
-        # Cleanup any resources if needed
-        pass
+        for batcher in (self.expiry_batcher, self.image_batcher):
+            if batcher:
+                await batcher.stop()
 
-    async def _record_inference_event(
+    def _record_inference_event(
         self,
         model_name: str,
         operation: str,
@@ -756,19 +1119,19 @@ class MLService:
         status: str,
         metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
-        """Send inference metrics to monitoring service."""
+        """Send inference metrics to monitoring service (never awaits)."""
 
         if not self.monitoring:
             return
 
         try:
             latency_ms = max(0.0, (time.perf_counter() - start_time) * 1000)
-            await self.monitoring.record_inference(
-                model_name=model_name,
-                operation=operation,
-                latency_ms=latency_ms,
-                status=status,
-                metadata=metadata or {},
+            self.monitoring.record_inference_nowait(
+                model_name,
+                operation,
+                latency_ms,
+                status,
+                metadata,
             )
         except Exception as exc:
             logger.warning("Failed to record inference metrics", extra={"error": str(exc)})
@@ -793,24 +1156,28 @@ class MLService:
         except Exception as exc:
             logger.warning("Failed to record retraining event", extra={"error": str(exc)})
 
-    def _build_demand_series(self, request: DemandForecastRequest) -> pd.Series:
+    def _build_demand_series(self, request: DemandForecastRequest) -> "pd.Series":
         """Create a pandas Series indexed by date from demand history"""
-        df = pd.DataFrame([
-            {
-                "date": point.date,
-                "quantity": point.quantity,
-                "waste": point.waste or 0.0,
-            }
-            for point in request.history
-        ])
-        df["date"] = pd.to_datetime(df["date"])
-        df.sort_values("date", inplace=True)
-        df.set_index("date", inplace=True)
-        freq = "D" if request.granularity.value == "daily" else "W"
-        series = df["quantity"].resample(freq).sum()
+        import pandas as pd
+
+        with self.tracer.span("to_dataframe"):
+            df = pd.DataFrame([
+                {
+                    "date": point.date,
+                    "quantity": point.quantity,
+                    "waste": point.waste or 0.0,
+                }
+                for point in request.history
+            ])
+            df["date"] = pd.to_datetime(df["date"])
+            df.sort_values("date", inplace=True)
+            df.set_index("date", inplace=True)
+        with self.tracer.span("resample"):
+            freq = "D" if request.granularity.value == "daily" else "W"
+            series = df["quantity"].resample(freq).sum()
         return series
 
-    def _calculate_daily_trend(self, series: pd.Series) -> float:
+    def _calculate_daily_trend(self, series: "pd.Series") -> float:
         """Estimate daily trend via linear regression"""
         if len(series) < 2:
             return 0.0
@@ -844,8 +1211,10 @@ class MLService:
             return 1.28
         return 1.0
 
-    def _build_anomaly_dataframe(self, request: AnomalyDetectionRequest) -> pd.DataFrame:
+    def _build_anomaly_dataframe(self, request: AnomalyDetectionRequest) -> "pd.DataFrame":
         """Build dataframe for anomaly detection"""
+        import pandas as pd
+
         df = pd.DataFrame([
             {
                 "date": point.date,
@@ -883,11 +1252,6 @@ class MLService:
         # This would implement actual model training
         pass
     
-    async def _train_recipe_model(self):
-        """Train recipe recommendation model"""
-        # This would implement actual model training
-        pass
-    
     async def _create_fallback_expiry_model(self):
         """Create fallback expiry model"""
         self.expiry_model = None  # Use rule-based prediction
@@ -908,10 +1272,10 @@ class MLService:
     
     async def _create_fallback_recipe_model(self):
         """Create fallback recipe model"""
-        self.recipe_model = None  # Use rule-based recommendations
+        self.recipe_index = None  # No corpus, no suggestions
         self.model_metadata['recipe'] = {
             'version': '1.0.0-fallback',
-            'type': 'rule-based',
+            'type': 'unavailable',
             'last_trained': datetime.utcnow().isoformat()
         }
     
@@ -933,7 +1297,7 @@ class MLService:
             prediction_timestamp=datetime.utcnow()
         )
     
-    def _create_fallback_classification(self, request: ImageClassificationRequest) -> ImageClassificationResponse:
+    def _create_fallback_classification(self, request: ImageClassificationOptions) -> ImageClassificationResponse:
         """Create fallback classification when model fails"""
         return ImageClassificationResponse(
             predicted_category=FoodCategory.OTHER,
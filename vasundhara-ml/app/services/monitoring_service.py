@@ -4,24 +4,143 @@ Monitoring service for inference metrics and retraining events.
 
 from __future__ import annotations
 
-import asyncio
-from collections import defaultdict, deque
+import os
+import socket
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
 from datetime import datetime
-from statistics import mean
-from typing import Deque, Dict, Optional
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# Status codes stored in the per-model ring buffers
+_STATUS_CODES = {"success": 0, "failure": 1}
+
+# Upper bounds of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+BUCKET_LABELS = tuple(str(bound) for bound in LATENCY_BUCKETS_MS) + ("inf",)
+
+# Upper bounds of the micro-batching histograms; the last bucket is +Inf
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+BATCH_SIZE_LABELS = tuple(str(bound) for bound in BATCH_SIZE_BUCKETS) + ("inf",)
+QUEUE_WAIT_BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 25, 50, 100)
+QUEUE_WAIT_LABELS = tuple(str(bound) for bound in QUEUE_WAIT_BUCKETS_MS) + ("inf",)
+
+
+class _ModelStats:
+    """Preallocated counters and latency/status ring buffers for one model."""
+
+    __slots__ = (
+        "count", "success", "failure", "latency_total", "latencies", "statuses", "buckets", "capacity"
+    )
+
+    def __init__(self, capacity: int):
+        self.count = 0
+        self.success = 0
+        self.failure = 0
+        self.latency_total = 0.0
+        self.latencies = array("d", bytes(8 * capacity))
+        self.statuses = array("b", bytes(capacity))
+        self.buckets = array("q", bytes(8 * len(BUCKET_LABELS)))
+        self.capacity = capacity
+
+    def window(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the filled part of the ring buffers as NumPy views."""
+        filled = min(self.count, self.capacity)
+        latencies = np.frombuffer(self.latencies, dtype=np.float64)[:filled]
+        statuses = np.frombuffer(self.statuses, dtype=np.int8)[:filled]
+        return latencies, statuses
+
+
+class _BatchStats:
+    """Batch-size and queue-wait histograms for one micro-batched model."""
+
+    __slots__ = ("batches", "items", "queue_wait_total", "size_buckets", "wait_buckets")
+
+    def __init__(self):
+        self.batches = 0
+        self.items = 0
+        self.queue_wait_total = 0.0
+        self.size_buckets = array("q", bytes(8 * len(BATCH_SIZE_LABELS)))
+        self.wait_buckets = array("q", bytes(8 * len(QUEUE_WAIT_LABELS)))
 
 
 class MonitoringService:
-    """Capture lightweight metrics for ML inferences and retraining."""
+    """Capture lightweight metrics for ML inferences and retraining.
 
-    def __init__(self, max_inference_events: int = 250, max_retraining_events: int = 50):
-        self._lock = asyncio.Lock()
-        self._inference_events: Deque[Dict[str, object]] = deque(maxlen=max_inference_events)
+    Inference recording never awaits or locks: everything runs on the event
+    loop thread, counters live in preallocated arrays and only a sample of
+    full metadata events is kept (failures are always kept).
+    """
+
+    def __init__(
+        self,
+        max_inference_events: int = 250,
+        max_retraining_events: int = 50,
+        ring_size: Optional[int] = None,
+        sample_rate: Optional[float] = None,
+    ):
+        self._hostname = socket.gethostname()
+        self._ring_size = ring_size or settings.MONITORING_RING_SIZE
+        rate = settings.MONITORING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self._sample_rate = min(max(rate, 0.0), 1.0)
+        self._successes_seen = 0
+        self._successes_kept = 0
+        self._models: Dict[str, _ModelStats] = {}
+        self._stages: Dict[Tuple[str, str], List[float]] = {}
+        self._batches: Dict[str, _BatchStats] = {}
+        self._inference_events: Deque[Tuple[Any, ...]] = deque(maxlen=max_inference_events)
         self._retraining_events: Deque[Dict[str, object]] = deque(maxlen=max_retraining_events)
-        self._model_counts: Dict[str, int] = defaultdict(int)
-        self._model_success: Dict[str, int] = defaultdict(int)
-        self._model_failure: Dict[str, int] = defaultdict(int)
-        self._latency_totals: Dict[str, float] = defaultdict(float)
+
+    @property
+    def instance_id(self) -> str:
+        """``host:pid`` of this process, read on each use so workers forked from a preloaded master differ"""
+        return f"{self._hostname}:{os.getpid()}"
+
+    def record_inference_nowait(
+        self,
+        model_name: str,
+        operation: str,
+        latency_ms: float,
+        status: str,
+        metadata: Optional[Dict[str, object]] = None,
+    ) -> None:
+        """Record an inference event without awaiting."""
+
+        stats = self._models.get(model_name)
+        if stats is None:
+            stats = self._models[model_name] = _ModelStats(self._ring_size)
+
+        code = _STATUS_CODES.get(status, 1)
+        slot = stats.count % stats.capacity
+        stats.latencies[slot] = latency_ms
+        stats.statuses[slot] = code
+        stats.count += 1
+        stats.latency_total += latency_ms
+        stats.buckets[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        if code:
+            stats.failure += 1
+        else:
+            stats.success += 1
+
+        if code:
+            self._inference_events.append(
+                (time.time(), model_name, operation, latency_ms, status, metadata)
+            )
+        elif self._sample_rate:
+            # Keep one event each time seen * rate crosses an integer, so any
+            # rate in [0, 1] is honoured to within one event, without a random draw
+            self._successes_seen += 1
+            kept = int(self._successes_seen * self._sample_rate)
+            if kept > self._successes_kept:
+                self._successes_kept = kept
+                self._inference_events.append(
+                    (time.time(), model_name, operation, latency_ms, status, metadata)
+                )
 
     async def record_inference(
         self,
@@ -33,23 +152,32 @@ class MonitoringService:
     ) -> None:
         """Record an inference event for later aggregation."""
 
-        event = {
-            "model": model_name,
-            "operation": operation,
-            "latency_ms": round(latency_ms, 2),
-            "status": status,
-            "metadata": metadata or {},
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        self.record_inference_nowait(model_name, operation, latency_ms, status, metadata)
 
-        async with self._lock:
-            self._inference_events.append(event)
-            self._model_counts[model_name] += 1
-            self._latency_totals[model_name] += latency_ms
-            if status == "success":
-                self._model_success[model_name] += 1
-            else:
-                self._model_failure[model_name] += 1
+    def record_stage(self, model_name: str, stage: str, duration_ms: float) -> None:
+        """Record the duration of one traced stage of an inference."""
+
+        stats = self._stages.get((model_name, stage))
+        if stats is None:
+            # count, total duration, max duration
+            stats = self._stages[(model_name, stage)] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += duration_ms
+        if duration_ms > stats[2]:
+            stats[2] = duration_ms
+
+    def record_batch(self, model_name: str, batch_size: int, queue_waits_ms: Sequence[float]) -> None:
+        """Record one micro-batched model call and how long each item queued for it."""
+
+        stats = self._batches.get(model_name)
+        if stats is None:
+            stats = self._batches[model_name] = _BatchStats()
+        stats.batches += 1
+        stats.items += batch_size
+        stats.size_buckets[bisect_left(BATCH_SIZE_BUCKETS, batch_size)] += 1
+        for wait_ms in queue_waits_ms:
+            stats.queue_wait_total += wait_ms
+            stats.wait_buckets[bisect_left(QUEUE_WAIT_BUCKETS_MS, wait_ms)] += 1
 
     async def record_retraining_event(
         self,
@@ -59,38 +187,213 @@ class MonitoringService:
     ) -> None:
         """Record a retraining lifecycle event."""
 
-        event = {
+        self._retraining_events.append({
             "status": status,
             "initiated_by": initiated_by,
             "details": details or {},
             "timestamp": datetime.utcnow().isoformat(),
-        }
+        })
 
-        async with self._lock:
-            self._retraining_events.append(event)
+    def export_counters(self) -> Dict[str, float]:
+        """Return cumulative per-model counters as a flat mapping."""
+
+        counters: Dict[str, float] = {}
+        for model, stats in self._models.items():
+            counters[f"{model}:count"] = stats.count
+            counters[f"{model}:success"] = stats.success
+            counters[f"{model}:failure"] = stats.failure
+            counters[f"{model}:latency_total_ms"] = round(stats.latency_total, 3)
+            for label, bucket_count in zip(BUCKET_LABELS, stats.buckets):
+                counters[f"{model}:bucket:{label}"] = bucket_count
+        for (model, stage), (count, total, _max) in self._stages.items():
+            counters[f"{model}:stage:{stage}:count"] = count
+            counters[f"{model}:stage:{stage}:total_ms"] = round(total, 3)
+        for model, batch_stats in self._batches.items():
+            counters[f"{model}:batch:batches"] = batch_stats.batches
+            counters[f"{model}:batch:items"] = batch_stats.items
+            counters[f"{model}:batch:queue_wait_total_ms"] = round(batch_stats.queue_wait_total, 3)
+            for label, bucket_count in zip(BATCH_SIZE_LABELS, batch_stats.size_buckets):
+                counters[f"{model}:batch:size:{label}"] = bucket_count
+            for label, bucket_count in zip(QUEUE_WAIT_LABELS, batch_stats.wait_buckets):
+                counters[f"{model}:batch:wait:{label}"] = bucket_count
+        return counters
+
+    async def flush_to_redis(self, redis_client) -> bool:
+        """Publish this process' counters to Redis for cross-replica aggregation."""
+
+        return await redis_client.set_hash(
+            f"metrics:instance:{self.instance_id}",
+            self.export_counters(),
+            ttl=settings.MONITORING_FLUSH_TTL,
+        )
 
     async def get_metrics(self) -> Dict[str, object]:
         """Return aggregated metrics snapshot."""
 
-        async with self._lock:
-            model_metrics = {}
-            for model, count in self._model_counts.items():
-                latency_list = [evt["latency_ms"] for evt in self._inference_events if evt["model"] == model]
-                avg_latency = round(mean(latency_list), 2) if latency_list else 0.0
-                success = self._model_success.get(model, 0)
-                failure = self._model_failure.get(model, 0)
-                total = count or 1
-                success_rate = round(success / total, 3)
-                model_metrics[model] = {
-                    "count": count,
-                    "success": success,
-                    "failure": failure,
-                    "success_rate": success_rate,
-                    "avg_latency_ms": avg_latency,
-                }
+        model_metrics = {}
+        for model, stats in list(self._models.items()):
+            latencies, statuses = stats.window()
+            if latencies.size:
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+                avg_latency = round(float(latencies.mean()), 2)
+                window_failures = int(np.count_nonzero(statuses))
+            else:
+                p50 = p95 = p99 = 0.0
+                avg_latency = 0.0
+                window_failures = 0
+            total = stats.count or 1
+            model_metrics[model] = {
+                "count": stats.count,
+                "success": stats.success,
+                "failure": stats.failure,
+                "success_rate": round(stats.success / total, 3),
+                "avg_latency_ms": avg_latency,
+                "p50_latency_ms": round(float(p50), 2),
+                "p95_latency_ms": round(float(p95), 2),
+                "p99_latency_ms": round(float(p99), 2),
+                "window_size": int(latencies.size),
+                "window_failures": window_failures,
+                "latency_histogram": dict(zip(BUCKET_LABELS, stats.buckets)),
+            }
+
+        stage_metrics: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (model, stage), (count, total, longest) in list(self._stages.items()):
+            stage_metrics.setdefault(model, {})[stage] = {
+                "count": count,
+                "avg_ms": round(total / count, 3),
+                "max_ms": round(longest, 3),
+            }
 
-            return {
-                "models": model_metrics,
-                "recent_inferences": list(self._inference_events),
-                "recent_retraining_events": list(self._retraining_events),
+        batch_metrics = {
+            model: _summarize_batching(
+                batch_stats.batches,
+                batch_stats.items,
+                batch_stats.queue_wait_total,
+                dict(zip(BATCH_SIZE_LABELS, batch_stats.size_buckets)),
+                dict(zip(QUEUE_WAIT_LABELS, batch_stats.wait_buckets)),
+            )
+            for model, batch_stats in list(self._batches.items())
+        }
+
+        recent_inferences = [
+            {
+                "model": model,
+                "operation": operation,
+                "latency_ms": round(latency_ms, 2),
+                "status": status,
+                "metadata": metadata or {},
+                "timestamp": datetime.utcfromtimestamp(timestamp).isoformat(),
             }
+            for timestamp, model, operation, latency_ms, status, metadata in list(self._inference_events)
+        ]
+
+        return {
+            "instance_id": self.instance_id,
+            "models": model_metrics,
+            "stages": stage_metrics,
+            "batching": batch_metrics,
+            "recent_inferences": recent_inferences,
+            "recent_retraining_events": list(self._retraining_events),
+        }
+
+
+def merge_counters(snapshots: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Sum flat counter snapshots published by several processes."""
+
+    merged: Dict[str, float] = {}
+    for snapshot in snapshots:
+        for key, value in snapshot.items():
+            merged[key] = merged.get(key, 0.0) + float(value)
+    return merged
+
+
+def summarize_counters(counters: Dict[str, float]) -> Dict[str, Dict[str, object]]:
+    """Turn flat counters into per-model metrics with histogram percentiles."""
+
+    per_model: Dict[str, Dict[str, float]] = {}
+    per_stage: Dict[str, Dict[str, Dict[str, float]]] = {}
+    per_batch: Dict[str, Dict[str, float]] = {}
+    for key, value in counters.items():
+        model, _, field = key.partition(":")
+        if field.startswith("stage:"):
+            _, stage, stage_field = field.split(":", 2)
+            per_stage.setdefault(model, {}).setdefault(stage, {})[stage_field] = value
+        elif field.startswith("batch:"):
+            per_batch.setdefault(model, {})[field[len("batch:"):]] = value
+        else:
+            per_model.setdefault(model, {})[field] = value
+
+    summary: Dict[str, Dict[str, object]] = {}
+    for model in per_batch.keys() - per_model.keys():
+        per_model[model] = {}
+    for model, fields in per_model.items():
+        count = int(fields.get("count", 0))
+        success = int(fields.get("success", 0))
+        histogram = {label: int(fields.get(f"bucket:{label}", 0)) for label in BUCKET_LABELS}
+        summary[model] = {
+            "count": count,
+            "success": success,
+            "failure": int(fields.get("failure", 0)),
+            "success_rate": round(success / (count or 1), 3),
+            "avg_latency_ms": round(fields.get("latency_total_ms", 0.0) / (count or 1), 2),
+            "p50_latency_ms": _histogram_quantile(histogram, 0.50),
+            "p95_latency_ms": _histogram_quantile(histogram, 0.95),
+            "p99_latency_ms": _histogram_quantile(histogram, 0.99),
+            "latency_histogram": histogram,
+            "stages": {
+                stage: {
+                    "count": int(stage_fields.get("count", 0)),
+                    "avg_ms": round(stage_fields.get("total_ms", 0.0) / (stage_fields.get("count") or 1), 3),
+                }
+                for stage, stage_fields in per_stage.get(model, {}).items()
+            },
+        }
+        batch_fields = per_batch.get(model)
+        if batch_fields:
+            summary[model]["batching"] = _summarize_batching(
+                int(batch_fields.get("batches", 0)),
+                int(batch_fields.get("items", 0)),
+                batch_fields.get("queue_wait_total_ms", 0.0),
+                {label: int(batch_fields.get(f"size:{label}", 0)) for label in BATCH_SIZE_LABELS},
+                {label: int(batch_fields.get(f"wait:{label}", 0)) for label in QUEUE_WAIT_LABELS},
+            )
+    return summary
+
+
+def _summarize_batching(
+    batches: int,
+    items: int,
+    queue_wait_total_ms: float,
+    size_histogram: Dict[str, int],
+    wait_histogram: Dict[str, int],
+) -> Dict[str, object]:
+    """Batch-size and queue-wait summary shared by local and fleet metrics."""
+
+    return {
+        "batches": batches,
+        "items": items,
+        "avg_batch_size": round(items / (batches or 1), 2),
+        "avg_queue_wait_ms": round(queue_wait_total_ms / (items or 1), 3),
+        "p95_queue_wait_ms": _histogram_quantile(wait_histogram, 0.95, QUEUE_WAIT_BUCKETS_MS),
+        "batch_size_histogram": size_histogram,
+        "queue_wait_histogram": wait_histogram,
+    }
+
+
+def _histogram_quantile(
+    histogram: Dict[str, int],
+    quantile: float,
+    bounds: Sequence[float] = LATENCY_BUCKETS_MS,
+) -> float:
+    """Estimate a quantile as the upper bound of the bucket that contains it."""
+
+    total = sum(histogram.values())
+    if not total:
+        return 0.0
+    threshold = quantile * total
+    cumulative = 0
+    for bound in bounds:
+        cumulative += histogram[str(bound)]
+        if cumulative >= threshold:
+            return float(bound)
+    return float(bounds[-1])
@@ -0,0 +1,150 @@
+"""
+On-demand CPU and memory profiling of a running service process
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profiling session is already running in this process."""
+
+
+def _collapse(frame, thread_name: str) -> str:
+    """Render a frame chain as one ';'-separated collapsed stack line"""
+    frames: List[str] = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    frames.append(thread_name)
+    return ";".join(reversed(frames))
+
+
+class ProfilerService:
+    """Bounded, one-at-a-time profiling sessions for a live worker.
+
+    CPU mode samples the event loop thread on a ``SIGPROF`` interval timer
+    (process CPU time, so idle waiting is not counted) and returns collapsed
+    ("folded") stacks ready for flamegraph.pl or speedscope. Where signals are
+    unavailable it falls back to sampling every thread from a helper thread.
+    Memory mode diffs two ``tracemalloc`` snapshots taken at the start and end
+    of the window.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def _clamp_duration(self, duration_seconds: float) -> float:
+        return max(0.1, min(float(duration_seconds), settings.PROFILER_MAX_SECONDS))
+
+    async def profile_cpu(self, duration_seconds: float, interval_ms: float = 5.0) -> str:
+        """Sample stacks for the window and return them in collapsed format"""
+        if self.busy:
+            raise ProfilerBusyError("A profiling session is already running")
+
+        async with self._lock:
+            duration = self._clamp_duration(duration_seconds)
+            interval = max(1.0, interval_ms) / 1000
+            stacks: Counter = Counter()
+            logger.info(f"CPU profiling for {duration}s at {interval * 1000:.0f}ms intervals")
+
+            if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+                await self._profile_with_timer(stacks, duration, interval)
+            else:
+                await self._profile_with_thread(stacks, duration, interval)
+
+            return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+    @staticmethod
+    async def _profile_with_timer(stacks: Counter, duration: float, interval: float) -> None:
+        def on_sample(signum, frame):
+            stacks[_collapse(frame, "MainThread")] += 1
+
+        previous = signal.signal(signal.SIGPROF, on_sample)
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, previous)
+
+    async def _profile_with_thread(self, stacks: Counter, duration: float, interval: float) -> None:
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self._sample_stacks,
+            args=(stacks, stop, interval),
+            name="vasundhara-profiler",
+            daemon=True,
+        )
+        sampler.start()
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join)
+
+    @staticmethod
+    def _sample_stacks(stacks: Counter, stop: threading.Event, interval: float) -> None:
+        sampler_id = threading.get_ident()
+        names = {}
+        while not stop.wait(interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_id:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stacks[_collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+
+    async def snapshot_memory(self, duration_seconds: float, top_n: int = 25) -> Dict[str, Any]:
+        """Report the allocation sites that grew the most during the window"""
+        if self.busy:
+            raise ProfilerBusyError("A profiling session is already running")
+
+        async with self._lock:
+            duration = self._clamp_duration(duration_seconds)
+            started_here = not tracemalloc.is_tracing()
+            if started_here:
+                tracemalloc.start(settings.PROFILER_TRACEMALLOC_FRAMES)
+
+            try:
+                before = await asyncio.to_thread(tracemalloc.take_snapshot)
+                await asyncio.sleep(duration)
+                after = await asyncio.to_thread(tracemalloc.take_snapshot)
+                traced_current, traced_peak = tracemalloc.get_traced_memory()
+            finally:
+                if started_here:
+                    tracemalloc.stop()
+
+            stats = await asyncio.to_thread(after.compare_to, before, "traceback")
+            return {
+                "duration_seconds": duration,
+                "traced_memory_bytes": traced_current,
+                "traced_peak_bytes": traced_peak,
+                "top_growth": [
+                    {
+                        "size_diff_bytes": stat.size_diff,
+                        "size_bytes": stat.size,
+                        "count_diff": stat.count_diff,
+                        "traceback": stat.traceback.format(),
+                    }
+                    for stat in stats[:top_n]
+                ],
+            }
@@ -0,0 +1,367 @@
+"""
+Recipe retrieval and ranking over normalized ingredient tokens
+"""
+
+import json
+import logging
+import re
+from datetime import date
+from functools import lru_cache, reduce
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from app.utils.ingredients import IngredientMatcher, ingredient_tokens, normalize_ingredient
+
+logger = logging.getLogger(__name__)
+
+_NON_LETTERS = re.compile(r"[^a-z]+")
+
+
+def _slug(text: str) -> str:
+    return _NON_LETTERS.sub("-", text.lower()).strip("-") or "recipe"
+
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+# Normalized ingredients assumed to be in every kitchen; never counted as missing
+STAPLE_INGREDIENTS = {"salt", "water", "oil", "sugar", "pepper", "black pepper", "ice"}
+
+MEAT_TOKENS = {
+    "chicken", "mutton", "lamb", "goat", "beef", "pork", "bacon", "ham", "sausage", "salami",
+    "pepperoni", "turkey", "duck", "keema", "meat", "gelatin", "lard",
+}
+SEAFOOD_TOKENS = {"fish", "prawn", "shrimp", "crab", "lobster", "squid", "anchovy", "tuna", "salmon", "sardine"}
+DAIRY_TOKENS = {"milk", "paneer", "butter", "ghee", "cream", "cheese", "yogurt", "buttermilk", "khoya", "malai"}
+# Modifiers that make a dairy word plant-based ("coconut milk", "peanut butter")
+PLANT_DAIRY_MODIFIERS = {"coconut", "almond", "soy", "oat", "cashew", "peanut"}
+GLUTEN_TOKENS = {
+    "wheat", "maida", "atta", "semolina", "rava", "sooji", "suji", "barley", "rye", "bread", "pav",
+    "bun", "pasta", "noodle", "vermicelli", "seitan", "couscous", "bhature", "roti", "paratha",
+}
+GLUTEN_FREE_FLOURS = {"rice", "gram", "besan", "corn", "chickpea", "almond", "coconut", "millet", "ragi", "jowar", "bajra"}
+NUT_TOKENS = {"nut", "almond", "cashew", "peanut", "walnut", "pistachio", "hazelnut", "pecan", "macadamia"}
+ALLIUM_TOKENS = {"onion", "garlic", "shallot", "leek", "chive"}
+# Jain diets also exclude root vegetables and fungi
+ROOT_TOKENS = {"potato", "carrot", "beetroot", "radish", "ginger", "turnip", "yam", "mushroom"}
+
+# Bit of each dietary constraint in the per-recipe violation masks
+DIETARY_BITS = {
+    "vegetarian": 0,
+    "vegan": 1,
+    "eggless": 2,
+    "pescatarian": 3,
+    "dairy-free": 4,
+    "gluten-free": 5,
+    "nut-free": 6,
+    "no-onion-garlic": 7,
+    "jain": 8,
+}
+DIETARY_ALIASES = {
+    "veg": "vegetarian", "veggie": "vegetarian", "lacto-vegetarian": "vegetarian",
+    "plant-based": "vegan",
+    "egg-free": "eggless", "no-egg": "eggless", "no-eggs": "eggless",
+    "pescetarian": "pescatarian",
+    "lactose-free": "dairy-free", "no-dairy": "dairy-free", "lactose-intolerant": "dairy-free",
+    "gluten-intolerant": "gluten-free", "celiac": "gluten-free", "coeliac": "gluten-free", "no-gluten": "gluten-free",
+    "nut-allergy": "nut-free", "no-nuts": "nut-free", "peanut-free": "nut-free", "tree-nut-free": "nut-free",
+    "satvik": "no-onion-garlic", "sattvic": "no-onion-garlic", "no-onion-no-garlic": "no-onion-garlic",
+}
+
+
+def dietary_violations(tokens: Sequence[str]) -> int:
+    """Bitmask of the dietary constraints an ingredient with these name tokens breaks"""
+    words = set(tokens)
+    meat = bool(words & MEAT_TOKENS)
+    seafood = bool(words & SEAFOOD_TOKENS)
+    egg = "egg" in words
+    dairy = bool(words & DAIRY_TOKENS) and not words & PLANT_DAIRY_MODIFIERS
+    gluten = bool(words & GLUTEN_TOKENS) or ("flour" in words and not words & GLUTEN_FREE_FLOURS)
+    allium = bool(words & ALLIUM_TOKENS)
+
+    broken = []
+    if meat or seafood or egg:
+        broken.append("vegetarian")
+    if meat or seafood or egg or dairy or "honey" in words:
+        broken.append("vegan")
+    if egg:
+        broken.append("eggless")
+    if meat:
+        broken.append("pescatarian")
+    if dairy:
+        broken.append("dairy-free")
+    if gluten:
+        broken.append("gluten-free")
+    if words & NUT_TOKENS:
+        broken.append("nut-free")
+    if allium:
+        broken.append("no-onion-garlic")
+    if meat or seafood or egg or allium or words & ROOT_TOKENS:
+        broken.append("jain")
+    mask = 0
+    for name in broken:
+        mask |= 1 << DIETARY_BITS[name]
+    return mask
+
+
+def dietary_mask(preferences: Iterable[str]) -> int:
+    """Bitmask of the known constraints among free-text ``preferences``; others are ignored"""
+    mask = 0
+    for preference in preferences:
+        key = _NON_LETTERS.sub("-", preference.lower()).strip("-")
+        key = DIETARY_ALIASES.get(key, key)
+        if key in DIETARY_BITS:
+            mask |= 1 << DIETARY_BITS[key]
+        else:
+            logger.debug(f"Ignoring unknown dietary preference {preference!r}")
+    return mask
+
+
+def ingredient_urgency(
+    expiry_date: Optional[date],
+    prob_spoiled: Optional[float],
+    as_of: date,
+    half_life_days: float,
+    default: float,
+) -> float:
+    """Urgency in (0, 1] of using an item: 1 when it expires today or has spoiled.
+
+    Days to expiry decay with ``half_life_days``; a spoilage probability is
+    used as is. With both, the more urgent one wins; with neither, ``default``.
+    """
+    urgency = None
+    if expiry_date is not None:
+        days_left = max(0, (expiry_date - as_of).days)
+        urgency = 0.5 ** (days_left / half_life_days) if half_life_days > 0 else float(days_left == 0)
+    if prob_spoiled is not None:
+        urgency = prob_spoiled if urgency is None else max(urgency, prob_spoiled)
+    return default if urgency is None else max(urgency, 1e-3)
+
+
+class RecipeIndex:
+    """Recipe x ingredient incidence matrix plus a token -> ingredient index.
+
+    Recipe ingredient lines are normalized to name tokens and each distinct
+    normalized ingredient gets a column. ``matrix`` is a CSR matrix with a 1
+    for every (recipe, ingredient) pair, and ``token_ingredients`` maps a
+    token to the columns containing it. Query items are resolved to
+    vocabulary tokens by an ``IngredientMatcher`` (typos, synonyms, brand
+    words dropped) and match every ingredient whose tokens include all of
+    the item's tokens, so "apples" matches "green apple" but "green" alone
+    does not match "apple".
+
+    ``rank`` scores the whole corpus with one sparse product: the matrix
+    times an (ingredients x 2) block holding the urgency of each matched
+    ingredient and whether it is on hand.
+
+    ``dietary`` holds a ``uint64`` mask per recipe of the ``DIETARY_BITS``
+    constraints its ingredients break, computed once at build time, so a
+    query with any number of constraints is filtered by a single bitwise AND.
+
+    ``semantic`` is an optional ``RecipeEmbeddings`` (attached after build)
+    used as a secondary candidate generator.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]]):
+        self.recipe_ids: List[str] = []
+        self.titles: List[str] = []
+        self.ingredients: List[List[str]] = []
+        self.instructions: List[str] = []
+
+        ingredient_ids: Dict[str, int] = {}
+        token_ingredients: Dict[str, List[int]] = {}
+        indices: List[int] = []
+        indptr: List[int] = [0]
+        seen_ids = set()
+
+        for record in records:
+            title = str(record.get("Title") or record.get("title") or "").strip()
+            lines = record.get("Ingredients") or record.get("ingredients") or []
+            if not title or not lines:
+                continue
+            recipe = len(self.titles)
+            recipe_id = str(record.get("id") or record.get("recipe_id") or _slug(title))
+            if recipe_id in seen_ids:
+                recipe_id = f"{recipe_id}-{recipe}"
+            seen_ids.add(recipe_id)
+
+            self.recipe_ids.append(recipe_id)
+            self.titles.append(title)
+            self.ingredients.append([str(line) for line in lines])
+            self.instructions.append(str(record.get("Instructions") or record.get("instructions") or ""))
+
+            used = set()
+            for line in lines:
+                tokens = ingredient_tokens(str(line))
+                if not tokens:
+                    continue
+                key = " ".join(tokens)
+                ingredient = ingredient_ids.get(key)
+                if ingredient is None:
+                    ingredient = ingredient_ids[key] = len(ingredient_ids)
+                    for token in tokens:
+                        token_ingredients.setdefault(token, []).append(ingredient)
+                used.add(ingredient)
+            indices.extend(sorted(used))
+            indptr.append(len(indices))
+
+        self.ingredient_ids = ingredient_ids
+        ingredient_violations = np.array(
+            [dietary_violations(key.split()) for key in ingredient_ids], dtype=np.uint64
+        )
+        self.dietary = np.zeros(len(self.titles), dtype=np.uint64)
+        if indices:
+            # OR over each recipe's ingredient columns; reduceat misreads empty rows, which break nothing
+            starts = np.array(indptr[:-1])
+            non_empty = np.diff(indptr) > 0
+            self.dietary[non_empty] = np.bitwise_or.reduceat(ingredient_violations[indices], starts[non_empty])
+        self.token_ingredients = {
+            token: np.array(ingredients, dtype=np.int32) for token, ingredients in token_ingredients.items()
+        }
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(self.titles), len(ingredient_ids)),
+        )
+        self.ingredient_counts = np.maximum(np.diff(self.matrix.indptr), 1).astype(np.float32)
+        self.matcher = IngredientMatcher({token: len(ids) for token, ids in self.token_ingredients.items()})
+        self.staples = np.zeros(len(ingredient_ids), dtype=bool)
+        self.staples[[ingredient_ids[key] for key in STAPLE_INGREDIENTS if key in ingredient_ids]] = True
+        self._ingredients_for = lru_cache(maxsize=4096)(self._match_ingredients)
+        self.semantic = None
+
+    @classmethod
+    def load(cls, path: str) -> "RecipeIndex":
+        """Build the index from a JSON list of ``{"Title", "Ingredients", "Instructions"}`` records"""
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        index = cls(records)
+        logger.info(
+            f"Recipe index built: {len(index)} recipes, {len(index.ingredient_ids)} ingredients, "
+            f"{index.matrix.nnz} recipe ingredients"
+        )
+        return index
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def _match_ingredients(self, tokens: Tuple[str, ...]) -> np.ndarray:
+        """Sorted ids of ingredients containing all ``tokens``"""
+        postings = [self.token_ingredients.get(token) for token in tokens]
+        if not postings or any(posting is None for posting in postings):
+            return _EMPTY
+        postings.sort(key=len)
+        return reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), postings)
+
+    def ingredients_for(self, item: str) -> np.ndarray:
+        return self._ingredients_for(self.matcher.match(item))
+
+    def rank(
+        self,
+        expiring: Sequence[Tuple[str, float]],
+        pantry: Sequence[str] = (),
+        k: int = 5,
+        pantry_weight: float = 0.5,
+        missing_penalty: float = 0.1,
+        dietary: int = 0,
+        semantic_weight: float = 0.0,
+        semantic_candidates: int = 50,
+    ) -> List[Tuple[int, float, List[str], List[str]]]:
+        """Top-k recipes for ``(item name, urgency)`` pairs and on-hand ``pantry`` items.
+
+        A recipe scores the summed urgency of its ingredients matched by
+        expiring items, plus ``pantry_weight`` times the share of its
+        ingredients on hand (expiring, pantry or staple), minus
+        ``missing_penalty`` per ingredient not on hand. Only recipes using at
+        least one expiring item are returned, as ``(recipe, score, expiring
+        items used, missing ingredient lines)`` tuples, best first. Recipes
+        breaking any constraint in the ``dietary`` mask are skipped.
+
+        With embeddings attached, an item the keyword matcher cannot resolve
+        stands in for its nearest ingredients (urgency scaled by similarity),
+        and the ``semantic_candidates`` recipes nearest to the expiring items
+        join the candidates with a bonus of ``semantic_weight`` times their
+        cosine similarity.
+        """
+        if not len(self) or not expiring:
+            return []
+
+        # Column 0: urgency of each ingredient; column 1: 1 if on hand
+        weights = np.zeros((len(self.ingredient_ids), 2), dtype=np.float32)
+        weights[self.staples, 1] = 1.0
+        matches = []
+        for name, urgency in expiring:
+            ingredients = self.ingredients_for(name)
+            if ingredients.size:
+                weights[ingredients, 0] = np.maximum(weights[ingredients, 0], urgency)
+                weights[ingredients, 1] = 1.0
+                matches.append((name, ingredients))
+            elif self.semantic is not None:
+                ingredients, similarity = self.semantic.similar_ingredients(name)
+                if ingredients.size:
+                    weights[ingredients, 0] = np.maximum(weights[ingredients, 0], urgency * similarity)
+                    weights[ingredients, 1] = 1.0
+                    matches.append((name, np.sort(ingredients)))
+        use_semantic = self.semantic is not None and semantic_weight > 0
+        if not matches and not use_semantic:
+            return []
+        for name in pantry:
+            weights[self.ingredients_for(name), 1] = 1.0
+
+        totals = self.matrix @ weights
+        urgency, on_hand = totals[:, 0], totals[:, 1]
+        eligible = urgency > 0
+        bonus = None
+        if use_semantic:
+            rows, similarity = self.semantic.search_items(expiring, semantic_candidates)
+            eligible[rows] = True
+            bonus = np.zeros(len(self), dtype=np.float32)
+            bonus[rows] = semantic_weight * similarity
+        if dietary:
+            eligible &= (self.dietary & np.uint64(dietary)) == 0
+        candidates = np.flatnonzero(eligible)
+        if candidates.size == 0:
+            return []
+        counts = self.ingredient_counts[candidates]
+        scores = (
+            urgency[candidates]
+            + pantry_weight * on_hand[candidates] / counts
+            - missing_penalty * (counts - on_hand[candidates])
+        )
+        if bonus is not None:
+            scores += bonus[candidates]
+        if candidates.size > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(candidates.size)
+        top = top[np.lexsort((candidates[top], -scores[top]))]
+
+        results = []
+        for position in top:
+            recipe = int(candidates[position])
+            row = self.matrix.indices[self.matrix.indptr[recipe]:self.matrix.indptr[recipe + 1]]
+            used = [name for name, ingredients in matches if np.intersect1d(row, ingredients).size]
+            missing = []
+            for line in self.ingredients[recipe]:
+                ingredient = self.ingredient_ids.get(normalize_ingredient(line))
+                if ingredient is not None and not weights[ingredient, 1]:
+                    missing.append(line)
+            results.append((recipe, float(scores[position]), used, missing))
+        return results
+
+    def recipe(self, recipe: int) -> Dict[str, Any]:
+        return {
+            "recipe_id": self.recipe_ids[recipe],
+            "name": self.titles[recipe],
+            "ingredients": self.ingredients[recipe],
+            "instructions": self.instructions[recipe],
+        }
+
+
+def load_recipe_index(path: str) -> Optional[RecipeIndex]:
+    """Build the recipe index, or return None when the corpus is missing"""
+    try:
+        return RecipeIndex.load(path)
+    except FileNotFoundError:
+        logger.warning(f"Recipe corpus not found at {path}, recipe suggestions disabled")
+        return None
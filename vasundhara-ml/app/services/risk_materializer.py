@@ -0,0 +1,321 @@
+"""
+Scheduled precomputation of household expiry risk into MongoDB
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from bson import ObjectId
+from pymongo import ASCENDING, DeleteOne, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.models.household import HouseholdScoringResponse, ScoredItem
+from app.services.expiry_table import spoilage_probability_batch
+from app.services.household_scoring import (
+    FOOD_ITEM_PROJECTION,
+    FOOD_ITEMS_COLLECTION,
+    INACTIVE_STATUSES,
+    RULES_MODEL_VERSION,
+    HouseholdRiskScorer,
+    InventoryBatch,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_RISK_COLLECTION = "expiry_risk"
+JOB_STATE_COLLECTION = "ml_job_state"
+JOB_ID = "expiry_risk"
+
+# Items updated while a run's cursor is open may be missed by it; the next
+# incremental run re-reads this much before the watermark
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+def _midnight(day: date) -> datetime:
+    """BSON has no date type; days are stored as UTC midnight"""
+    return datetime(day.year, day.month, day.day)
+
+
+class ExpiryRiskMaterializer:
+    """Keeps the ``expiry_risk`` collection in step with ``fooditems``.
+
+    Each run walks food items in chunks of ``EXPIRY_RISK_CHUNK_SIZE``, scores
+    a chunk in one pass and writes it back with unordered bulk ``UpdateOne``
+    upserts keyed by the food item id; consumed, wasted or unscorable items
+    are removed. Incremental runs only read items whose ``updatedAt`` is at
+    or after the last watermark. The nightly full run rescores everything and
+    drops rows of deleted items. A lease in ``ml_job_state`` keeps replicas
+    from running the job concurrently.
+
+    Online lookups read ``{household, predicted_expiry_date}`` ranges and
+    recompute the day's spoilage probability from the stored shelf life, so
+    results stay current between runs.
+    """
+
+    def __init__(
+        self,
+        scorer: HouseholdRiskScorer,
+        database,
+        interval_seconds: Optional[float] = None,
+    ):
+        self.scorer = scorer
+        self.database = database
+        self.interval_seconds = interval_seconds or settings.EXPIRY_RISK_INCREMENTAL_INTERVAL
+        self._task: Optional[asyncio.Task] = None
+        self._indexes_ready = False
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    @property
+    def owner(self) -> str:
+        """Lease owner id; per process, so forked workers never share a lease"""
+        if self.scorer.monitoring:
+            return self.scorer.monitoring.instance_id
+        return f"pid-{os.getpid()}"
+
+    async def start(self) -> None:
+        """Start the periodic run loop (no-op without MongoDB)"""
+        if self._task is None and settings.EXPIRY_RISK_ENABLED and self.database.database is not None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Expiry risk materializer started (every {self.interval_seconds}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.run()
+            except Exception as e:
+                logger.warning(f"Expiry risk materialization failed: {e}")
+
+    async def ensure_indexes(self) -> None:
+        db = self.database.get_database()
+        await db[EXPIRY_RISK_COLLECTION].create_index(
+            [("household", ASCENDING), ("predicted_expiry_date", ASCENDING)]
+        )
+        await db[EXPIRY_RISK_COLLECTION].create_index([("predicted_expiry_date", ASCENDING)])
+        await db[EXPIRY_RISK_COLLECTION].create_index([("materialized_at", ASCENDING)])
+        # Incremental runs scan fooditems by modification time
+        await db[FOOD_ITEMS_COLLECTION].create_index([("updatedAt", ASCENDING)])
+        self._indexes_ready = True
+
+    async def _acquire_lease(self, now: datetime) -> Optional[Dict[str, Any]]:
+        jobs = self.database.get_database()[JOB_STATE_COLLECTION]
+        try:
+            return await jobs.find_one_and_update(
+                {
+                    "_id": JOB_ID,
+                    "$or": [{"lease_until": {"$lt": now}}, {"lease_until": {"$exists": False}}],
+                },
+                {
+                    "$set": {
+                        "lease_until": now + timedelta(seconds=settings.EXPIRY_RISK_LEASE_SECONDS),
+                        "lease_owner": self.owner,
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Another replica holds an unexpired lease
+            return None
+
+    def _full_run_due(self, state: Dict[str, Any], now: datetime) -> bool:
+        last_full = state.get("last_full_run")
+        if state.get("watermark") is None or last_full is None:
+            return True
+        return now.hour >= settings.EXPIRY_RISK_FULL_RUN_HOUR and last_full.date() < now.date()
+
+    async def run(self, full: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+        """Materialize changed items (or all of them); returns run stats, or None if another replica is running"""
+        started = datetime.utcnow()
+        state = await self._acquire_lease(started)
+        if state is None:
+            logger.info("Expiry risk materialization already running elsewhere, skipping")
+            return None
+
+        start_time = time.perf_counter()
+        if full is None:
+            full = self._full_run_due(state, started)
+        watermark = None if full else state.get("watermark")
+        stats = {"full": full, "started": started.isoformat(), "scored": 0, "removed": 0, "chunks": 0}
+        try:
+            if not self._indexes_ready:
+                await self.ensure_indexes()
+            newest = await self._materialize(watermark, started, stats)
+
+            update: Dict[str, Any] = {"lease_until": datetime.utcnow()}
+            if full:
+                # Rows not rewritten by this run belong to deleted food items
+                removed = await self.database.get_database()[EXPIRY_RISK_COLLECTION].delete_many(
+                    {"materialized_at": {"$lt": started}}
+                )
+                stats["removed"] += removed.deleted_count
+                update["watermark"] = started - WATERMARK_OVERLAP
+                update["last_full_run"] = started
+            elif newest is not None:
+                candidate = min(newest, started) - WATERMARK_OVERLAP
+                if watermark is None or candidate > watermark:
+                    update["watermark"] = candidate
+            stats["duration_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+            update["last_run"] = stats
+            await self.database.get_database()[JOB_STATE_COLLECTION].update_one(
+                {"_id": JOB_ID, "lease_owner": self.owner}, {"$set": update}
+            )
+        except Exception:
+            await self.database.get_database()[JOB_STATE_COLLECTION].update_one(
+                {"_id": JOB_ID, "lease_owner": self.owner}, {"$set": {"lease_until": datetime.utcnow()}}
+            )
+            raise
+
+        self.last_run = stats
+        logger.info(
+            f"Materialized expiry risk ({'full' if full else 'incremental'}): "
+            f"{stats['scored']} scored, {stats['removed']} removed in {stats['duration_ms']} ms"
+        )
+        return stats
+
+    async def _materialize(
+        self,
+        watermark: Optional[datetime],
+        started: datetime,
+        stats: Dict[str, Any],
+    ) -> Optional[datetime]:
+        """Score and write every selected food item; returns the newest ``updatedAt`` seen"""
+        db = self.database.get_database()
+        query = {} if watermark is None else {"updatedAt": {"$gte": watermark}}
+        projection = {**FOOD_ITEM_PROJECTION, "status": 1, "updatedAt": 1}
+        chunk_size = settings.EXPIRY_RISK_CHUNK_SIZE
+        cursor = db[FOOD_ITEMS_COLLECTION].find(query, projection).batch_size(chunk_size)
+
+        as_of = started.date()
+        newest: Optional[datetime] = None
+        docs: List[Dict[str, Any]] = []
+        async for doc in cursor:
+            updated_at = doc.get("updatedAt")
+            if isinstance(updated_at, datetime) and (newest is None or updated_at > newest):
+                newest = updated_at
+            docs.append(doc)
+            if len(docs) >= chunk_size:
+                await self._write_chunk(db, docs, as_of, started, stats)
+                docs = []
+        if docs:
+            await self._write_chunk(db, docs, as_of, started, stats)
+        return newest
+
+    async def _write_chunk(
+        self,
+        db,
+        docs: List[Dict[str, Any]],
+        as_of: date,
+        started: datetime,
+        stats: Dict[str, Any],
+    ) -> None:
+        batch = InventoryBatch(self.scorer.table)
+        scored: List[Dict[str, Any]] = []
+        operations = []
+        for doc in docs:
+            if doc.get("status") not in INACTIVE_STATUSES and batch.add_document(doc):
+                scored.append(doc)
+            else:
+                operations.append(DeleteOne({"_id": doc["_id"]}))
+
+        if scored:
+            scores = self.scorer.score_batch(batch, as_of, 0)
+            scored_for = _midnight(as_of)
+            for row, doc in enumerate(scored):
+                operations.append(UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {
+                        "household": doc.get("household"),
+                        "name": batch.names[row],
+                        "category": batch.categories[row],
+                        "purchase_date": _midnight(date.fromordinal(batch.purchase_ordinals[row])),
+                        "shelf_life_days": int(scores["shelf_life"][row]),
+                        "predicted_expiry_date": _midnight(date.fromordinal(int(scores["expiry_ordinal"][row]))),
+                        "prob_spoiled": float(scores["today"][row]),
+                        "scored_for": scored_for,
+                        "item_updated_at": doc.get("updatedAt"),
+                        "model_version": RULES_MODEL_VERSION,
+                        "materialized_at": started,
+                    }},
+                    upsert=True,
+                ))
+
+        await db[EXPIRY_RISK_COLLECTION].bulk_write(operations, ordered=False)
+        stats["scored"] += len(scored)
+        stats["removed"] += len(docs) - len(scored)
+        stats["chunks"] += 1
+
+    async def lookup(
+        self,
+        household_id: str,
+        as_of: Optional[date] = None,
+        horizon_days: int = 3,
+        limit: int = 500,
+    ) -> HouseholdScoringResponse:
+        """Items of a household expiring by ``as_of + horizon_days``, soonest first.
+
+        Expiring within the horizon is the same as reaching a spoilage
+        probability of 0.5 by its end, the default threshold of
+        ``/households/score-expiry``.
+        """
+        as_of = as_of or date.today()
+        household = ObjectId(household_id) if ObjectId.is_valid(household_id) else household_id
+        cursor = self.database.get_database()[EXPIRY_RISK_COLLECTION].find(
+            {
+                "household": household,
+                "predicted_expiry_date": {"$lte": _midnight(as_of + timedelta(days=horizon_days))},
+            },
+            {"name": 1, "category": 1, "purchase_date": 1, "shelf_life_days": 1, "predicted_expiry_date": 1},
+        ).sort("predicted_expiry_date", ASCENDING).limit(limit)
+        rows = await cursor.to_list(length=limit)
+
+        at_risk: List[ScoredItem] = []
+        if rows:
+            shelf_life = np.array([row["shelf_life_days"] for row in rows], dtype=np.int64)
+            age = as_of.toordinal() - np.array([row["purchase_date"].toordinal() for row in rows], dtype=np.int64)
+            today = spoilage_probability_batch(age, shelf_life)
+            horizon = spoilage_probability_batch(age + horizon_days, shelf_life)
+            days_left = shelf_life - age
+            for i in np.lexsort((-today, days_left)):
+                row = rows[i]
+                at_risk.append(ScoredItem(
+                    item_id=str(row["_id"]),
+                    product_name=row.get("name", ""),
+                    category=row.get("category", "other"),
+                    predicted_expiry_date=row["predicted_expiry_date"].date(),
+                    days_until_expiry=int(days_left[i]),
+                    prob_spoiled_today=float(today[i]),
+                    prob_spoiled_horizon=float(horizon[i]),
+                ))
+
+        return HouseholdScoringResponse(
+            household_id=household_id,
+            as_of=as_of,
+            horizon_days=horizon_days,
+            total_items=len(at_risk),
+            at_risk=at_risk,
+            model_version=RULES_MODEL_VERSION,
+            timestamp=datetime.utcnow(),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "interval_seconds": self.interval_seconds,
+            "last_run": self.last_run,
+        }
@@ -0,0 +1,263 @@
+"""
+Admission control and load shedding for inference routes
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Relative time budget the caller is still willing to wait, in milliseconds
+DEADLINE_HEADER = b"x-request-timeout-ms"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of queued or run."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class RouteLimiter:
+    """Concurrency limit plus a bounded FIFO wait queue for one route.
+
+    A request runs immediately while fewer than ``max_concurrency`` are in
+    flight, otherwise it queues. It is rejected up front with 429 when the
+    queue is full, or with 503 when the expected queue wait (queue position
+    times the smoothed service time) would pass ``max_queue_wait_ms`` or the
+    caller's own deadline; a queued request that runs out of time is dropped
+    with 503 before any work is done, and one still running when it does is
+    answered with 504.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_queue_wait_ms: float):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.max_queue_wait = max_queue_wait_ms / 1000
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time: Optional[float] = None  # EWMA, seconds
+
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_overload = 0
+        self.dropped_deadline = 0
+        self.timed_out = 0
+        self.queue_wait_total = 0.0
+        self.max_queue_seen = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _expected_wait(self, position: int) -> float:
+        if self._service_time is None:
+            return 0.0
+        return position / self.max_concurrency * self._service_time
+
+    def pressure(self) -> float:
+        """Load in [0, 1+]: the larger of queue fill and expected wait over the wait limit"""
+        depth = len(self._waiters)
+        fill = depth / self.max_queue if self.max_queue else float(self.in_flight >= self.max_concurrency)
+        wait = self._expected_wait(depth) / self.max_queue_wait if self.max_queue_wait > 0 else 0.0
+        return max(fill, wait)
+
+    def _retry_after(self) -> float:
+        return max(1.0, self._expected_wait(len(self._waiters) + 1))
+
+    async def acquire(self, deadline: Optional[float]) -> float:
+        """Wait for a slot and return the time spent queued, or raise AdmissionRejected"""
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(429, f"Too many queued requests for {self.name}", self._retry_after())
+
+        now = time.monotonic()
+        budget = self.max_queue_wait
+        if deadline is not None:
+            budget = min(budget, deadline - now)
+        expected = self._expected_wait(len(self._waiters) + 1)
+        if budget <= 0 or expected > budget:
+            self.rejected_overload += 1
+            raise AdmissionRejected(503, f"{self.name} is overloaded", self._retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self.max_queue_seen = max(self.max_queue_seen, len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), budget)
+        except asyncio.TimeoutError:
+            self._abandon(future)
+            self.dropped_deadline += 1
+            raise AdmissionRejected(503, f"Deadline exceeded while queued for {self.name}", self._retry_after())
+        except asyncio.CancelledError:
+            self._abandon(future)
+            raise
+
+        waited = time.monotonic() - now
+        self.admitted += 1
+        self.queue_wait_total += waited
+        return waited
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        if future.done() and not future.cancelled():
+            # The slot was handed over just as the wait ended; pass it on
+            self.release(None)
+        else:
+            future.cancel()
+            try:
+                self._waiters.remove(future)
+            except ValueError:
+                pass
+
+    def release(self, service_time: Optional[float]) -> None:
+        """Free a slot, handing it straight to the oldest waiter if there is one"""
+        if service_time is not None:
+            if self._service_time is None:
+                self._service_time = service_time
+            else:
+                self._service_time += 0.2 * (service_time - self._service_time)
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "pressure": round(self.pressure(), 3),
+            "max_queue_depth_seen": self.max_queue_seen,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_overload": self.rejected_overload,
+            "dropped_deadline": self.dropped_deadline,
+            "timed_out": self.timed_out,
+            "avg_queue_wait_ms": round(self.queue_wait_total / (self.admitted or 1) * 1000, 3),
+            "service_time_ms": round((self._service_time or 0.0) * 1000, 3),
+        }
+
+
+class AdmissionController:
+    """Per-route limiters configured from ``ADMISSION_ROUTE_LIMITS``."""
+
+    def __init__(
+        self,
+        route_limits: Optional[Dict[str, int]] = None,
+        max_queue: Optional[int] = None,
+        max_queue_wait_ms: Optional[float] = None,
+    ):
+        limits = settings.ADMISSION_ROUTE_LIMITS if route_limits is None else route_limits
+        queue = settings.ADMISSION_MAX_QUEUE if max_queue is None else max_queue
+        wait = settings.ADMISSION_MAX_QUEUE_WAIT_MS if max_queue_wait_ms is None else max_queue_wait_ms
+        self.limiters: Dict[str, RouteLimiter] = {
+            path: RouteLimiter(path, limit, queue, wait) for path, limit in limits.items()
+        }
+
+    def get(self, path: str) -> Optional[RouteLimiter]:
+        return self.limiters.get(path)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {path: limiter.stats() for path, limiter in self.limiters.items()}
+
+
+def _parse_deadline(headers, received: float) -> Optional[float]:
+    for name, value in headers:
+        if name == DEADLINE_HEADER:
+            try:
+                return received + max(0.0, float(value)) / 1000
+            except ValueError:
+                return None
+    return None
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware that admits, queues or sheds requests per route.
+
+    Clients may send ``X-Request-Timeout-Ms`` with the time they are still
+    willing to wait; requests whose budget runs out while queued are dropped
+    before any work is done, and a handler still running when it runs out is
+    cancelled and answered with 504 (if it has not started its response).
+    Work already handed to a thread cannot be interrupted and finishes in
+    the background.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.controller.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        received = time.monotonic()
+        deadline = _parse_deadline(scope.get("headers", ()), received)
+        try:
+            await limiter.acquire(deadline)
+        except AdmissionRejected as rejection:
+            await self._reject(send, rejection)
+            return
+
+        started = time.monotonic()
+        if deadline is None:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                limiter.release(time.monotonic() - started)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await asyncio.wait_for(self.app(scope, receive, send_wrapper), deadline - started)
+        except asyncio.TimeoutError:
+            limiter.timed_out += 1
+            logger.warning(f"Deadline exceeded while running {limiter.name}")
+            if not response_started:
+                await self._reject(send, AdmissionRejected(
+                    504, f"Deadline exceeded while running {limiter.name}", limiter._retry_after()
+                ))
+        finally:
+            limiter.release(time.monotonic() - started)
+
+    @staticmethod
+    async def _reject(send, rejection: AdmissionRejected) -> None:
+        body = json.dumps({"detail": rejection.detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": rejection.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(rejection.retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
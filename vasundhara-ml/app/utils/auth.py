@@ -2,15 +2,49 @@
 Authentication utilities for ML service
 """
 
+import asyncio
+import hashlib
 import jwt
+import math
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional, Tuple
 import logging
 
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
 from app.core.config import settings
+from app.core.redis_client import RedisClient
 
 logger = logging.getLogger(__name__)
 
+# Redis keys of the shared revocation list: "<token SHA-256>:<exp>" members scored by
+# expiry, the same members scored by the version that added them, and the version counter
+REVOKED_TOKENS_KEY = "auth:revoked"
+REVOCATION_LOG_KEY = "auth:revocation_log"
+REVOCATION_VERSION_KEY = "auth:revocation_version"
+
+# Atomically drops expired revocations, then adds one under the next version.
+# Every key lives until its last revocation expires.
+# KEYS: version counter, log, revoked; ARGV: member, exp, now, key ttl
+REVOKE_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[3])
+for _, member in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], member)
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', ARGV[3])
+local version = redis.call('INCR', KEYS[1])
+redis.call('ZADD', KEYS[2], version, ARGV[1])
+redis.call('ZADD', KEYS[3], ARGV[2], ARGV[1])
+for _, key in ipairs(KEYS) do
+    redis.call('EXPIRE', key, ARGV[4], 'NX')
+    redis.call('EXPIRE', key, ARGV[4], 'GT')
+end
+return version
+"""
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
@@ -102,3 +136,171 @@ def get_token_remaining_time(token: str) -> Optional[timedelta]:
         return None
     except Exception:
         return None
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class TokenCache:
+    """Bounded LRU of verified token payloads keyed by the token's SHA-256.
+
+    A hit skips signature verification and claim parsing. Entries expire at
+    the token's ``exp`` (or after ``AUTH_CACHE_MAX_AGE`` seconds, whichever
+    is first) and are only valid for the revocation-list version they were
+    verified under: when the version in Redis changes, the next request for
+    every token is fully verified again and checked against the new list.
+
+    Each revocation is kept only until the revoked token's own ``exp``, in
+    Redis and locally, and replicas fetch only the revocations added since
+    the version they last applied.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, max_age: Optional[float] = None):
+        self.max_size = settings.AUTH_CACHE_SIZE if max_size is None else max_size
+        self.max_age = max_age or settings.AUTH_CACHE_MAX_AGE
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float, int]]" = OrderedDict()
+        self.revocation_version = 0
+        # token digest -> the token's exp; dropped once the token could not verify anyway
+        self.revoked: Dict[str, float] = {}
+        self.redis: Optional[RedisClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.verify_seconds = 0.0
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Payload of a valid, unrevoked token; raises ValueError otherwise"""
+        digest = token_digest(token)
+        entry = self._entries.get(digest)
+        if entry is not None:
+            payload, expires_at, version = entry
+            if expires_at > time.time() and version == self.revocation_version:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return dict(payload)
+            del self._entries[digest]
+
+        start = time.perf_counter()
+        payload = verify_token(token)
+        self.verify_seconds += time.perf_counter() - start
+        self.misses += 1
+        if digest in self.revoked:
+            logger.warning("Revoked token presented")
+            raise ValueError("Token has been revoked")
+
+        if self.max_size > 0:
+            expires_at = time.time() + self.max_age
+            if isinstance(payload.get("exp"), (int, float)):
+                expires_at = min(expires_at, payload["exp"])
+            self._entries[digest] = (payload, expires_at, self.revocation_version)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return dict(payload)
+
+    def apply_revocations(self, version: int, revoked: Iterable[Tuple[str, float]], replace: bool = False) -> None:
+        """Merge (or with ``replace``, swap in) revocations and move to ``version``"""
+        now = time.time()
+        merged = {} if replace else self.revoked
+        merged.update(revoked)
+        self.revoked = {digest: exp for digest, exp in merged.items() if exp > now}
+        self.revocation_version = version
+
+    async def revoke(self, token: str, expires_at: Optional[float] = None) -> bool:
+        """Add a token to the shared revocation list until ``expires_at`` (its exp)"""
+        if expires_at is None:
+            expires_at = time.time() + settings.AUTH_REVOCATION_TTL
+        expires_at = math.ceil(expires_at)
+        digest = token_digest(token)
+        self.revoked[digest] = expires_at
+        self._entries.pop(digest, None)
+        if self.redis is None or not self.redis.client:
+            return False
+        now = time.time()
+        version = await self.redis.run_script(
+            REVOKE_SCRIPT,
+            [REVOCATION_VERSION_KEY, REVOCATION_LOG_KEY, REVOKED_TOKENS_KEY],
+            [f"{digest}:{expires_at}", expires_at, int(now), max(1, int(expires_at - now) + 60)],
+        )
+        if version is None:
+            return False
+        # Other replicas may have revoked tokens since this one last synced
+        await self.sync()
+        return True
+
+    async def start(self, redis: RedisClient) -> None:
+        """Poll the revocation version every ``AUTH_REVOCATION_POLL_SECONDS``"""
+        self.redis = redis
+        if self._task is None and redis.client:
+            await self.sync()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.AUTH_REVOCATION_POLL_SECONDS)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning(f"Token revocation sync failed: {e}")
+
+    async def sync(self) -> None:
+        """Fetch revocations added since the last applied version; one GET when there are none"""
+        version = int(await self.redis.get(REVOCATION_VERSION_KEY) or 0)
+        if version == self.revocation_version:
+            return
+        # A counter behind ours means the keys expired or were flushed: reload everything
+        replace = version < self.revocation_version
+        since = 0 if replace else self.revocation_version
+        entries = await self.redis.get_sorted_set_range(REVOCATION_LOG_KEY, f"({since}")
+        revoked = []
+        for member, added_in in entries:
+            digest, _, exp = member.rpartition(":")
+            revoked.append((digest, float(exp)))
+            version = max(version, int(added_in))
+        self.apply_revocations(version, revoked, replace=replace)
+        logger.info(
+            f"Token revocation list updated to version {version} "
+            f"({len(entries)} new, {len(self.revoked)} active)"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        verify_ms = self.verify_seconds * 1000 / self.misses if self.misses else 0.0
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "avg_verify_ms": round(verify_ms, 4),
+            # Estimated: each hit saves one average full verification
+            "time_saved_ms": round(self.hits * verify_ms, 2),
+            "revocation_version": self.revocation_version,
+            "revoked_tokens": len(self.revoked),
+        }
+
+
+token_cache = TokenCache()
+security = HTTPBearer()
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
+    """Get current user from JWT token, through the verified-token cache"""
+    try:
+        return token_cache.verify(credentials.credentials)
+    except Exception as e:
+        logger.error(f"Authentication error: {e}")
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
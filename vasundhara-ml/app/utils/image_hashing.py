@@ -0,0 +1,121 @@
+"""
+Content and perceptual hashing of images for result caching
+"""
+
+import hashlib
+import io
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from PIL import Image
+
+HASH_BITS = 64
+
+# Index entry key: (perceptual hash, variant of the request options)
+_EntryKey = Tuple[int, str]
+
+
+def content_digest(stream: BinaryIO) -> str:
+    """SHA-256 of the raw image bytes; the stream is left at position 0"""
+    if isinstance(stream, io.BytesIO):
+        with stream.getbuffer() as view:
+            return hashlib.sha256(view).hexdigest()
+
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def dhash(pixels: np.ndarray) -> int:
+    """64-bit difference hash of an RGB (or grayscale) uint8 pixel array"""
+    gray = Image.fromarray(pixels).convert("L").resize((9, 8), Image.BOX)
+    values = np.asarray(gray, dtype=np.int16)
+    bits = values[:, 1:] > values[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class PerceptualHashIndex:
+    """Bounded LRU of results keyed by perceptual hash, searchable by Hamming distance.
+
+    Uses multi-index hashing: the 64-bit hash is split into ``max_distance + 1``
+    disjoint chunks, each with its own exact-match table. Two hashes within
+    ``max_distance`` bits must agree on at least one whole chunk (pigeonhole),
+    so a lookup only compares against the few entries sharing a chunk.
+    """
+
+    def __init__(self, max_distance: int, capacity: int):
+        self.max_distance = max(0, min(max_distance, HASH_BITS - 1))
+        self.capacity = capacity
+        self._entries: "OrderedDict[_EntryKey, Any]" = OrderedDict()
+        self._chunks = self._chunk_layout(self.max_distance + 1)
+        self._tables: List[Dict[int, Set[_EntryKey]]] = [{} for _ in self._chunks]
+
+    @staticmethod
+    def _chunk_layout(count: int) -> List[Tuple[int, int]]:
+        """(shift, mask) per chunk, splitting HASH_BITS as evenly as possible"""
+        layout = []
+        shift = 0
+        for i in range(count):
+            width = HASH_BITS // count + (1 if i < HASH_BITS % count else 0)
+            layout.append((shift, (1 << width) - 1))
+            shift += width
+        return layout
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, phash: int, variant: str = "") -> Optional[Any]:
+        """Return the value of the closest entry within max_distance, if any"""
+        best_key: Optional[_EntryKey] = None
+        best_distance = self.max_distance + 1
+        for (shift, mask), table in zip(self._chunks, self._tables):
+            for key in table.get((phash >> shift) & mask, ()):
+                if key[1] != variant:
+                    continue
+                distance = bin(key[0] ^ phash).count("1")
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+            if best_distance == 0:
+                break
+
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key]
+
+    def add(self, phash: int, value: Any, variant: str = "") -> None:
+        """Insert or refresh an entry, evicting the least recently used one"""
+        if self.capacity <= 0:
+            return
+
+        key = (phash, variant)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self._entries[key] = value
+            return
+
+        self._entries[key] = value
+        for (shift, mask), table in zip(self._chunks, self._tables):
+            table.setdefault((phash >> shift) & mask, set()).add(key)
+
+        if len(self._entries) > self.capacity:
+            evicted, _ = self._entries.popitem(last=False)
+            self._unindex(evicted)
+
+    def _unindex(self, key: _EntryKey) -> None:
+        for (shift, mask), table in zip(self._chunks, self._tables):
+            chunk = (key[0] >> shift) & mask
+            bucket = table.get(chunk)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[chunk]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        for table in self._tables:
+            table.clear()
@@ -0,0 +1,176 @@
+"""
+Ingredient name normalization and fuzzy matching against a known vocabulary
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+# Words in an ingredient line that say how much or how it is cut, not what it is
+QUANTITY_WORDS = {
+    "tbsp", "tablespoon", "tsp", "teaspoon", "cup", "g", "gm", "gram", "kg", "mg",
+    "ml", "l", "litre", "liter", "oz", "ounce", "lb", "pound", "pinch", "dash",
+    "clove", "piece", "slice", "can", "tin", "bunch", "handful", "packet", "pack",
+    "inch", "sprig", "stick", "head", "cube", "drop", "bowl", "jar", "bottle",
+}
+DESCRIPTOR_WORDS = {
+    "large", "medium", "small", "big", "fresh", "freshly", "chopped", "sliced",
+    "diced", "minced", "grated", "crushed", "peeled", "ripe", "whole", "finely",
+    "roughly", "thinly", "to", "taste", "of", "a", "an", "and", "or", "optional",
+    "for", "some", "few", "about", "cooked", "boiled", "raw", "halved", "needed",
+    "as", "per", "required", "into", "cut", "washed",
+}
+IRREGULAR_PLURALS = {"leaves": "leaf", "loaves": "loaf", "halves": "half", "knives": "knife"}
+
+# Spelling and regional variants, mapped to the name recipes use most
+SYNONYMS = {
+    "chilly": "chilli", "chili": "chilli", "chile": "chilli", "mirch": "chilli",
+    "aubergine": "eggplant", "brinjal": "eggplant", "baingan": "eggplant",
+    "cilantro": "coriander", "dhania": "coriander",
+    "yoghurt": "yogurt", "curd": "yogurt", "dahi": "yogurt",
+    "courgette": "zucchini", "bhindi": "okra", "ladyfinger": "okra",
+    "scallion": "spring onion", "capsicum": "bell pepper",
+    "garbanzo": "chickpea", "aloo": "potato", "pyaz": "onion", "pyaaz": "onion",
+    "tamatar": "tomato", "palak": "spinach", "adrak": "ginger", "lehsun": "garlic",
+}
+PHRASE_SYNONYMS = {
+    ("green", "onion"): ("spring", "onion"),
+    ("lady", "finger"): ("okra",),
+    ("chickpea", "bean"): ("chickpea",),
+    ("cottage", "cheese"): ("paneer",),
+}
+
+_PARENTHETICAL = re.compile(r"\([^)]*\)")
+_NON_LETTERS = re.compile(r"[^a-z]+")
+
+
+def _singular(word: str) -> str:
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("oes", "ches", "shes", "sses", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def ingredient_tokens(text: str) -> Tuple[str, ...]:
+    """Name tokens of an ingredient line ("2 Large eggplants, peeled" -> ("eggplant",))"""
+    text = _PARENTHETICAL.sub(" ", text.lower()).split(",", 1)[0]
+    words: List[str] = []
+    for word in _NON_LETTERS.split(text):
+        if not word:
+            continue
+        word = _singular(word)
+        if word in QUANTITY_WORDS or word in DESCRIPTOR_WORDS or len(word) < 2:
+            continue
+        words.extend(SYNONYMS.get(word, word).split())
+
+    tokens: List[str] = []
+    i = 0
+    while i < len(words):
+        phrase = PHRASE_SYNONYMS.get(tuple(words[i:i + 2]))
+        replacement = phrase if phrase is not None else (words[i],)
+        for token in replacement:
+            if token not in tokens:
+                tokens.append(token)
+        i += 2 if phrase is not None else 1
+    return tuple(tokens)
+
+
+def normalize_ingredient(text: str) -> str:
+    """Canonical name of an ingredient line ("3 green chillies" -> "green chilli")"""
+    return " ".join(ingredient_tokens(text))
+
+
+def _max_edits(token: str) -> int:
+    """Typos tolerated in a token; short words are too easy to confuse"""
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def _deletes(token: str, distance: int) -> Set[str]:
+    """``token`` and every string reachable from it by up to ``distance`` deletions"""
+    variants = {token}
+    frontier = {token}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions)"""
+    if a == b:
+        return 0
+    previous2: Optional[List[int]] = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class IngredientMatcher:
+    """Maps free-text item names onto the tokens of a known ingredient vocabulary.
+
+    Names are normalized with ``ingredient_tokens`` and each token is then
+    resolved against the vocabulary through a SymSpell-style deletion
+    dictionary: vocabulary tokens are indexed under every string reachable
+    by deleting up to ``_max_edits`` characters, so a misspelt token is
+    looked up by its own deletions instead of being compared with every
+    word. Candidates are verified by edit distance; the closest wins, then
+    the most frequent. Tokens with no close vocabulary word (brand names,
+    pack descriptions from barcode scans) are dropped.
+
+    ``match`` is memoized, so repeated inventory names cost one dict lookup.
+    """
+
+    def __init__(self, vocabulary: Mapping[str, int], cache_size: int = 16384):
+        self.vocabulary: Dict[str, int] = dict(vocabulary)
+        self._deletes: Dict[str, List[str]] = {}
+        for token in self.vocabulary:
+            for variant in _deletes(token, _max_edits(token)):
+                self._deletes.setdefault(variant, []).append(token)
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+        self.correct = lru_cache(maxsize=cache_size)(self._correct)
+
+    def __len__(self) -> int:
+        return len(self.vocabulary)
+
+    def _correct(self, token: str) -> Optional[str]:
+        """Closest vocabulary token to ``token``, or None"""
+        if token in self.vocabulary:
+            return token
+        allowed = _max_edits(token)
+        best: Optional[Tuple[int, int, str]] = None
+        for variant in _deletes(token, allowed):
+            for candidate in self._deletes.get(variant, ()):
+                distance = edit_distance(token, candidate)
+                if distance > allowed or distance > _max_edits(candidate):
+                    continue
+                key = (distance, -self.vocabulary[candidate], candidate)
+                if best is None or key < best:
+                    best = key
+        return best[2] if best is not None else None
+
+    def _match(self, text: str) -> Tuple[str, ...]:
+        tokens: List[str] = []
+        for token in ingredient_tokens(text):
+            corrected = self.correct(token)
+            if corrected is not None and corrected not in tokens:
+                tokens.append(corrected)
+        return tuple(tokens)
+
+    def cache_clear(self) -> None:
+        self.match.cache_clear()
+        self.correct.cache_clear()
@@ -0,0 +1,156 @@
+"""
+Lightweight stage-level tracing for ML inference paths
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Model name of the sampled trace the current request belongs to, if any
+_current_trace: ContextVar[Optional[str]] = ContextVar("vasundhara_trace", default=None)
+
+
+class _NoopSpan:
+    """Span used when the current request is not sampled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    """Timed stage of a sampled trace."""
+
+    __slots__ = ("tracer", "model_name", "name", "start", "otel_cm")
+
+    def __init__(self, tracer: "Tracer", model_name: str, name: str):
+        self.tracer = tracer
+        self.model_name = model_name
+        self.name = name
+        self.otel_cm = None
+
+    def __enter__(self):
+        if self.tracer.otel_tracer is not None:
+            self.otel_cm = self.tracer.otel_tracer.start_as_current_span(f"{self.model_name}.{self.name}")
+            self.otel_cm.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        if self.otel_cm is not None:
+            self.otel_cm.__exit__(exc_type, exc, tb)
+        elif self.tracer.monitoring is not None:
+            self.tracer.monitoring.record_stage(self.model_name, self.name, duration_ms)
+        return False
+
+
+class _Trace:
+    """Root of a trace; decides whether the request is sampled."""
+
+    __slots__ = ("tracer", "model_name", "token", "root_span")
+
+    def __init__(self, tracer: "Tracer", model_name: str):
+        self.tracer = tracer
+        self.model_name = model_name
+        self.token = None
+        self.root_span = None
+
+    def __enter__(self):
+        if random.random() < self.tracer.sample_rate:
+            self.token = _current_trace.set(self.model_name)
+            if self.tracer.otel_tracer is not None:
+                self.root_span = self.tracer.otel_tracer.start_as_current_span(self.model_name)
+                self.root_span.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.root_span is not None:
+            self.root_span.__exit__(exc_type, exc, tb)
+        if self.token is not None:
+            _current_trace.reset(self.token)
+        return False
+
+
+class Tracer:
+    """Sampled stage timings exported to OpenTelemetry or MonitoringService.
+
+    ``trace(model)`` wraps one inference and makes the sampling decision;
+    ``span(stage)`` times a stage inside it and is a no-op for unsampled
+    requests, so it can stay enabled in production.
+    """
+
+    def __init__(self, monitoring=None, sample_rate: Optional[float] = None):
+        self.monitoring = monitoring
+        self.sample_rate = settings.TRACING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.otel_tracer = _load_otel_tracer() if settings.OTEL_EXPORTER_OTLP_ENDPOINT else None
+
+    def trace(self, model_name: str) -> _Trace:
+        """Start a (possibly sampled) trace for one inference"""
+        return _Trace(self, model_name)
+
+    def span(self, name: str):
+        """Time a stage of the current trace"""
+        model_name = _current_trace.get()
+        if model_name is None:
+            return _NOOP_SPAN
+        return _Span(self, model_name, name)
+
+    def traced(self, name: str) -> Callable:
+        """Decorator form of ``span`` for sync and async functions"""
+
+        def decorator(func: Callable) -> Callable:
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+def _load_otel_tracer():
+    """Configure an OTLP exporting tracer if OpenTelemetry is installed"""
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT is set but OpenTelemetry is not installed")
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.APP_NAME}))
+    provider.add_span_processor(
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT))
+    )
+    trace.set_tracer_provider(provider)
+    logger.info(f"Exporting inference traces to {settings.OTEL_EXPORTER_OTLP_ENDPOINT}")
+    return trace.get_tracer("vasundhara.ml")
@@ -0,0 +1,125 @@
+"""
+Streaming readers for binary image uploads
+"""
+
+import io
+from typing import Dict, List, Optional
+
+import multipart
+from fastapi import HTTPException, Request
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import parse_options_header
+
+# Allowance for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+
+class _UploadTooLarge(Exception):
+    """Raised from parser callbacks once the upload passes the size limit."""
+
+
+class _SingleFileCollector:
+    """Multipart callbacks that keep only the bytes of one file field."""
+
+    def __init__(self, field_name: str, buffer: io.BytesIO, max_bytes: int):
+        self.field_name = field_name.encode()
+        self.buffer = buffer
+        self.max_bytes = max_bytes
+        self.found = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field: List[bytes] = []
+        self._header_value: List[bytes] = []
+        self._capturing = False
+
+    def callbacks(self) -> Dict[str, object]:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field.append(data[start:end])
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value.append(data[start:end])
+
+    def on_header_end(self) -> None:
+        self._headers[b"".join(self._header_field).lower()] = b"".join(self._header_value)
+        self._header_field = []
+        self._header_value = []
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._capturing = not self.found and options.get(b"name") == self.field_name
+        self.found = self.found or self._capturing
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if not self._capturing:
+            return
+        if self.buffer.tell() + (end - start) > self.max_bytes:
+            raise _UploadTooLarge()
+        self.buffer.write(memoryview(data)[start:end])
+
+    def on_part_end(self) -> None:
+        self._capturing = False
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Image exceeds the {max_bytes} byte upload limit")
+
+
+async def read_image_upload(request: Request, max_bytes: int, field_name: str = "file") -> io.BytesIO:
+    """
+    Stream an image upload into one in-memory buffer, enforcing the size limit
+    before and while reading.
+
+    Accepts ``multipart/form-data`` (the image in ``field_name``) or a raw
+    ``application/octet-stream`` / ``image/*`` body. Each network chunk is
+    copied exactly once, into the returned buffer, which PIL can read directly.
+    """
+    content_type = request.headers.get("content-type", "")
+    is_multipart = content_type.startswith("multipart/form-data")
+    allowance = MULTIPART_OVERHEAD_BYTES if is_multipart else 0
+
+    content_length: Optional[str] = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + allowance:
+        raise _too_large(max_bytes)
+
+    buffer = io.BytesIO()
+    try:
+        if is_multipart:
+            _, params = parse_options_header(content_type)
+            boundary = params.get(b"boundary")
+            if not boundary:
+                raise HTTPException(status_code=400, detail="Missing multipart boundary")
+
+            collector = _SingleFileCollector(field_name, buffer, max_bytes)
+            parser = multipart.MultipartParser(boundary, collector.callbacks())
+            async for chunk in request.stream():
+                parser.write(chunk)
+            parser.finalize()
+            if not collector.found:
+                raise HTTPException(status_code=400, detail=f"Multipart field '{field_name}' is missing")
+        else:
+            async for chunk in request.stream():
+                if buffer.tell() + len(chunk) > max_bytes:
+                    raise _UploadTooLarge()
+                buffer.write(chunk)
+    except _UploadTooLarge:
+        raise _too_large(max_bytes)
+    except MultipartParseError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed multipart body: {e}")
+
+    if not buffer.tell():
+        raise HTTPException(status_code=400, detail="Image upload is empty")
+
+    buffer.seek(0)
+    return buffer
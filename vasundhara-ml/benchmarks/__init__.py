@@ -0,0 +1 @@
+# Vasundhara ML Service benchmarks
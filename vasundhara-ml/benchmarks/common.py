@@ -0,0 +1,82 @@
+"""
+Shared helpers for the benchmark suite: timing, statistics and JSON results
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def git_revision() -> str:
+    """Short hash of the checked-out commit, or 'unknown' outside git"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def summarize_latencies(samples_ns: List[int]) -> Dict[str, float]:
+    """Mean and percentiles of per-call latencies, in microseconds"""
+    values = np.asarray(samples_ns, dtype=np.float64) / 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "samples": int(values.size),
+        "mean_us": round(float(values.mean()), 3),
+        "p50_us": round(float(p50), 3),
+        "p95_us": round(float(p95), 3),
+        "p99_us": round(float(p99), 3),
+        "min_us": round(float(values.min()), 3),
+    }
+
+
+def time_calls(func: Callable[[], Any], min_time: float = 0.5, max_calls: int = 100_000) -> List[int]:
+    """Call ``func`` repeatedly for at least ``min_time`` seconds, timing each call"""
+    func()  # warm-up
+    samples: List[int] = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_calls and (time.perf_counter() < deadline or len(samples) < 5):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def write_results(suite: str, results: List[Dict[str, Any]], output: Optional[str] = None) -> Path:
+    """Store results as JSON, by default under benchmarks/results/<suite>-<commit>.json"""
+    revision = git_revision()
+    path = Path(output) if output else RESULTS_DIR / f"{suite}-{revision}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "suite": suite,
+        "git_revision": revision,
+        "generated_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+    return path
+
+
+def print_table(results: List[Dict[str, Any]], columns: List[str]) -> None:
+    """Print results as an aligned plain-text table"""
+    rows = [[str(result.get(column, "")) for column in columns] for result in results]
+    widths = [max(len(column), *(len(row[i]) for row in rows)) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
@@ -0,0 +1,64 @@
+"""
+Compare two benchmark result files and flag regressions
+
+Usage (from vasundhara-ml/):
+    python -m benchmarks.compare benchmarks/results/micro-abc123.json benchmarks/results/micro-def456.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Tuple
+
+# Lower is better for latencies, higher is better for throughput
+METRICS = {
+    "micro": [("p50_us", False), ("p95_us", False)],
+    "load": [("throughput_rps", True), ("p50_ms", False), ("p99_ms", False)],
+    "startup": [("median_ms", False)],
+    "workers": [("worker_uss_mb", False), ("total_pss_mb", False)],
+}
+
+
+def result_key(result: Dict[str, Any]) -> Tuple[str, str]:
+    name = result.get("name") or result.get("route")
+    params = result.get("params") or {"concurrency": result.get("concurrency")}
+    return name, json.dumps(params, sort_keys=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline["suite"] != candidate["suite"]:
+        sys.exit(f"Cannot compare suite {baseline['suite']!r} with {candidate['suite']!r}")
+
+    print(f"{baseline['suite']}: {baseline['git_revision']} -> {candidate['git_revision']}")
+    before = {result_key(result): result for result in baseline["results"]}
+    regressions = 0
+    for result in candidate["results"]:
+        key = result_key(result)
+        if key not in before:
+            print(f"  {key[0]} {key[1]}: new")
+            continue
+        for metric, higher_is_better in METRICS[candidate["suite"]]:
+            old, new = before[key][metric], result[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            regressed = (-change if higher_is_better else change) > args.threshold
+            regressions += regressed
+            marker = "  REGRESSION" if regressed else ""
+            print(f"  {key[0]} {key[1]} {metric}: {old} -> {new} ({change:+.1f}%){marker}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+In-memory stand-ins for external services used by the load generator
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+class FakeRedis:
+    """Minimal asyncio Redis replacement covering the commands the service uses."""
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._expiry: Dict[str, float] = {}
+
+    def _alive(self, key: str) -> bool:
+        deadline = self._expiry.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return key in self._data
+
+    async def ping(self) -> bool:
+        return True
+
+    async def close(self) -> None:
+        self._data.clear()
+        self._expiry.clear()
+
+    async def info(self) -> Dict[str, Any]:
+        return {"redis_version": "fake", "used_memory_human": "0B", "connected_clients": 1}
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._data.get(key) if self._alive(key) else None
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return [await self.get(key) for key in keys]
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        self._data[key] = value
+        if ex:
+            self._expiry[key] = time.monotonic() + ex
+        else:
+            self._expiry.pop(key, None)
+        return True
+
+    async def setex(self, key: str, ttl: int, value: Any) -> bool:
+        return await self.set(key, value, ex=ttl)
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self._data.pop(key, None)
+            self._expiry.pop(key, None)
+        return removed
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._alive(key))
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._expiry[key] = time.monotonic() + ttl
+        return True
+
+    async def incr(self, key: str) -> int:
+        value = int(self._data.get(key, 0)) + 1 if self._alive(key) else 1
+        self._data[key] = str(value)
+        return value
+
+    async def hset(self, key: str, mapping: Dict[str, Any]) -> int:
+        if not self._alive(key):
+            self._data[key] = {}
+        current = self._data[key]
+        current.update({field: str(value) for field, value in mapping.items()})
+        return len(mapping)
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        return dict(self._data.get(key, {})) if self._alive(key) else {}
+
+    async def sadd(self, key: str, *members: str) -> int:
+        if not self._alive(key):
+            self._data[key] = set()
+        current: Set[str] = self._data[key]
+        before = len(current)
+        current.update(members)
+        return len(current) - before
+
+    async def srem(self, key: str, *members: str) -> int:
+        current: Set[str] = self._data.get(key, set()) if self._alive(key) else set()
+        before = len(current)
+        current.difference_update(members)
+        return before - len(current)
+
+    async def smembers(self, key: str) -> Set[str]:
+        return set(self._data.get(key, set())) if self._alive(key) else set()
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and replays them against a FakeRedis on execute()."""
+
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._commands.clear()
+
+    def __getattr__(self, name: str):
+        if not hasattr(self._redis, name):
+            raise AttributeError(name)
+
+        def queue(*args: Any, **kwargs: Any) -> "FakePipeline":
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> List[Any]:
+        results = []
+        for name, args, kwargs in self._commands:
+            results.append(await getattr(self._redis, name)(*args, **kwargs))
+        self._commands.clear()
+        return results
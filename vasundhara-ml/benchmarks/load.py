@@ -0,0 +1,168 @@
+"""
+In-process ASGI load generator for every ML service route
+
+Drives ``main.app`` through httpx's ASGITransport (no network, no uvicorn)
+with Redis replaced by an in-memory fake, and reports throughput and
+p50/p95/p99 latency per route.
+
+Usage (from vasundhara-ml/):
+    python -m benchmarks.load [--requests 500] [--concurrency 16] [--repeat-payload] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import time
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import print_table, summarize_latencies, write_results
+from benchmarks.fakes import FakeRedis
+from benchmarks.micro import anomaly_request, demand_request, jpeg_bytes
+
+# route -> (method, path, payload factory(i) or None, admin token required)
+Route = Tuple[str, str, Optional[Callable[[int], Any]], bool]
+
+
+def build_routes() -> Dict[str, Route]:
+    image_payloads = [
+        base64.b64encode(jpeg_bytes(640, 480, seed=seed)).decode() for seed in range(8)
+    ]
+    forecast_payload = json.loads(demand_request(60).json())
+    anomaly_payload = json.loads(anomaly_request(60).json())
+
+    def expiry(i: int) -> Dict[str, Any]:
+        categories = ["fruits", "vegetables", "dairy", "meat", "bakery"]
+        return {
+            "product_name": f"Item {i}",
+            "category": categories[i % len(categories)],
+            "purchase_date": (date.today() - timedelta(days=i % 5)).isoformat(),
+            "storage": "fridge",
+            "packaging": "plastic",
+            "household_usage_rate_per_week": (i % 70) / 10,
+        }
+
+    def image(i: int) -> Dict[str, Any]:
+        return {"image_data": image_payloads[i % len(image_payloads)], "image_type": "base64"}
+
+    def recipes(i: int) -> Dict[str, Any]:
+        items = ["apple", "banana", "tomato", "spinach", "milk"]
+        return {"expiring_items": items[: 1 + i % len(items)], "dietary_preferences": []}
+
+    def forecast(i: int) -> Dict[str, Any]:
+        return dict(forecast_payload, item_name=f"Item {i}")
+
+    def anomalies(i: int) -> Dict[str, Any]:
+        return dict(anomaly_payload, metric_name=f"metric_{i}")
+
+    return {
+        "GET /": ("GET", "/", None, False),
+        "GET /health": ("GET", "/health", None, False),
+        "GET /models/status": ("GET", "/models/status", None, False),
+        "GET /metrics": ("GET", "/metrics", None, True),
+        "POST /predict-expiry": ("POST", "/predict-expiry", expiry, False),
+        "POST /classify-image": ("POST", "/classify-image", image, False),
+        "POST /suggest-recipes": ("POST", "/suggest-recipes", recipes, False),
+        "POST /forecast-demand": ("POST", "/forecast-demand", forecast, False),
+        "POST /detect-anomalies": ("POST", "/detect-anomalies", anomalies, False),
+    }
+
+
+async def setup_app():
+    """Import the app and start its services against a fake Redis"""
+    import main
+    from app.core.redis_client import redis_client
+
+    redis_client.client = FakeRedis()
+    await main.cache_service.initialize()
+    await main.ml_service.initialize()
+    return main.app
+
+
+async def drive_route(
+    client: httpx.AsyncClient,
+    route: Route,
+    headers: Dict[str, str],
+    total_requests: int,
+    concurrency: int,
+    repeat_payload: bool,
+) -> Dict[str, Any]:
+    method, path, payload_factory, _admin = route
+    latencies: List[int] = []
+    statuses: Dict[int, int] = {}
+    counter = iter(range(total_requests))
+
+    async def worker() -> None:
+        for i in counter:
+            payload = payload_factory(0 if repeat_payload else i) if payload_factory else None
+            start = time.perf_counter_ns()
+            response = await client.request(method, path, json=payload, headers=headers)
+            latencies.append(time.perf_counter_ns() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stats = summarize_latencies(latencies)
+    return {
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(stats["p50_us"] / 1000, 3),
+        "p95_ms": round(stats["p95_us"] / 1000, 3),
+        "p99_ms": round(stats["p99_us"] / 1000, 3),
+        "mean_ms": round(stats["mean_us"] / 1000, 3),
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+async def run(total_requests: int, concurrency: int, repeat_payload: bool, only: List[str]) -> List[Dict[str, Any]]:
+    from app.utils.auth import create_access_token
+
+    app = await setup_app()
+    user_headers = {"Authorization": f"Bearer {create_access_token({'user_id': 'bench-user', 'role': 'user'})}"}
+    admin_headers = {"Authorization": f"Bearer {create_access_token({'user_id': 'bench-admin', 'role': 'admin'})}"}
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        for name, route in build_routes().items():
+            if only and name not in only:
+                continue
+            headers = admin_headers if route[3] else user_headers
+            # Warm-up pass so first-call costs don't land in the measurements
+            await drive_route(client, route, headers, min(concurrency, total_requests), concurrency, repeat_payload)
+            stats = await drive_route(client, route, headers, total_requests, concurrency, repeat_payload)
+            results.append({
+                "route": name,
+                "concurrency": concurrency,
+                "repeat_payload": repeat_payload,
+                **stats,
+            })
+            print(f"{name}: {stats['throughput_rps']} req/s, p99 {stats['p99_ms']}ms, errors {stats['errors']}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent in-flight requests")
+    parser.add_argument("--repeat-payload", action="store_true", help="send one payload repeatedly (cache hits)")
+    parser.add_argument("--only", action="append", default=[], help="run only these routes, e.g. 'POST /predict-expiry'")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/load-<commit>.json)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests, args.concurrency, args.repeat_payload, args.only))
+    print()
+    print_table(results, ["route", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "errors"])
+    print(f"\nResults written to {write_results('load', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
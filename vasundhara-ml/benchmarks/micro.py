@@ -0,0 +1,252 @@
+"""
+Micro-benchmarks for the MLService hot paths across input sizes
+
+Usage (from vasundhara-ml/):
+    python -m benchmarks.micro [--min-time 0.5] [--only forecast_demand] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.models.expiry_prediction import ExpiryPredictionRequest
+from app.models.forecasting import (
+    AnomalyDataPoint,
+    AnomalyDetectionRequest,
+    DemandDataPoint,
+    DemandForecastRequest,
+)
+from app.services.ml_service import MLService
+from app.services.monitoring_service import MonitoringService
+from app.services.recipe_embeddings import HashingEncoder, RecipeEmbeddings
+from app.services.recipe_index import RecipeIndex, dietary_mask
+from benchmarks.common import print_table, summarize_latencies, time_calls, write_results
+
+# name -> (parameter sets, factory(service, loop, **params) -> zero-arg callable)
+Case = Tuple[List[Dict[str, Any]], Callable[..., Callable[[], Any]]]
+CASES: Dict[str, Case] = {}
+
+
+def benchmark(name: str, params: Iterable[Dict[str, Any]]):
+    """Register a micro-benchmark factory under ``name``"""
+
+    def register(factory: Callable[..., Callable[[], Any]]):
+        CASES[name] = (list(params), factory)
+        return factory
+
+    return register
+
+
+def expiry_request(category: str = "dairy", storage: str = "fridge", **overrides: Any) -> ExpiryPredictionRequest:
+    fields = {
+        "product_name": "Benchmark item",
+        "category": category,
+        "purchase_date": date.today() - timedelta(days=1),
+        "storage": storage,
+        "packaging": "plastic",
+        "household_usage_rate_per_week": 2.0,
+        "temperature_c": 4.0,
+    }
+    fields.update(overrides)
+    return ExpiryPredictionRequest(**fields)
+
+
+def jpeg_bytes(width: int, height: int, seed: int = 0) -> bytes:
+    """Photo-like JPEG: smooth gradients plus noise, so it compresses realistically"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // max(width - 1, 1), y * 255 // max(height - 1, 1), (x + y) % 256], axis=-1)
+    noisy = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(noisy, "RGB").save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+INGREDIENT_WORDS = (
+    "onion", "garlic", "tomato", "potato", "carrot", "spinach", "paneer", "rice", "lentil", "chickpea",
+    "apple", "banana", "mango", "milk", "yogurt", "butter", "egg", "chicken", "fish", "bread",
+    "flour", "sugar", "ginger", "coriander", "cumin", "pepper", "cabbage", "cauliflower", "pea", "bean",
+)
+INGREDIENT_MODIFIERS = ("", "green", "red", "sweet", "baby", "smoked", "dried", "wild", "black", "white")
+
+
+def synthetic_recipes(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Recipe corpus with a skewed ingredient distribution (a few staples in most recipes)"""
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"{modifier} {word}{suffix}".strip()
+                  for modifier in INGREDIENT_MODIFIERS for word in INGREDIENT_WORDS for suffix in ("", "s")]
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+    draws = rng.choice(len(vocabulary), size=(count, 13), p=weights)
+    sizes = rng.integers(4, 14, size=count)
+    recipes = []
+    for i in range(count):
+        picks = list(dict.fromkeys(draws[i, :sizes[i]].tolist()))
+        recipes.append({
+            "Title": f"Recipe {i}",
+            "Ingredients": [f"{int(rng.integers(1, 4))} cups {vocabulary[j]}, chopped" for j in picks],
+        })
+    return recipes
+
+
+def demand_request(points: int) -> DemandForecastRequest:
+    rng = np.random.default_rng(points)
+    start = date.today() - timedelta(days=points)
+    quantities = np.maximum(0, 10 + 3 * np.sin(np.arange(points) / 7 * 2 * np.pi) + rng.normal(0, 1, points))
+    return DemandForecastRequest(
+        item_name="Milk",
+        history=[
+            DemandDataPoint(date=start + timedelta(days=i), quantity=float(q))
+            for i, q in enumerate(quantities)
+        ],
+        horizon_days=14,
+    )
+
+
+def anomaly_request(points: int) -> AnomalyDetectionRequest:
+    rng = np.random.default_rng(points)
+    start = date.today() - timedelta(days=points)
+    values = rng.normal(100, 5, points)
+    values[:: max(points // 10, 1)] += 40  # inject spikes
+    return AnomalyDetectionRequest(
+        metric_name="waste_kg",
+        series=[AnomalyDataPoint(date=start + timedelta(days=i), value=float(v)) for i, v in enumerate(values)],
+        window_days=7,
+    )
+
+
+@benchmark("predict_with_rules", [
+    {"category": "seafood", "storage": "fridge"},
+    {"category": "dairy", "storage": "fridge"},
+    {"category": "grains", "storage": "pantry"},
+    {"category": "grains", "storage": "freezer"},
+])
+def bench_predict_with_rules(service: MLService, loop, category: str, storage: str):
+    request = expiry_request(category, storage)
+    return lambda: service._predict_with_rules(request)
+
+
+@benchmark("generate_spoilage_curve", [{"shelf_life_days": days} for days in (3, 30, 365, 1642)])
+def bench_generate_spoilage_curve(service: MLService, loop, shelf_life_days: int):
+    purchase = date.today()
+    expiry = purchase + timedelta(days=shelf_life_days)
+    return lambda: service._generate_spoilage_curve(purchase, expiry, shelf_life_days)
+
+
+@benchmark("preprocess_image", [
+    {"width": 224, "height": 224},
+    {"width": 640, "height": 480},
+    {"width": 1920, "height": 1080},
+    {"width": 4032, "height": 3024},
+])
+def bench_preprocess_image(service: MLService, loop, width: int, height: int):
+    data = jpeg_bytes(width, height)
+    # Image.open is lazy, so this includes the JPEG decode a real request pays
+    return lambda: service._preprocess_image(Image.open(io.BytesIO(data)))
+
+
+@benchmark("forecast_demand", [{"history_points": n} for n in (14, 90, 365, 1095)])
+def bench_forecast_demand(service: MLService, loop, history_points: int):
+    request = demand_request(history_points)
+    return lambda: loop.run_until_complete(service.forecast_demand(request))
+
+
+@benchmark("detect_anomalies", [{"series_points": n} for n in (14, 90, 365, 1095)])
+def bench_detect_anomalies(service: MLService, loop, series_points: int):
+    request = anomaly_request(series_points)
+    return lambda: loop.run_until_complete(service.detect_anomalies(request))
+
+
+@benchmark(
+    "recipe_search",
+    [{"recipes": n} for n in (1_000, 10_000, 100_000)]
+    + [{"recipes": 100_000, "dietary": "vegetarian,gluten-free,nut-free,jain"}],
+)
+def bench_recipe_search(service: MLService, loop, recipes: int, dietary: str = ""):
+    index = RecipeIndex(synthetic_recipes(recipes))
+    mask = dietary_mask(dietary.split(",") if dietary else [])
+    queries = [
+        [("Tomatoes", 1.0), ("2 onions", 0.5), ("Spinach", 0.25), ("paneer", 0.5), ("green chillies", 0.1)],
+        [("apple", 1.0)],
+        [("smoked fish", 0.7), ("rice", 0.2)],
+        [("Fresho Tomatoe 500g", 0.9), ("Amul Paneer 200 g", 0.6), ("brocoli florets", 0.3)],
+    ]
+    pantry = ["flour", "butter", "milk", "egg", "garlic", "ginger"]
+    state = {"i": 0}
+
+    def rank():
+        state["i"] += 1
+        # Drop the per-item match caches so every call pays a cold lookup
+        index._ingredients_for.cache_clear()
+        index.matcher.cache_clear()
+        return index.rank(queries[state["i"] % len(queries)], pantry, k=5, dietary=mask)
+
+    return rank
+
+
+@benchmark("recipe_ann_search", [{"recipes": n} for n in (10_000, 100_000)])
+def bench_recipe_ann_search(service: MLService, loop, recipes: int):
+    index = RecipeIndex(synthetic_recipes(recipes))
+    path = os.path.join(tempfile.mkdtemp(prefix="recipe-embeddings-"), "embeddings")
+    encoder = HashingEncoder(128)
+    RecipeEmbeddings.build(index, encoder).save(path)
+    embeddings = RecipeEmbeddings.open(path, encoder)  # float16 memmap, as in the service
+    queries = [
+        [("tomato", 1.0), ("spinach", 0.5), ("paneer", 0.5)],
+        [("smoked fish", 0.7), ("rice", 0.2)],
+        [("sweet mango", 1.0), ("yogurt", 0.4)],
+    ]
+    state = {"i": 0}
+
+    def search():
+        state["i"] += 1
+        embeddings.embed.cache_clear()
+        return embeddings.search_items(queries[state["i"] % len(queries)], 50)
+
+    return search
+
+
+def run(min_time: float, only: List[str]) -> List[Dict[str, Any]]:
+    loop = asyncio.new_event_loop()
+    service = MLService(monitoring_service=MonitoringService())
+    loop.run_until_complete(service.initialize())
+
+    results = []
+    for name, (param_sets, factory) in CASES.items():
+        if only and name not in only:
+            continue
+        for params in param_sets:
+            func = factory(service, loop, **params)
+            stats = summarize_latencies(time_calls(func, min_time=min_time))
+            results.append({"name": name, "params": params, **stats})
+            print(f"{name} {params}: p50 {stats['p50_us']}us, p95 {stats['p95_us']}us")
+
+    loop.run_until_complete(service.cleanup())
+    loop.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to run each case")
+    parser.add_argument("--only", action="append", default=[], choices=sorted(CASES), help="run only these cases")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/micro-<commit>.json)")
+    args = parser.parse_args()
+
+    results = run(args.min_time, args.only)
+    print()
+    print_table(results, ["name", "params", "mean_us", "p50_us", "p95_us", "p99_us"])
+    print(f"\nResults written to {write_results('micro', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Cold-start benchmark: import-time breakdown and model load times
+
+Each run starts a fresh interpreter, so nothing is warm. The import
+breakdown comes from ``python -X importtime -c "import main"``, summed per
+top-level package (self time, so a package is not charged for what it
+imports). A second interpreter times ``import main`` without the
+importtime overhead and then ``MLService.initialize`` against a fake
+Redis, per model.
+
+Usage (from vasundhara-ml/):
+    python -m benchmarks.startup [--runs 3] [--top 15] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from benchmarks.common import print_table, write_results
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=SERVICE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_breakdown() -> Dict[str, float]:
+    """Self import time of ``main`` per top-level package, in milliseconds"""
+    stderr = _python("-X", "importtime", "-c", "import main").stderr
+    totals: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        package = parts[2].strip().split(".")[0]
+        totals[package] = totals.get(package, 0.0) + int(parts[0]) / 1000.0
+    return totals
+
+
+async def _measure_startup() -> Dict[str, Any]:
+    """Runs in the child interpreter: time ``import main`` and model initialization"""
+    start = time.perf_counter()
+    import main
+    import_ms = (time.perf_counter() - start) * 1000.0
+
+    from app.core.redis_client import redis_client
+    from benchmarks.fakes import FakeRedis
+
+    redis_client.client = FakeRedis()
+    await main.cache_service.initialize()
+    start = time.perf_counter()
+    await main.ml_service.initialize()
+    initialize_ms = (time.perf_counter() - start) * 1000.0
+    return {
+        "import_ms": import_ms,
+        "initialize_ms": initialize_ms,
+        "models": {
+            name: state["load_seconds"] * 1000.0
+            for name, state in main.ml_service.model_readiness.items()
+        },
+    }
+
+
+def startup_timings() -> Dict[str, Any]:
+    """Startup phases measured in a fresh interpreter"""
+    return json.loads(_python("-m", "benchmarks.startup", "--child").stdout.splitlines()[-1])
+
+
+def run(runs: int, top: int) -> List[Dict[str, Any]]:
+    breakdowns = [import_breakdown() for _ in range(runs)]
+    timings = [startup_timings() for _ in range(runs)]
+
+    def row(name: str, samples: List[float]) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "params": {"runs": runs},
+            "median_ms": round(float(np.median(samples)), 1),
+            "max_ms": round(float(np.max(samples)), 1),
+        }
+
+    results = [
+        row("import main", [timing["import_ms"] for timing in timings]),
+        row("MLService.initialize", [timing["initialize_ms"] for timing in timings]),
+    ]
+    for model in sorted(timings[0]["models"]):
+        results.append(row(f"  load {model} model", [timing["models"][model] for timing in timings]))
+
+    packages = {package for breakdown in breakdowns for package in breakdown}
+    imports = [row(f"  import {package}", [b.get(package, 0.0) for b in breakdowns]) for package in packages]
+    imports.sort(key=lambda result: result["median_ms"], reverse=True)
+    return results + imports[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="packages shown in the import breakdown")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/startup-<commit>.json)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import asyncio
+
+        # Keep the child's logging off stdout, which carries the result
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        print(json.dumps(asyncio.run(_measure_startup())))
+        return
+
+    results = run(args.runs, args.top)
+    print_table(results, ["name", "median_ms", "max_ms"])
+    print(f"\nResults written to {write_results('startup', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
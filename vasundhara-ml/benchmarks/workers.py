@@ -0,0 +1,195 @@
+"""
+Memory per worker with and without pre-fork model loading
+
+Starts ``gunicorn -c gunicorn.conf.py main:app`` with PRELOAD_MODELS on and
+off against a synthetic recipe corpus. For each server it waits until the
+workers are ready, then sends traffic to the model routes. It reads RSS,
+PSS and USS for the master and every worker from /proc/<pid>/smaps_rollup
+(Linux only), once when idle and once after the traffic. PSS divides each
+shared page among the processes that map it, so the total PSS of master
+plus workers is what the deployment really costs. USS is what a worker
+alone would free if it exited.
+
+Usage (from vasundhara-ml/, with gunicorn and uvicorn installed):
+    python -m benchmarks.workers [--workers 4] [--recipes 100000] [--requests 200] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.common import print_table, write_results
+from benchmarks.load import build_routes
+from benchmarks.micro import synthetic_recipes
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+TRAFFIC_ROUTES = ("POST /predict-expiry", "POST /classify-image", "POST /suggest-recipes")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """Rss, Pss and Uss (private clean + dirty) of one process, in kB"""
+    fields: Dict[str, int] = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; ppid is the second field after it
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+
+def snapshot(master: int, workers: int, preload: bool, recipes: int, phase: str) -> Dict[str, Any]:
+    pids = child_pids(master)
+    worker_memory = [memory_kb(pid) for pid in pids]
+    master_memory = memory_kb(master)
+
+    def mean_mb(key: str) -> float:
+        return round(sum(memory[key] for memory in worker_memory) / len(worker_memory) / 1024, 1)
+
+    return {
+        "name": "workers",
+        "params": {"workers": workers, "preload": preload, "recipes": recipes, "phase": phase},
+        "master_rss_mb": round(master_memory["rss"] / 1024, 1),
+        "worker_rss_mb": mean_mb("rss"),
+        "worker_pss_mb": mean_mb("pss"),
+        "worker_uss_mb": mean_mb("uss"),
+        "total_pss_mb": round((master_memory["pss"] + sum(m["pss"] for m in worker_memory)) / 1024, 1),
+    }
+
+
+def wait_until_ready(base_url: str, workers: int, timeout: float = 600.0) -> None:
+    """Poll /readyz until enough consecutive successes that every worker has likely answered"""
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while streak < workers * 5:
+        if time.monotonic() > deadline:
+            raise TimeoutError("workers did not become ready")
+        try:
+            ok = httpx.get(f"{base_url}/readyz", timeout=5.0).status_code == 200
+        except httpx.TransportError:
+            ok = False
+        streak = streak + 1 if ok else 0
+        if not ok:
+            time.sleep(0.2)
+
+
+def send_traffic(base_url: str, total_requests: int) -> int:
+    """Exercise every model in the workers; returns the number of failed requests"""
+    from app.utils.auth import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token({'user_id': 'bench-user', 'role': 'user'})}"}
+    routes = build_routes()
+    errors = 0
+    with httpx.Client(base_url=base_url, headers=headers, timeout=30.0) as client:
+        for name in TRAFFIC_ROUTES:
+            method, path, payload_factory, _admin = routes[name]
+            for i in range(total_requests):
+                response = client.request(method, path, json=payload_factory(i) if payload_factory else None)
+                errors += response.status_code >= 400
+    return errors
+
+
+def measure(workers: int, preload: bool, recipes: int, total_requests: int, env: Dict[str, str]) -> List[Dict[str, Any]]:
+    port = free_port()
+    env = {**env, "PORT": str(port), "HOST": "127.0.0.1", "WORKERS": str(workers), "PRELOAD_MODELS": str(preload).lower()}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"],
+        cwd=SERVICE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(base_url, workers)
+        results = [snapshot(server.pid, workers, preload, recipes, "idle")]
+        errors = send_traffic(base_url, total_requests)
+        results.append({**snapshot(server.pid, workers, preload, recipes, "after traffic"), "errors": errors})
+        return results
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def run(workers: int, recipes: int, total_requests: int) -> List[Dict[str, Any]]:
+    from app.core.config import settings
+    from app.services.recipe_embeddings import load_recipe_embeddings
+    from app.services.recipe_index import RecipeIndex
+
+    workdir = tempfile.mkdtemp(prefix="workers-bench-")
+    corpus_path = os.path.join(workdir, "recipes.json")
+    embeddings_path = os.path.join(workdir, "recipe_embeddings")
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        json.dump(synthetic_recipes(recipes), f)
+    # Build the embeddings up front so workers started without preloading don't all race to write them
+    load_recipe_embeddings(RecipeIndex.load(corpus_path), embeddings_path, settings.RECIPE_EMBEDDING_MODEL)
+
+    env = {
+        **os.environ,
+        "RECIPE_CORPUS_PATH": corpus_path,
+        "RECIPE_EMBEDDINGS_PATH": embeddings_path,
+        "MODEL_PATH": os.path.join(workdir, "models"),
+        "LOG_LEVEL": "WARNING",
+    }
+    results = []
+    for preload in (True, False):
+        print(f"{workers} workers, preload={preload}...")
+        results.extend(measure(workers, preload, recipes, total_requests, env))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument("--recipes", type=int, default=100_000, help="synthetic recipe corpus size")
+    parser.add_argument("--requests", type=int, default=200, help="requests per model route after start-up")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/workers-<commit>.json)")
+    args = parser.parse_args()
+
+    results = run(args.workers, args.recipes, args.requests)
+    print()
+    print_table([{**result["params"], **result} for result in results], [
+        "preload", "phase", "master_rss_mb", "worker_rss_mb", "worker_pss_mb", "worker_uss_mb", "total_pss_mb", "errors",
+    ])
+    print(f"\nResults written to {write_results('workers', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Gunicorn configuration for the ML service: models load once, before forking
+
+    gunicorn -c gunicorn.conf.py main:app
+
+With PRELOAD_MODELS the master imports ``main`` and runs
+``main.preload_models()`` before any worker exists. Workers are forked
+from that process and share the model objects, recipe index, embedding
+tables and expiry lookup tables copy-on-write. Without preloading, every
+worker loads and warms up its own copy in its lifespan.
+
+Reference counting still writes to the objects a worker touches, but the
+bulk of the data lives in numpy buffers, which carry no per-element
+refcounts. Cyclic garbage collection would otherwise write to the header
+of every tracked container on each full collection. So GC stays off in
+the master, the heap is frozen (``gc.freeze``) before each fork, and
+workers re-enable GC only for objects they create themselves.
+"""
+
+import gc
+
+from app.core.config import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = settings.PRELOAD_MODELS
+timeout = 120
+graceful_timeout = 30
+
+if preload_app:
+    # Collections in the master leave freed holes scattered over pages the workers will share
+    gc.disable()
+
+
+def on_starting(server):
+    """Master, after importing the app: load and warm up models once"""
+    if server.cfg.preload_app:
+        import main
+
+        main.preload_models()
+
+
+def pre_fork(server, worker):
+    """Master, before each fork: move everything allocated so far out of the collector's reach"""
+    if server.cfg.preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """Worker, right after fork"""
+    if server.cfg.preload_app:
+        gc.enable()
@@ -3,22 +3,33 @@ Vasundhara ML Service
 FastAPI service for food waste prediction and ML operations
 """
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
+import asyncio
+import hashlib
+import json
 import logging
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from app.core.config import settings
-from app.core.database import get_database
-from app.core.redis_client import get_redis
+from app.core.database import database, get_database
+from app.core.redis_client import get_redis, redis_client
 from app.models.expiry_prediction import ExpiryPredictionRequest, ExpiryPredictionResponse
-from app.models.image_classification import ImageClassificationRequest, ImageClassificationResponse
+from app.models.household import HouseholdScoringRequest, HouseholdScoringResponse
+from app.models.recipes import RecipeSuggestionRequest
+from app.models.image_classification import (
+    FoodCategory,
+    ImageClassificationOptions,
+    ImageClassificationRequest,
+    ImageClassificationResponse,
+)
 from app.models.forecasting import (
     DemandForecastRequest,
     DemandForecastResponse,
@@ -28,8 +39,15 @@ from app.models.forecasting import (
 from app.services.ml_service import MLService
 from app.services.cache_service import CacheService
 from app.services.monitoring_service import MonitoringService
-from app.utils.auth import verify_token
+from app.services.degradation import DegradationPolicy
+from app.services.household_scoring import FOOD_ITEMS_COLLECTION, HouseholdRiskScorer
+from app.services.metrics_aggregator import MetricsAggregator
+from app.services.risk_materializer import ExpiryRiskMaterializer
+from app.services.profiler_service import ProfilerService, ProfilerBusyError
+from app.utils.admission import AdmissionControlMiddleware, AdmissionController
+from app.utils.auth import get_current_user, security, token_cache
 from app.utils.logging import setup_logging
+from app.utils.uploads import read_image_upload
 
 # Setup logging
 setup_logging()
@@ -37,24 +55,66 @@ logger = logging.getLogger(__name__)
 
 # Initialize services
 monitoring_service = MonitoringService()
-ml_service = MLService(monitoring_service=monitoring_service)
 cache_service = CacheService()
+admission_controller = AdmissionController()
+degradation_policy = DegradationPolicy(admission_controller)
+ml_service = MLService(
+    monitoring_service=monitoring_service,
+    cache_service=cache_service,
+    degradation_policy=degradation_policy,
+)
+household_scorer = HouseholdRiskScorer(ml_service.expiry_table, monitoring_service)
+risk_materializer = ExpiryRiskMaterializer(household_scorer, database)
+metrics_aggregator = MetricsAggregator(monitoring_service, redis_client)
+profiler_service = ProfilerService()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("Starting Vasundhara ML Service...")
-    await ml_service.initialize()
+    try:
+        await redis_client.connect()
+    except Exception:
+        logger.warning("Redis unavailable, caching and fleet metrics disabled")
+    try:
+        await database.connect()
+    except Exception:
+        logger.warning("MongoDB unavailable, household risk streaming disabled")
+    await cache_service.initialize()
+    # Models preloaded by a pre-fork master (gunicorn.conf.py) are used as-is.
+    # Otherwise they load and warm up in the background; /livez answers
+    # meanwhile and /readyz fails until every model is ready
+    model_loading = None if ml_service.is_ready() else asyncio.create_task(ml_service.initialize())
+    await metrics_aggregator.start()
+    await risk_materializer.start()
+    await token_cache.start(redis_client)
     logger.info("ML Service initialized successfully")
     
     yield
     
     # Shutdown
     logger.info("Shutting down ML Service...")
+    if model_loading is not None:
+        model_loading.cancel()
+        with suppress(asyncio.CancelledError, Exception):
+            await model_loading
+    await metrics_aggregator.stop()
+    await risk_materializer.stop()
+    await token_cache.stop()
     await ml_service.cleanup()
+    await database.disconnect()
+    await redis_client.disconnect()
     logger.info("ML Service shutdown complete")
 
+def preload_models():
+    """Load and warm up every model in this process, before a pre-fork server forks workers
+    
+    Nothing that owns sockets or threads (Redis, MongoDB, background tasks)
+    is started here; each worker connects those in its own lifespan.
+    """
+    asyncio.run(ml_service.initialize())
+
 # Create FastAPI app
 app = FastAPI(
     title="Vasundhara ML Service",
@@ -79,17 +139,8 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
-# Security
-security = HTTPBearer()
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from JWT token"""
-    try:
-        payload = verify_token(credentials.credentials)
-        return payload
-    except Exception as e:
-        logger.error(f"Authentication error: {e}")
-        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+# Outermost, so shed requests cost no further middleware work
+app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
 
 @app.get("/")
 async def root():
@@ -101,6 +152,25 @@ async def root():
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/livez")
+async def liveness_check():
+    """Liveness probe: the event loop is serving requests; no I/O"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe: every model is loaded and warmed up"""
+    if not ml_service.is_ready():
+        raise HTTPException(
+            status_code=503,
+            detail={"status": "not ready", "models": ml_service.model_readiness},
+        )
+    return {
+        "status": "ready",
+        "models": ml_service.model_readiness,
+        "cache": await cache_service.health_check(),
+    }
+
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
@@ -108,11 +178,12 @@ async def health_check():
         # Check ML model status
         model_status = await ml_service.get_model_status()
         
-        # Check Redis connection
+        # Check Redis connection (cached for REDIS_HEALTH_CACHE_SECONDS)
         redis_status = await cache_service.health_check()
         
         return {
             "status": "healthy",
+            "ready": ml_service.is_ready(),
             "timestamp": datetime.utcnow().isoformat(),
             "models": model_status,
             "cache": redis_status
@@ -123,21 +194,72 @@ async def health_check():
 
 
 @app.get("/metrics")
-async def get_metrics(current_user: dict = Depends(get_current_user)):
-    """Expose lightweight inference and retraining metrics (admin only)."""
+async def get_metrics(
+    scope: str = Query("local", pattern="^(local|fleet)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Expose lightweight inference and retraining metrics (admin only).
+
+    ``scope=local`` reports this process; ``scope=fleet`` merges the counters
+    every replica has flushed to Redis.
+    """
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    metrics_snapshot = await monitoring_service.get_metrics()
+    if scope == "fleet":
+        metrics_snapshot = await metrics_aggregator.get_fleet_metrics()
+    else:
+        metrics_snapshot = await monitoring_service.get_metrics()
+        metrics_snapshot["admission"] = admission_controller.stats()
+        metrics_snapshot["degradation"] = degradation_policy.stats()
+        metrics_snapshot["expiry_risk_job"] = risk_materializer.stats()
+        metrics_snapshot["auth_cache"] = token_cache.stats()
     return {
         "timestamp": datetime.utcnow().isoformat(),
+        "scope": scope,
         "metrics": metrics_snapshot,
     }
 
+
+@app.get("/metrics/profile")
+async def profile_process(
+    mode: str = Query("cpu", pattern="^(cpu|memory)$"),
+    duration_seconds: float = Query(10.0, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    top_n: int = Query(25, ge=1, le=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Profile this worker for a bounded window (admin only)
+
+    ``mode=cpu`` returns sampled stacks in collapsed format for flamegraph
+    tools; ``mode=memory`` returns the allocation sites that grew the most
+    according to tracemalloc.
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    try:
+        if mode == "memory":
+            report = await profiler_service.snapshot_memory(duration_seconds, top_n=top_n)
+            return {
+                "timestamp": datetime.utcnow().isoformat(),
+                "instance_id": monitoring_service.instance_id,
+                "memory": report,
+            }
+
+        folded = await profiler_service.profile_cpu(duration_seconds, interval_ms=interval_ms)
+        filename = f"profile-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.folded"
+        return PlainTextResponse(
+            folded,
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 @app.post("/predict-expiry", response_model=ExpiryPredictionResponse)
 async def predict_expiry(
     request: ExpiryPredictionRequest,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -147,101 +269,289 @@ async def predict_expiry(
     based on various factors like storage conditions, usage patterns, etc.
     """
     try:
-        # Check cache first
-        cache_key = f"expiry_prediction:{hash(str(request.dict()))}"
-        cached_result = await cache_service.get(cache_key)
-        
-        if cached_result:
-            logger.info(f"Cache hit for prediction: {cache_key}")
-            return ExpiryPredictionResponse(**cached_result)
-        
-        # Generate prediction
+        # Cached by the ML service, which knows the tier a prediction came from
         logger.info(f"Generating expiry prediction for: {request.product_name}")
-        prediction = await ml_service.predict_expiry(request)
-        
-        # Cache the result
-        background_tasks.add_task(
-            cache_service.set,
-            cache_key,
-            prediction.dict(),
-            ttl=3600  # 1 hour cache
-        )
-        
-        return prediction
+        return await ml_service.predict_expiry(request)
         
     except Exception as e:
         logger.error(f"Expiry prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+@app.post("/households/score-expiry", response_model=HouseholdScoringResponse)
+async def score_household_expiry(
+    request: HouseholdScoringRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Score a household's full inventory for expiry risk in one pass
+    
+    Computes expiry dates and spoilage probabilities for every item at once
+    and returns only items whose spoilage probability at the end of
+    ``horizon_days`` reaches ``min_risk``, soonest expiry first.
+    """
+    if len(request.items) > settings.HOUSEHOLD_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.HOUSEHOLD_MAX_ITEMS} items can be scored per request",
+        )
+
+    try:
+        return household_scorer.score_household(
+            request.household_id,
+            request.items,
+            as_of=request.as_of,
+            horizon_days=request.horizon_days,
+            min_risk=request.min_risk,
+        )
+    except Exception as e:
+        logger.error(f"Household scoring error: {e}")
+        raise HTTPException(status_code=500, detail=f"Household scoring failed: {str(e)}")
+
+@app.get("/households/expiry-risk/stream")
+async def stream_household_expiry_risk(
+    as_of: Optional[date] = Query(None),
+    horizon_days: int = Query(3, ge=0, le=30),
+    min_risk: float = Query(0.5, ge=0.0, le=1.0),
+    include_empty: bool = Query(False),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream the expiry risk of every household as NDJSON (admin only)
+    
+    Intended for the nightly alert job: walks all active food items in
+    household order and emits one ``HouseholdScoringResponse`` per line for
+    each household with at-risk items (or every household with
+    ``include_empty``).
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    try:
+        collection = database.get_database()[FOOD_ITEMS_COLLECTION]
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="MongoDB is not connected")
+
+    async def household_lines():
+        try:
+            async for response in household_scorer.stream_households(
+                collection,
+                as_of=as_of,
+                horizon_days=horizon_days,
+                min_risk=min_risk,
+                include_empty=include_empty,
+            ):
+                yield response.json() + "\n"
+        except Exception as e:
+            logger.error(f"Household risk stream error: {e}")
+            raise
+
+    return StreamingResponse(household_lines(), media_type="application/x-ndjson")
+
+@app.get("/households/{household_id}/expiry-risk", response_model=HouseholdScoringResponse)
+async def get_household_expiry_risk(
+    household_id: str,
+    as_of: Optional[date] = Query(None),
+    horizon_days: int = Query(3, ge=0, le=30),
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Items of a household expiring within ``horizon_days``, from the materialized store
+    
+    An index lookup on ``expiry_risk`` instead of rescoring the inventory;
+    spoilage probabilities are recomputed for ``as_of`` from the stored
+    shelf life.
+    """
+    try:
+        return await risk_materializer.lookup(household_id, as_of=as_of, horizon_days=horizon_days, limit=limit)
+    except RuntimeError:
+        raise HTTPException(status_code=503, detail="MongoDB is not connected")
+    except Exception as e:
+        logger.error(f"Expiry risk lookup error: {e}")
+        raise HTTPException(status_code=500, detail=f"Expiry risk lookup failed: {str(e)}")
+
+@app.post("/jobs/expiry-risk/run")
+async def run_expiry_risk_job(
+    background_tasks: BackgroundTasks,
+    full: bool = Query(False),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Trigger an expiry risk materialization run (admin only)
+    
+    Incremental by default; ``full=true`` rescores every food item and drops
+    rows of deleted items.
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if database.database is None:
+        raise HTTPException(status_code=503, detail="MongoDB is not connected")
+
+    background_tasks.add_task(risk_materializer.run, full)
+    return {
+        "message": f"{'Full' if full else 'Incremental'} expiry risk materialization started",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 @app.post("/classify-image", response_model=ImageClassificationResponse)
 async def classify_image(
     request: ImageClassificationRequest,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Classify food images for freshness detection
     
-    Uses computer vision models to determine if food items are fresh or spoiled
+    Uses computer vision models to determine if food items are fresh or spoiled.
+    Results are cached by image content (exact and near-duplicate) inside MLService.
     """
     try:
-        # Check cache first
-        cache_key = f"image_classification:{hash(request.image_data)}"
-        cached_result = await cache_service.get(cache_key)
-        
-        if cached_result:
-            logger.info(f"Cache hit for image classification: {cache_key}")
-            return ImageClassificationResponse(**cached_result)
-        
-        # Generate classification
         logger.info("Generating image classification")
-        classification = await ml_service.classify_image(request)
-        
-        # Cache the result
-        background_tasks.add_task(
-            cache_service.set,
-            cache_key,
-            classification.dict(),
-            ttl=1800  # 30 minutes cache
-        )
-        
-        return classification
+        return await ml_service.classify_image(request)
         
     except Exception as e:
         logger.error(f"Image classification error: {e}")
         raise HTTPException(status_code=500, detail=f"Classification failed: {str(e)}")
 
+@app.post(
+    "/classify-image/upload",
+    response_model=ImageClassificationResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                },
+                "application/octet-stream": {"schema": {"type": "string", "format": "binary"}},
+            },
+            "required": True,
+        }
+    },
+)
+async def classify_image_upload(
+    request: Request,
+    expected_category: Optional[FoodCategory] = Query(None),
+    include_confidence_scores: bool = Query(True),
+    include_freshness_analysis: bool = Query(True),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Classify a food image uploaded as binary instead of base64-in-JSON
+    
+    Accepts ``multipart/form-data`` (field ``file``) or a raw
+    ``application/octet-stream`` / ``image/*`` body. The body is streamed into
+    a single buffer and rejected with 413 as soon as it passes
+    MAX_IMAGE_UPLOAD_BYTES.
+    """
+    image_stream = await read_image_upload(request, settings.MAX_IMAGE_UPLOAD_BYTES)
+    options = ImageClassificationOptions(
+        expected_category=expected_category,
+        include_confidence_scores=include_confidence_scores,
+        include_freshness_analysis=include_freshness_analysis,
+    )
+
+    try:
+        logger.info("Generating image classification for binary upload")
+        return await ml_service.classify_image_stream(image_stream, options)
+    except Exception as e:
+        logger.error(f"Image classification error: {e}")
+        raise HTTPException(status_code=500, detail=f"Classification failed: {str(e)}")
+
 @app.post("/suggest-recipes")
 async def suggest_recipes(
-    expiring_items: List[str],
-    dietary_preferences: Optional[List[str]] = None,
+    request: RecipeSuggestionRequest,
+    background_tasks: BackgroundTasks,
+    limit: int = Query(5, ge=1, le=50),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Suggest recipes based on expiring food items
     
-    Uses NLP and recipe databases to suggest meals that prioritize
-    soon-to-expire ingredients
+    Items may carry an expiry date or spoilage probability; recipes are
+    ranked by the urgency of the expiring items they use, how much of them
+    is already on hand, and how many ingredients are missing. Results are
+    cached per user until their inventory changes (see
+    ``/users/{user_id}/cache/invalidate``) or ``RECIPE_CACHE_TTL`` passes.
     """
     try:
-        logger.info(f"Suggesting recipes for expiring items: {expiring_items}")
+        user_id = current_user.get("user_id")
+        cache_key = None
+        if user_id:
+            # Urgency depends on the day, so an implicit as_of is resolved before hashing
+            payload = {**request.dict(), "as_of": request.as_of or date.today(), "limit": limit}
+            digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+            cache_key = f"recipe_suggestions:{digest}"
+            cached_result, cache_version = await cache_service.get_user_cached(user_id, cache_key)
+            if cached_result is not None:
+                logger.info(f"Cache hit for recipe suggestions: user {user_id}")
+                return cached_result
+
+        logger.info(f"Suggesting recipes for {len(request.expiring_items)} expiring items")
         
         suggestions = await ml_service.suggest_recipes(
-            expiring_items=expiring_items,
-            dietary_preferences=dietary_preferences or [],
-            user_id=current_user.get("user_id")
+            request,
+            user_id=user_id,
+            limit=limit,
         )
         
-        return {
+        result = {
             "suggestions": suggestions,
             "timestamp": datetime.utcnow().isoformat()
         }
+        if cache_key:
+            background_tasks.add_task(
+                cache_service.set_user_cached,
+                user_id,
+                cache_key,
+                result,
+                cache_version,
+                ttl=settings.RECIPE_CACHE_TTL,
+            )
+        return result
         
     except Exception as e:
         logger.error(f"Recipe suggestion error: {e}")
         raise HTTPException(status_code=500, detail=f"Recipe suggestion failed: {str(e)}")
 
 
+@app.post("/auth/revoke")
+async def revoke_token(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Revoke the caller's bearer token (logout)
+    
+    The token is added to the revocation list shared through Redis until its
+    own expiry; other replicas drop their cached verification within
+    ``AUTH_REVOCATION_POLL_SECONDS``.
+    """
+    shared = await token_cache.revoke(credentials.credentials, current_user.get("exp"))
+    return {"revoked": True, "shared": shared}
+
+
+@app.post("/users/{user_id}/cache/invalidate")
+async def invalidate_user_cache(
+    user_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Drop a user's cached results, e.g. after an inventory change
+    
+    Bumps the user's cache version so only their entries become stale; no
+    keys are scanned or deleted. Users may invalidate their own cache,
+    admins anyone's.
+    """
+    if current_user.get("user_id") != user_id and current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Cannot invalidate another user's cache")
+
+    invalidated = await cache_service.invalidate_user_cache(user_id)
+    return {"user_id": user_id, "invalidated": invalidated}
+
+
 @app.post("/forecast-demand", response_model=DemandForecastResponse)
 async def forecast_demand(
     request: DemandForecastRequest,
@@ -250,7 +560,7 @@ async def forecast_demand(
 ):
     """Forecast demand for a given item using historic consumption data"""
     try:
-        cache_key = f"demand_forecast:{hash(str(request.dict(exclude={"history"})))}:{hash(str(request.history[-3:]))}"
+        cache_key = f"demand_forecast:{hash(str(request.dict(exclude={'history'})))}:{hash(str(request.history[-3:]))}"
         cached_result = await cache_service.get(cache_key)
         if cached_result:
             logger.info(f"Cache hit for demand forecast: {cache_key}")
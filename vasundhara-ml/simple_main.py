@@ -63,6 +63,16 @@ async def root():
         "timestamp": datetime.utcnow().isoformat()
     }
 
+@app.get("/livez")
+async def liveness_check():
+    """Liveness probe"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe; there are no models to warm up here"""
+    return {"status": "ready"}
+
 @app.get("/health")
 async def health_check():
     """Detailed health check"""
@@ -0,0 +1,109 @@
+"""
+Tests for admission control and load shedding
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.utils.admission import AdmissionController, AdmissionControlMiddleware, AdmissionRejected, RouteLimiter
+
+
+async def test_limiter_queues_in_fifo_order_and_hands_over_slots():
+    limiter = RouteLimiter("/r", max_concurrency=1, max_queue=2, max_queue_wait_ms=1000)
+    await limiter.acquire(None)
+    order = []
+
+    async def waiter(name):
+        await limiter.acquire(None)
+        order.append(name)
+
+    tasks = [asyncio.create_task(waiter("first")), asyncio.create_task(waiter("second"))]
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 2
+
+    limiter.release(0.01)
+    await asyncio.sleep(0)
+    limiter.release(0.01)
+    await asyncio.gather(*tasks)
+    limiter.release(0.01)
+
+    assert order == ["first", "second"]
+    assert limiter.in_flight == 0
+    assert limiter.stats()["admitted"] == 3
+
+
+async def test_limiter_rejects_when_queue_is_full():
+    limiter = RouteLimiter("/r", max_concurrency=1, max_queue=0, max_queue_wait_ms=1000)
+    await limiter.acquire(None)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limiter.acquire(None)
+    assert rejected.value.status_code == 429
+
+
+async def test_limiter_drops_requests_whose_deadline_passes_while_queued():
+    limiter = RouteLimiter("/r", max_concurrency=1, max_queue=4, max_queue_wait_ms=1000)
+    await limiter.acquire(None)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limiter.acquire(time.monotonic() + 0.05)
+    assert rejected.value.status_code == 503
+    assert limiter.queue_depth == 0
+    assert limiter.dropped_deadline == 1
+
+
+async def test_limiter_sheds_when_expected_wait_exceeds_the_limit():
+    limiter = RouteLimiter("/r", max_concurrency=1, max_queue=4, max_queue_wait_ms=100)
+    await limiter.acquire(None)
+    limiter.release(0.5)
+    await limiter.acquire(None)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limiter.acquire(None)
+    assert rejected.value.status_code == 503
+    assert limiter.rejected_overload == 1
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    @app.get("/free")
+    async def free():
+        return {"ok": True}
+
+    app.state.controller = AdmissionController({"/slow": 1}, max_queue=1, max_queue_wait_ms=1000)
+    app.add_middleware(AdmissionControlMiddleware, controller=app.state.controller)
+    return app
+
+
+@pytest.fixture
+async def client(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_middleware_answers_504_when_the_handler_outlives_the_deadline(app, client):
+    response = await client.get("/slow", headers={"X-Request-Timeout-Ms": "50"})
+
+    assert response.status_code == 504
+    assert response.headers["retry-after"]
+    stats = app.state.controller.stats()["/slow"]
+    assert stats["timed_out"] == 1
+    assert stats["in_flight"] == 0
+
+
+async def test_middleware_sheds_excess_requests_and_ignores_unlimited_routes(client):
+    responses = await asyncio.gather(*(client.get("/slow") for _ in range(3)), client.get("/free"))
+
+    assert sorted(response.status_code for response in responses) == [200, 200, 200, 429]
+    assert responses[-1].status_code == 200
@@ -0,0 +1,72 @@
+"""
+Tests for content and perceptual image hashing
+"""
+
+import io
+
+import numpy as np
+
+from app.utils.image_hashing import PerceptualHashIndex, content_digest, dhash
+
+
+def _gradient(width: int = 64, height: int = 48) -> np.ndarray:
+    row = np.linspace(0, 255, width, dtype=np.uint8)
+    return np.repeat(np.stack([row, row[::-1], row], axis=-1)[None, :, :], height, axis=0)
+
+
+def test_content_digest_matches_for_any_stream_and_rewinds():
+    data = b"\x89PNG" + bytes(range(256)) * 10
+    buffered = io.BytesIO(data)
+    buffered.seek(5)
+    raw = io.BufferedReader(io.BytesIO(data))
+
+    assert content_digest(buffered) == content_digest(raw)
+    assert raw.tell() == 0
+
+
+def test_dhash_is_stable_under_small_noise():
+    pixels = _gradient()
+    noisy = np.clip(pixels.astype(np.int16) + np.random.default_rng(0).integers(-2, 3, pixels.shape), 0, 255)
+
+    assert dhash(pixels) == dhash(pixels.copy())
+    assert bin(dhash(pixels) ^ dhash(noisy.astype(np.uint8))).count("1") <= 4
+
+
+def test_lookup_finds_entries_within_max_distance_only():
+    index = PerceptualHashIndex(max_distance=3, capacity=10)
+    base = 0x0F0F_0F0F_0F0F_0F0F
+    index.add(base, "result")
+
+    assert index.lookup(base) == "result"
+    assert index.lookup(base ^ 0b111) == "result"
+    assert index.lookup(base ^ 0b1111) is None
+    assert index.lookup(base, variant="top_k=3") is None
+
+
+def test_lookup_prefers_the_closest_entry():
+    index = PerceptualHashIndex(max_distance=4, capacity=10)
+    index.add(0b0000, "far")
+    index.add(0b0111, "near")
+
+    assert index.lookup(0b1111) == "near"
+
+
+def test_capacity_evicts_least_recently_used():
+    index = PerceptualHashIndex(max_distance=0, capacity=2)
+    index.add(1, "a")
+    index.add(2, "b")
+    index.lookup(1)
+    index.add(3, "c")
+
+    assert len(index) == 2
+    assert index.lookup(2) is None
+    assert index.lookup(1) == "a"
+    assert index.lookup(3) == "c"
+
+
+def test_zero_capacity_stores_nothing():
+    index = PerceptualHashIndex(max_distance=2, capacity=0)
+    index.add(1, "a")
+
+    assert len(index) == 0
+    assert index.lookup(1) is None
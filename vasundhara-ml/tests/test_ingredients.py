@@ -0,0 +1,54 @@
+"""
+Tests for ingredient normalization and fuzzy matching
+"""
+
+import pytest
+
+from app.utils.ingredients import IngredientMatcher, edit_distance, ingredient_tokens, normalize_ingredient
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("2 Large eggplants, peeled", "eggplant"),
+    ("3 green chillies", "green chilli"),
+    ("1 cup curd (fresh)", "yogurt"),
+    ("a handful of cilantro leaves", "coriander leaf"),
+    ("4 green onions", "spring onion"),
+    ("200 g cottage cheese", "paneer"),
+    ("salt to taste", "salt"),
+])
+def test_normalize_ingredient(line, expected):
+    assert normalize_ingredient(line) == expected
+
+
+def test_ingredient_tokens_drop_quantities_and_duplicates():
+    assert ingredient_tokens("2 tbsp tomato tomato puree") == ("tomato", "puree")
+    assert ingredient_tokens("1 pinch") == ()
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("onion", "onion", 0),
+    ("onion", "onoin", 1),
+    ("tomato", "tomatto", 1),
+    ("spinach", "spinnach", 1),
+    ("potato", "tomato", 2),
+    ("", "abc", 3),
+])
+def test_edit_distance(a, b, distance):
+    assert edit_distance(a, b) == distance
+
+
+def test_matcher_corrects_typos_and_drops_unknown_words():
+    matcher = IngredientMatcher({"tomato": 10, "spinach": 5, "onion": 8, "pea": 3})
+
+    assert matcher.match("Tomatos") == ("tomato",)
+    assert matcher.match("spinnach leaves") == ("spinach",)
+    assert matcher.match("Amul fresh onion pack") == ("onion",)
+    # Too short to tolerate a typo
+    assert matcher.match("pez") == ()
+
+
+def test_matcher_prefers_the_more_frequent_candidate():
+    matcher = IngredientMatcher({"carrot": 1, "parrot": 50})
+
+    assert matcher.correct("xarrot") == "parrot"
+    assert matcher.correct("carrot") == "carrot"
@@ -0,0 +1,94 @@
+"""
+Tests for recipe retrieval, ranking and dietary filtering
+"""
+
+from datetime import date
+
+import pytest
+
+from app.services.recipe_index import (
+    DIETARY_BITS,
+    RecipeIndex,
+    dietary_mask,
+    dietary_violations,
+    ingredient_urgency,
+)
+
+RECIPES = [
+    {"Title": "Palak Paneer", "Ingredients": ["2 bunches spinach", "200 g paneer", "1 onion", "salt to taste"]},
+    {"Title": "Aloo Palak", "Ingredients": ["3 potatoes", "1 bunch spinach", "1 tsp cumin"]},
+    {"Title": "Tomato Omelette", "Ingredients": ["2 eggs", "1 tomato", "1 green chilli"]},
+    {"Title": "Spinach Dal", "Ingredients": ["1 cup toor dal", "2 cups spinach", "1 tomato", "water"]},
+    {"Title": "", "Ingredients": ["ignored"]},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return RecipeIndex(RECIPES)
+
+
+def _titles(index, results):
+    return [index.titles[recipe] for recipe, _, _, _ in results]
+
+
+def test_build_skips_untitled_recipes_and_slugs_ids(index):
+    assert len(index) == 4
+    assert index.recipe(0)["recipe_id"] == "palak-paneer"
+    assert index.matrix.shape == (4, len(index.ingredient_ids))
+
+
+def test_rank_returns_only_recipes_using_expiring_items(index):
+    results = index.rank([("spinnach", 1.0)], k=10)
+
+    assert set(_titles(index, results)) == {"Palak Paneer", "Aloo Palak", "Spinach Dal"}
+    assert all(used == ["spinnach"] for _, _, used, _ in results)
+
+
+def test_rank_rewards_pantry_coverage(index):
+    results = index.rank([("spinach", 1.0)], pantry=["potato", "cumin"], k=1)
+
+    recipe, _, _, missing = results[0]
+    assert index.titles[recipe] == "Aloo Palak"
+    assert missing == []
+
+
+def test_rank_reports_missing_lines_but_not_staples(index):
+    (recipe, _, _, missing), = [r for r in index.rank([("spinach", 1.0)], k=10) if index.titles[r[0]] == "Spinach Dal"]
+
+    assert missing == ["1 cup toor dal", "1 tomato"]
+
+
+def test_rank_filters_dietary_constraints(index):
+    vegan = index.rank([("spinach", 1.0)], k=10, dietary=dietary_mask(["vegan"]))
+    jain = index.rank([("tomato", 1.0)], k=10, dietary=dietary_mask(["Jain"]))
+
+    assert "Palak Paneer" not in _titles(index, vegan)
+    assert _titles(index, jain) == ["Spinach Dal"]
+
+
+def test_rank_without_matches_is_empty(index):
+    assert index.rank([("dragonfruit", 1.0)]) == []
+    assert index.rank([]) == []
+
+
+def test_dietary_violations():
+    assert dietary_violations(("coconut", "milk")) == 0
+    assert dietary_violations(("milk",)) == (1 << DIETARY_BITS["vegan"]) | (1 << DIETARY_BITS["dairy-free"])
+    assert dietary_violations(("besan", "flour")) & (1 << DIETARY_BITS["gluten-free"]) == 0
+    assert dietary_violations(("wheat", "flour")) & (1 << DIETARY_BITS["gluten-free"])
+
+
+def test_dietary_mask_resolves_aliases_and_ignores_unknown():
+    assert dietary_mask(["Plant based", "celiac", "keto"]) == (
+        (1 << DIETARY_BITS["vegan"]) | (1 << DIETARY_BITS["gluten-free"])
+    )
+
+
+def test_ingredient_urgency():
+    today = date(2024, 1, 10)
+
+    assert ingredient_urgency(today, None, today, 2.0, 0.3) == 1.0
+    assert ingredient_urgency(date(2024, 1, 12), None, today, 2.0, 0.3) == pytest.approx(0.5)
+    assert ingredient_urgency(date(2024, 1, 20), 0.9, today, 2.0, 0.3) == 0.9
+    assert ingredient_urgency(None, None, today, 2.0, 0.3) == 0.3
@@ -0,0 +1,126 @@
+"""
+Tests for the verified-token cache and the shared revocation list
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+from app.utils.auth import REVOCATION_LOG_KEY, REVOKED_TOKENS_KEY, TokenCache, create_access_token
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def _redis(server) -> RedisClient:
+    redis = RedisClient()
+    redis.client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    return redis
+
+
+@pytest.fixture
+async def replicas(server):
+    caches = [TokenCache(), TokenCache()]
+    for cache in caches:
+        await cache.start(_redis(server))
+    yield caches
+    for cache in caches:
+        await cache.stop()
+
+
+def test_verify_caches_payloads_and_rejects_bad_tokens():
+    cache = TokenCache(max_size=2)
+    token = create_access_token({"user_id": "u1"})
+
+    assert cache.verify(token)["user_id"] == "u1"
+    assert cache.verify(token)["user_id"] == "u1"
+    assert (cache.hits, cache.misses) == (1, 1)
+    with pytest.raises(ValueError):
+        cache.verify(token + "x")
+    with pytest.raises(ValueError):
+        cache.verify(create_access_token({"user_id": "u1"}, timedelta(seconds=-1)))
+
+
+def test_verify_evicts_least_recently_used():
+    cache = TokenCache(max_size=1)
+    cache.verify(create_access_token({"user_id": "u1"}))
+    cache.verify(create_access_token({"user_id": "u2"}))
+
+    assert cache.stats()["entries"] == 1
+    assert cache.evictions == 1
+
+
+async def test_revocation_reaches_other_replicas(replicas):
+    first, second = replicas
+    token = create_access_token({"user_id": "u1"})
+    other = create_access_token({"user_id": "u2"})
+    second.verify(token)
+    second.verify(other)
+
+    assert await first.revoke(token, first.verify(token)["exp"])
+    await second.sync()
+
+    assert second.revocation_version == 1
+    with pytest.raises(ValueError, match="revoked"):
+        second.verify(token)
+    assert second.verify(other)["user_id"] == "u2"
+
+
+async def test_sync_fetches_only_new_revocations(replicas, server):
+    first, second = replicas
+    await first.revoke("token-a", time.time() + 60)
+    await second.sync()
+    await first.revoke("token-b", time.time() + 60)
+
+    redis = second.redis
+    calls = []
+    original = redis.get_sorted_set_range
+
+    async def spy(key, min_score="-inf", max_score="+inf"):
+        calls.append(min_score)
+        return await original(key, min_score, max_score)
+
+    redis.get_sorted_set_range = spy
+    await second.sync()
+    await second.sync()
+
+    assert calls == ["(1"]
+    assert second.revocation_version == 2
+    assert len(second.revoked) == 2
+
+
+async def test_revocations_expire_with_their_tokens(replicas, server):
+    first, second = replicas
+    await first.revoke("short-lived", time.time() + 1)
+    await asyncio.sleep(2.1)
+    await first.revoke("long-lived", time.time() + 600)
+    await second.sync()
+
+    raw = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    revoked = await raw.zrange(f"{settings.CACHE_PREFIX}{REVOKED_TOKENS_KEY}", 0, -1)
+    log = await raw.zrange(f"{settings.CACHE_PREFIX}{REVOCATION_LOG_KEY}", 0, -1)
+    assert len(revoked) == len(log) == 1
+    assert revoked == log
+    assert list(second.revoked.values()) == [float(revoked[0].rsplit(":", 1)[1])]
+    assert 590 < await raw.ttl(f"{settings.CACHE_PREFIX}{REVOKED_TOKENS_KEY}") <= 661
+
+
+async def test_sync_reloads_after_the_keys_are_lost(replicas, server):
+    first, second = replicas
+    await first.revoke("token-a", time.time() + 60)
+    await first.revoke("token-b", time.time() + 60)
+    await second.sync()
+
+    await fakeredis.FakeAsyncRedis(server=server).flushall()
+    await first.revoke("token-c", time.time() + 60)
+    await second.sync()
+
+    assert second.revocation_version == 1
+    assert len(second.revoked) == 1